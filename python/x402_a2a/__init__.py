@@ -43,8 +43,11 @@ from .types import (
     x402Error,
     MessageError,
     ValidationError,
+    PaymentVerificationError,
     PaymentError,
+    FacilitatorUnavailableError,
     StateError,
+    AdmissionRejectedError,
     x402PaymentRequiredException,
     x402ErrorCode,
     # Extension utilities
@@ -57,6 +60,11 @@ from .types import (
 from .core import (
     # Traditional core functions
     create_payment_requirements,
+    resolve_price,
+    invalidate_price_cache,
+    create_upto_payment_requirements,
+    metered_requirements,
+    UPTO_SCHEME,
     process_payment_required,
     process_payment,
     verify_payment,
@@ -74,6 +82,36 @@ from .core import (
     check_payment_context,
     # Agent utilities
     create_x402_agent_card,
+    # Payment requirements storage
+    PaymentRequirementsStore,
+    InMemoryPaymentRequirementsStore,
+    RedisPaymentRequirementsStore,
+    LocalRedis,
+    SQLitePaymentStateStore,
+    PaymentRequirementsIndex,
+    # Facilitator clients
+    PooledFacilitatorClient,
+    get_facilitator_client,
+    configure_facilitator_pool,
+    close_facilitator_clients,
+    BatchingFacilitatorClient,
+    ResilientFacilitatorClient,
+    CircuitBreaker,
+    LoadBalancedFacilitatorClient,
+    # Offline verification
+    pre_verify_exact_payment,
+    recover_authorization_signer,
+    SignatureRecoveryEngine,
+    # Replay protection
+    NonceReplayIndex,
+    InMemoryNonceSet,
+    SQLiteNonceSet,
+    # Entitlement tokens
+    EntitlementAuthority,
+    Entitlement,
+    EntitlementSigner,
+    HMACEntitlementSigner,
+    Ed25519EntitlementSigner,
 )
 
 # Optional Middleware
@@ -109,8 +147,11 @@ __all__ = [
     "x402Error",
     "MessageError",
     "ValidationError",
+    "PaymentVerificationError",
     "PaymentError",
+    "FacilitatorUnavailableError",
     "StateError",
+    "AdmissionRejectedError",
     "x402PaymentRequiredException",
     "x402ErrorCode",
     # Extension utilities
@@ -119,6 +160,11 @@ __all__ = [
     "add_extension_activation_header",
     # Core Functions
     "create_payment_requirements",
+    "resolve_price",
+    "invalidate_price_cache",
+    "create_upto_payment_requirements",
+    "metered_requirements",
+    "UPTO_SCHEME",
     "process_payment_required",
     "process_payment",
     "verify_payment",
@@ -136,6 +182,36 @@ __all__ = [
     "check_payment_context",
     # Agent utilities
     "create_x402_agent_card",
+    # Payment requirements storage
+    "PaymentRequirementsStore",
+    "InMemoryPaymentRequirementsStore",
+    "RedisPaymentRequirementsStore",
+    "LocalRedis",
+    "SQLitePaymentStateStore",
+    "PaymentRequirementsIndex",
+    # Facilitator clients
+    "PooledFacilitatorClient",
+    "get_facilitator_client",
+    "configure_facilitator_pool",
+    "close_facilitator_clients",
+    "BatchingFacilitatorClient",
+    "ResilientFacilitatorClient",
+    "CircuitBreaker",
+    "LoadBalancedFacilitatorClient",
+    # Offline verification
+    "pre_verify_exact_payment",
+    "recover_authorization_signer",
+    "SignatureRecoveryEngine",
+    # Replay protection
+    "NonceReplayIndex",
+    "InMemoryNonceSet",
+    "SQLiteNonceSet",
+    # Entitlement tokens
+    "EntitlementAuthority",
+    "Entitlement",
+    "EntitlementSigner",
+    "HMACEntitlementSigner",
+    "Ed25519EntitlementSigner",
     # Optional Middleware
     "x402BaseExecutor",
     "x402ServerExecutor",
@@ -0,0 +1,90 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Server executor overhead on requests that carry no payment.
+
+Run from the ``python/`` directory:
+
+    python -m x402_a2a.benchmarks.passthrough --requests 100000
+"""
+
+import argparse
+import asyncio
+import time
+
+from a2a.server.agent_execution import RequestContext
+from a2a.server.events import EventQueue
+from a2a.types import Message, MessageSendParams, Part, TextPart
+
+from x402_a2a.executors import x402ServerExecutor
+from x402_a2a.types import AgentExecutor, SettleResponse, VerifyResponse
+
+
+class _EchoAgent(AgentExecutor):
+    """Does no work, so only the wrapper's cost is measured."""
+
+    async def execute(self, context, event_queue):
+        return None
+
+    async def cancel(self, context, event_queue):
+        return None
+
+
+class _Merchant(x402ServerExecutor):
+    """Accepts every payment locally; unpaid requests never get this far."""
+
+    async def verify_payment(self, payload, requirements):
+        return VerifyResponse(is_valid=True, payer=payload.payload.authorization.from_)
+
+    async def settle_payment(self, payload, requirements):
+        return SettleResponse(success=True, network=payload.network)
+
+
+def _context() -> RequestContext:
+    message = Message(
+        messageId="msg-1",
+        role="user",
+        parts=[Part(root=TextPart(text="hello"))],
+    )
+    return RequestContext(
+        request=MessageSendParams(message=message),
+        task_id="task-1",
+        context_id="context-1",
+    )
+
+
+async def _per_request(executor, requests: int) -> float:
+    context = _context()
+    start = time.perf_counter()
+    for _ in range(requests):
+        # A fresh queue per request, as a server would have; nothing drains it.
+        await executor.execute(context, EventQueue())
+    return (time.perf_counter() - start) / requests
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=100_000)
+    args = parser.parse_args()
+
+    delegate = _EchoAgent()
+    wrapper = _Merchant(delegate, config=None)
+    bare = asyncio.run(_per_request(delegate, args.requests))
+    wrapped = asyncio.run(_per_request(wrapper, args.requests))
+    print(f"bare delegate   {bare * 1e9:8.0f} ns/request")
+    print(f"x402 wrapper    {wrapped * 1e9:8.0f} ns/request")
+    print(f"overhead        {(wrapped - bare) * 1e9:8.0f} ns/request")
+
+
+if __name__ == "__main__":
+    main()
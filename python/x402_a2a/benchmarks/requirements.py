@@ -0,0 +1,83 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Cost of building payment requirements, with and without the price cache.
+
+Run from the ``python/`` directory:
+
+    python -m x402_a2a.benchmarks.requirements --iterations 100000
+"""
+
+import argparse
+import time
+from typing import cast
+
+from x402.common import process_price_to_atomic_amount
+
+from x402_a2a.core.merchant import create_payment_requirements, resolve_price
+from x402_a2a.types import PaymentRequirements, SupportedNetworks
+
+_PAY_TO = "0x1111111111111111111111111111111111111111"
+_PRICES = ("$0.01", "$0.05", "$1.00")
+
+
+def _uncached(price, network):
+    """create_payment_requirements as it was before prices were memoized."""
+    amount, asset, domain = process_price_to_atomic_amount(price, network)
+    return PaymentRequirements(
+        scheme="exact",
+        network=cast(SupportedNetworks, network),
+        asset=asset,
+        pay_to=_PAY_TO,
+        max_amount_required=amount,
+        resource="/premium",
+        description="",
+        mime_type="application/json",
+        max_timeout_seconds=600,
+        output_schema=None,
+        extra=domain,
+    )
+
+
+def _cached(price, network):
+    return create_payment_requirements(
+        price=price, pay_to_address=_PAY_TO, resource="/premium", network=network
+    )
+
+
+def _per_call(fn, iterations: int, network: str) -> float:
+    start = time.perf_counter()
+    for i in range(iterations):
+        fn(_PRICES[i % len(_PRICES)], network)
+    return (time.perf_counter() - start) / iterations
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=100_000)
+    parser.add_argument("--network", default="base-sepolia")
+    args = parser.parse_args()
+
+    rows = (
+        ("resolve price, uncached", process_price_to_atomic_amount),
+        ("resolve price, cached", resolve_price),
+        ("build requirements, before", _uncached),
+        ("build requirements, after", _cached),
+    )
+    for label, fn in rows:
+        per_call = _per_call(fn, args.iterations, args.network)
+        print(f"{label:28} {per_call * 1e9:8.0f} ns/call")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Signer recovery throughput, in payloads/sec per core.
+
+Run from the ``python/`` directory:
+
+    python -m x402_a2a.benchmarks.signature_recovery --payloads 2000 --workers 4
+"""
+
+import argparse
+import asyncio
+import time
+
+from eth_account import Account
+
+from x402_a2a.core.merchant import create_payment_requirements
+from x402_a2a.core.recovery import (
+    SignatureRecoveryEngine,
+    native_backend_available,
+    recover_signers,
+    recovery_job,
+)
+from x402_a2a.core.wallet import process_payment
+
+
+def _jobs(count: int):
+    requirements = create_payment_requirements(
+        price="$0.01",
+        pay_to_address="0x1111111111111111111111111111111111111111",
+        resource="/benchmark",
+        network="base-sepolia",
+    )
+    # Signing is slower than recovery; reuse a small set of signed payloads.
+    payloads = [process_payment(requirements, Account.create()) for _ in range(64)]
+    return [recovery_job(payloads[i % 64], requirements) for i in range(count)]
+
+
+async def _run_engine(jobs, workers: int, native: bool) -> float:
+    engine = SignatureRecoveryEngine(workers=workers, native=native)
+    await engine.recover_batch(jobs[:workers])  # start the pool
+    start = time.perf_counter()
+    await engine.recover_batch(jobs)
+    elapsed = time.perf_counter() - start
+    engine.close()
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--payloads", type=int, default=2000)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    jobs = _jobs(args.payloads)
+    backends = [False] + ([True] if native_backend_available() else [])
+    for native in backends:
+        name = "coincurve" if native else "eth-account"
+        start = time.perf_counter()
+        recover_signers(jobs, native)
+        inline = time.perf_counter() - start
+        print(f"{name:12} inline     {args.payloads / inline:10.0f} payloads/sec/core")
+
+        pooled = asyncio.run(_run_engine(jobs, args.workers, native))
+        rate = args.payloads / pooled
+        print(
+            f"{name:12} {args.workers} workers  {rate:10.0f} payloads/sec "
+            f"({rate / args.workers:.0f}/core)"
+        )
+
+
+if __name__ == "__main__":
+    main()
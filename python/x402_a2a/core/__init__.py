@@ -13,7 +13,12 @@
 # limitations under the License.
 """Core package exports for x402_a2a."""
 
-from .merchant import create_payment_requirements
+from .merchant import (
+    create_payment_requirements,
+    resolve_price,
+    invalidate_price_cache,
+)
+from .upto import UPTO_SCHEME, create_upto_payment_requirements, metered_requirements
 from .wallet import process_payment_required, process_payment
 from .protocol import verify_payment, settle_payment
 from .utils import x402Utils, create_payment_submission_message, extract_task_id
@@ -26,10 +31,38 @@ from .helpers import (
     check_payment_context,
 )
 from .agent import create_x402_agent_card
+from .store import PaymentRequirementsStore, InMemoryPaymentRequirementsStore
+from .redis_store import RedisPaymentRequirementsStore, LocalRedis
+from .sqlite_store import SQLitePaymentStateStore
+from .facilitator import (
+    PooledFacilitatorClient,
+    get_facilitator_client,
+    configure_facilitator_pool,
+    close_facilitator_clients,
+)
+from .batching import BatchingFacilitatorClient
+from .resilience import ResilientFacilitatorClient, CircuitBreaker
+from .balancing import LoadBalancedFacilitatorClient
+from .matching import PaymentRequirementsIndex
+from .eip3009 import pre_verify_exact_payment, recover_authorization_signer
+from .recovery import SignatureRecoveryEngine
+from .replay import NonceReplayIndex, InMemoryNonceSet, SQLiteNonceSet
+from .entitlements import (
+    EntitlementAuthority,
+    Entitlement,
+    EntitlementSigner,
+    HMACEntitlementSigner,
+    Ed25519EntitlementSigner,
+)
 
 __all__ = [
     # Core merchant/wallet functions
     "create_payment_requirements",
+    "resolve_price",
+    "invalidate_price_cache",
+    "create_upto_payment_requirements",
+    "metered_requirements",
+    "UPTO_SCHEME",
     "process_payment_required",
     "process_payment",
     # Protocol functions
@@ -48,4 +81,34 @@ __all__ = [
     "check_payment_context",
     # Agent utilities
     "create_x402_agent_card",
+    # Payment requirements storage
+    "PaymentRequirementsStore",
+    "InMemoryPaymentRequirementsStore",
+    "RedisPaymentRequirementsStore",
+    "LocalRedis",
+    "SQLitePaymentStateStore",
+    "PaymentRequirementsIndex",
+    # Facilitator clients
+    "PooledFacilitatorClient",
+    "get_facilitator_client",
+    "configure_facilitator_pool",
+    "close_facilitator_clients",
+    "BatchingFacilitatorClient",
+    "ResilientFacilitatorClient",
+    "CircuitBreaker",
+    "LoadBalancedFacilitatorClient",
+    # Offline verification
+    "pre_verify_exact_payment",
+    "recover_authorization_signer",
+    "SignatureRecoveryEngine",
+    # Replay protection
+    "NonceReplayIndex",
+    "InMemoryNonceSet",
+    "SQLiteNonceSet",
+    # Entitlement tokens
+    "EntitlementAuthority",
+    "Entitlement",
+    "EntitlementSigner",
+    "HMACEntitlementSigner",
+    "Ed25519EntitlementSigner",
 ]
@@ -0,0 +1,249 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Latency-aware load balancing across several facilitators."""
+
+import logging
+import random
+import time
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    TypeVar,
+)
+
+from ..types import (
+    FacilitatorClient,
+    PaymentPayload,
+    PaymentRequirements,
+    SettleResponse,
+    VerifyResponse,
+)
+
+
+logger = logging.getLogger(__name__)
+
+R = TypeVar("R")
+
+
+class FacilitatorEndpoint:
+    """A facilitator behind the balancer and its observed health."""
+
+    __slots__ = (
+        "client",
+        "name",
+        "networks",
+        "ewma",
+        "in_flight",
+        "requests",
+        "failures",
+        "consecutive_failures",
+        "ejections",
+        "ejected_until",
+    )
+
+    def __init__(
+        self, client: FacilitatorClient, networks: Optional[Iterable[str]] = None
+    ):
+        self.client = client
+        self.name = getattr(client, "config", {}).get("url") or repr(client)
+        self.networks: Optional[FrozenSet[str]] = (
+            frozenset(networks) if networks is not None else None
+        )
+        self.ewma = 0.0
+        self.in_flight = 0
+        self.requests = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.ejections = 0
+        self.ejected_until = 0.0
+
+    def serves(self, network: str) -> bool:
+        return self.networks is None or network in self.networks
+
+    def score(self) -> float:
+        # Outstanding requests scale the expected wait behind this endpoint.
+        return self.ewma * (self.in_flight + 1)
+
+
+class LoadBalancedFacilitatorClient(FacilitatorClient):
+    """Routes verify/settle calls across facilitators by network and latency.
+
+    Each call goes to an endpoint that serves the requirement's network,
+    picked by power-of-two-choices: two random healthy candidates are
+    compared and the one with the lower latency EWMA (weighted by requests
+    in flight) wins. An endpoint that fails ``failure_threshold`` times in a
+    row is ejected for ``ejection_seconds``, doubling on repeated ejections,
+    and re-admitted afterwards; its next success clears the record. If every
+    candidate is ejected, the one due back soonest is used rather than
+    failing outright.
+
+    A verify that raises is retried once on another endpoint. Settlement is
+    not retried, since the first facilitator may already have submitted it.
+
+    Example:
+        client = LoadBalancedFacilitatorClient(
+            [PooledFacilitatorClient({"url": "https://us.example"}),
+             PooledFacilitatorClient({"url": "https://eu.example"})]
+        )
+        client.add(PooledFacilitatorClient(avax_config), networks=["avalanche"])
+    """
+
+    def __init__(
+        self,
+        clients: Sequence[FacilitatorClient] = (),
+        ewma_alpha: float = 0.3,
+        failure_threshold: int = 3,
+        ejection_seconds: float = 30.0,
+        max_ejection_seconds: float = 300.0,
+    ):
+        """Initialize the balancer.
+
+        Args:
+            clients: Facilitators that serve every network
+            ewma_alpha: Weight of the newest latency sample
+            failure_threshold: Consecutive failures that eject an endpoint
+            ejection_seconds: First ejection period
+            max_ejection_seconds: Upper bound on an ejection period
+        """
+        self.config = {}
+        self._endpoints: List[FacilitatorEndpoint] = []
+        self._alpha = ewma_alpha
+        self._failure_threshold = failure_threshold
+        self._ejection_seconds = ejection_seconds
+        self._max_ejection_seconds = max_ejection_seconds
+        for client in clients:
+            self.add(client)
+
+    def add(
+        self, client: FacilitatorClient, networks: Optional[Iterable[str]] = None
+    ) -> FacilitatorEndpoint:
+        """Adds a facilitator, optionally limited to some networks."""
+        endpoint = FacilitatorEndpoint(client, networks)
+        self._endpoints.append(endpoint)
+        if not self.config:
+            self.config = getattr(client, "config", {})
+        return endpoint
+
+    def _choose(
+        self, network: str, exclude: Optional[FacilitatorEndpoint] = None
+    ) -> FacilitatorEndpoint:
+        candidates = [
+            e for e in self._endpoints if e.serves(network) and e is not exclude
+        ]
+        if not candidates:
+            raise ValueError(f"No facilitator configured for network {network}")
+        now = time.monotonic()
+        healthy = [e for e in candidates if e.ejected_until <= now]
+        if not healthy:
+            return min(candidates, key=lambda e: e.ejected_until)
+        if len(healthy) == 1:
+            return healthy[0]
+        first, second = random.sample(healthy, 2)
+        return first if first.score() <= second.score() else second
+
+    def _record_success(self, endpoint: FacilitatorEndpoint, elapsed: float) -> None:
+        endpoint.ewma = (
+            self._alpha * elapsed + (1 - self._alpha) * endpoint.ewma
+            if endpoint.ewma
+            else elapsed
+        )
+        endpoint.consecutive_failures = 0
+        endpoint.ejections = 0
+        endpoint.ejected_until = 0.0
+
+    def _record_failure(self, endpoint: FacilitatorEndpoint) -> None:
+        endpoint.failures += 1
+        endpoint.consecutive_failures += 1
+        if endpoint.consecutive_failures >= self._failure_threshold:
+            endpoint.ejections += 1
+            period = min(
+                self._max_ejection_seconds,
+                self._ejection_seconds * 2 ** (endpoint.ejections - 1),
+            )
+            endpoint.ejected_until = time.monotonic() + period
+            endpoint.consecutive_failures = 0
+            logger.warning(f"Ejected facilitator {endpoint.name} for {period:.0f}s")
+
+    async def _call(
+        self,
+        endpoint: FacilitatorEndpoint,
+        call: Callable[[FacilitatorClient], Awaitable[R]],
+    ) -> R:
+        endpoint.in_flight += 1
+        endpoint.requests += 1
+        start = time.monotonic()
+        try:
+            result = await call(endpoint.client)
+        except Exception:
+            self._record_failure(endpoint)
+            raise
+        finally:
+            endpoint.in_flight -= 1
+        self._record_success(endpoint, time.monotonic() - start)
+        return result
+
+    async def verify(
+        self, payment: PaymentPayload, payment_requirements: PaymentRequirements
+    ) -> VerifyResponse:
+        network = payment_requirements.network
+        endpoint = self._choose(network)
+        try:
+            return await self._call(
+                endpoint, lambda c: c.verify(payment, payment_requirements)
+            )
+        except Exception:
+            if not any(e.serves(network) for e in self._endpoints if e is not endpoint):
+                raise
+            retry = self._choose(network, exclude=endpoint)
+            return await self._call(
+                retry, lambda c: c.verify(payment, payment_requirements)
+            )
+
+    async def settle(
+        self, payment: PaymentPayload, payment_requirements: PaymentRequirements
+    ) -> SettleResponse:
+        endpoint = self._choose(payment_requirements.network)
+        return await self._call(
+            endpoint, lambda c: c.settle(payment, payment_requirements)
+        )
+
+    async def list(self, request=None):
+        return await self._choose_any().client.list(request)
+
+    def _choose_any(self) -> FacilitatorEndpoint:
+        if not self._endpoints:
+            raise ValueError("No facilitator configured")
+        return min(self._endpoints, key=lambda e: (e.ejected_until, e.score()))
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Returns latency and health per facilitator."""
+        now = time.monotonic()
+        return {
+            endpoint.name: {
+                "ewma_ms": 1000 * endpoint.ewma,
+                "in_flight": endpoint.in_flight,
+                "requests": endpoint.requests,
+                "failures": endpoint.failures,
+                "ejected": endpoint.ejected_until > now,
+                "ejections": endpoint.ejections,
+            }
+            for endpoint in self._endpoints
+        }
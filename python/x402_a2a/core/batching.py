@@ -0,0 +1,210 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Micro-batching wrapper for facilitator verify and settle calls."""
+
+import asyncio
+import time
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Generic,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+)
+
+from ..types import (
+    FacilitatorClient,
+    PaymentPayload,
+    PaymentRequirements,
+    SettleResponse,
+    VerifyResponse,
+)
+
+R = TypeVar("R")
+
+PaymentPair = Tuple[PaymentPayload, PaymentRequirements]
+SingleCall = Callable[[PaymentPayload, PaymentRequirements], Awaitable[R]]
+BatchCall = Callable[[List[PaymentPair]], Awaitable[List[R]]]
+
+
+class _MicroBatcher(Generic[R]):
+    """Collects calls for up to ``max_delay`` seconds or ``max_batch_size`` items."""
+
+    def __init__(
+        self,
+        single: Optional[SingleCall],
+        batch: Optional[BatchCall],
+        max_batch_size: int,
+        max_delay: float,
+    ):
+        self._single = single
+        self._batch = batch
+        self._max_batch_size = max_batch_size
+        self._max_delay = max_delay
+        # (payload, requirements, future, enqueued_at)
+        self._pending: List[Tuple[PaymentPayload, PaymentRequirements, Any, float]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._dispatches: "set[asyncio.Task[None]]" = set()
+
+        self.batches = 0
+        self.items = 0
+        self.max_batch_size_seen = 0
+        self.total_queue_delay = 0.0
+        self.max_queue_delay = 0.0
+
+    async def submit(
+        self, payload: PaymentPayload, requirements: PaymentRequirements
+    ) -> R:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((payload, requirements, future, time.monotonic()))
+        if len(self._pending) >= self._max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self._max_delay, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, []
+        dispatch = asyncio.get_running_loop().create_task(self._dispatch(batch))
+        # Keep a reference so the dispatch is not garbage collected mid-flight.
+        self._dispatches.add(dispatch)
+        dispatch.add_done_callback(self._dispatches.discard)
+
+    async def _dispatch(
+        self, batch: List[Tuple[PaymentPayload, PaymentRequirements, Any, float]]
+    ) -> None:
+        now = time.monotonic()
+        self.batches += 1
+        self.items += len(batch)
+        self.max_batch_size_seen = max(self.max_batch_size_seen, len(batch))
+        for _, _, _, enqueued_at in batch:
+            delay = now - enqueued_at
+            self.total_queue_delay += delay
+            self.max_queue_delay = max(self.max_queue_delay, delay)
+
+        pairs = [(payload, requirements) for payload, requirements, _, _ in batch]
+        results: List[Any]
+        if self._batch is not None:
+            try:
+                results = list(await self._batch(pairs))
+                if len(results) != len(pairs):
+                    raise ValueError(
+                        f"Batched facilitator call returned {len(results)} results "
+                        f"for {len(pairs)} requests"
+                    )
+            except Exception as e:
+                results = [e] * len(pairs)
+        else:
+            results = await asyncio.gather(
+                *(
+                    self._single(payload, requirements)
+                    for payload, requirements in pairs
+                ),
+                return_exceptions=True,
+            )
+
+        for (_, _, future, _), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "pending": len(self._pending),
+            "avg_batch_size": self.items / self.batches if self.batches else 0.0,
+            "max_batch_size": self.max_batch_size_seen,
+            "avg_queue_delay_ms": (
+                1000 * self.total_queue_delay / self.items if self.items else 0.0
+            ),
+            "max_queue_delay_ms": 1000 * self.max_queue_delay,
+        }
+
+
+class BatchingFacilitatorClient(FacilitatorClient):
+    """FacilitatorClient that coalesces concurrent verify and settle calls.
+
+    Calls arriving within ``max_delay`` seconds (or until ``max_batch_size``
+    calls are waiting) are dispatched together and each caller receives its
+    own result. If the wrapped client exposes ``verify_batch``/``settle_batch``
+    coroutines taking a list of ``(payload, requirements)`` pairs and
+    returning results in the same order, one batched request is sent;
+    otherwise the calls in a batch are issued concurrently.
+
+    Example:
+        client = BatchingFacilitatorClient(FacilitatorClient(config), max_delay=0.002)
+        response = await verify_payment(payload, requirements, client)
+    """
+
+    def __init__(
+        self,
+        client: FacilitatorClient,
+        max_batch_size: int = 64,
+        max_delay: float = 0.005,
+    ):
+        """Initialize the wrapper.
+
+        Args:
+            client: The facilitator client to send batches through
+            max_batch_size: Calls that trigger an immediate dispatch
+            max_delay: Longest time, in seconds, a call waits for its batch
+        """
+        if max_batch_size <= 0:
+            raise ValueError("max_batch_size must be greater than 0")
+        # The wrapped client owns the connection settings.
+        self.config = getattr(client, "config", {})
+        self._client = client
+        self._verify = _MicroBatcher[VerifyResponse](
+            client.verify,
+            getattr(client, "verify_batch", None),
+            max_batch_size,
+            max_delay,
+        )
+        self._settle = _MicroBatcher[SettleResponse](
+            client.settle,
+            getattr(client, "settle_batch", None),
+            max_batch_size,
+            max_delay,
+        )
+
+    async def verify(
+        self, payment: PaymentPayload, payment_requirements: PaymentRequirements
+    ) -> VerifyResponse:
+        return await self._verify.submit(payment, payment_requirements)
+
+    async def settle(
+        self, payment: PaymentPayload, payment_requirements: PaymentRequirements
+    ) -> SettleResponse:
+        return await self._settle.submit(payment, payment_requirements)
+
+    async def list(self, request=None):
+        return await self._client.list(request)
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Returns batch size and queueing delay metrics per operation."""
+        return {"verify": self._verify.stats(), "settle": self._settle.stats()}
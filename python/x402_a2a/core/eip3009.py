@@ -0,0 +1,194 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Offline checks for EIP-3009 ``exact`` payment authorizations."""
+
+import time
+from typing import Any, Dict, Optional
+
+from eth_account import Account
+from eth_account.messages import encode_typed_data
+from x402.chains import KNOWN_TOKENS, get_chain_id
+
+from ..types import (
+    EIP3009Authorization,
+    PaymentPayload,
+    PaymentRequirements,
+    PaymentVerificationError,
+    x402ErrorCode,
+)
+
+# Same struct that x402.exact.sign_payment_header signs (used by core/wallet.py).
+TRANSFER_WITH_AUTHORIZATION_TYPES = {
+    "TransferWithAuthorization": [
+        {"name": "from", "type": "address"},
+        {"name": "to", "type": "address"},
+        {"name": "value", "type": "uint256"},
+        {"name": "validAfter", "type": "uint256"},
+        {"name": "validBefore", "type": "uint256"},
+        {"name": "nonce", "type": "bytes32"},
+    ]
+}
+
+
+def eip712_domain(requirements: PaymentRequirements) -> Optional[Dict[str, Any]]:
+    """Returns the token's EIP-712 domain, or None if its name/version are unknown.
+
+    Name and version come from ``requirements.extra`` as set by
+    ``create_payment_requirements``, falling back to x402's known tokens.
+    """
+    try:
+        chain_id = get_chain_id(requirements.network)
+    except ValueError:
+        return None
+    extra = requirements.extra or {}
+    name, version = extra.get("name"), extra.get("version")
+    if not (name and version):
+        for token in KNOWN_TOKENS.get(chain_id, []):
+            if token["address"].lower() == requirements.asset.lower():
+                name, version = token["name"], token["version"]
+                break
+        else:
+            return None
+    return {
+        "name": name,
+        "version": version,
+        "chainId": int(chain_id),
+        "verifyingContract": requirements.asset,
+    }
+
+
+def transfer_with_authorization_message(
+    authorization: EIP3009Authorization,
+) -> Dict[str, Any]:
+    """Builds the typed-data message for a TransferWithAuthorization."""
+    return {
+        "from": authorization.from_,
+        "to": authorization.to,
+        "value": int(authorization.value),
+        "validAfter": int(authorization.valid_after),
+        "validBefore": int(authorization.valid_before),
+        "nonce": bytes.fromhex(authorization.nonce.removeprefix("0x")),
+    }
+
+
+def recover_authorization_signer(
+    payload: PaymentPayload, domain: Dict[str, Any]
+) -> str:
+    """Recovers the address that signed a payload's authorization."""
+    signable = encode_typed_data(
+        domain_data=domain,
+        message_types=TRANSFER_WITH_AUTHORIZATION_TYPES,
+        message_data=transfer_with_authorization_message(payload.payload.authorization),
+    )
+    return Account.recover_message(signable, signature=payload.payload.signature)
+
+
+def check_exact_authorization(
+    payload: PaymentPayload,
+    requirements: PaymentRequirements,
+    now: Optional[float] = None,
+    min_validity_seconds: int = 6,
+) -> None:
+    """Checks every field of an ``exact`` authorization except the signature.
+
+    Args:
+        payload: Submitted payment payload
+        requirements: Requirement the payment was matched to
+        now: Current unix time (defaults to the wall clock)
+        min_validity_seconds: Validity left for the settlement to be mined
+
+    Raises:
+        PaymentVerificationError: With the x402 error code for the first
+            failed check
+    """
+    if payload.network != requirements.network:
+        raise PaymentVerificationError(
+            f"Payment network {payload.network} does not match {requirements.network}",
+            x402ErrorCode.NETWORK_MISMATCH,
+        )
+
+    authorization = payload.payload.authorization
+    if authorization.to.lower() != requirements.pay_to.lower():
+        raise PaymentVerificationError("Authorization recipient does not match pay_to")
+
+    try:
+        value = int(authorization.value)
+        valid_after = int(authorization.valid_after)
+        valid_before = int(authorization.valid_before)
+    except ValueError as e:
+        raise PaymentVerificationError(f"Malformed authorization: {e}") from e
+    try:
+        nonce = bytes.fromhex(authorization.nonce.removeprefix("0x"))
+    except ValueError as e:
+        raise PaymentVerificationError(f"Malformed authorization nonce: {e}") from e
+    if len(nonce) != 32:
+        raise PaymentVerificationError(
+            f"Authorization nonce is {len(nonce)} bytes, expected 32"
+        )
+
+    if value < int(requirements.max_amount_required):
+        raise PaymentVerificationError(
+            f"Authorized value {value} is below {requirements.max_amount_required}",
+            x402ErrorCode.INVALID_AMOUNT,
+        )
+
+    now = time.time() if now is None else now
+    if valid_after > now:
+        raise PaymentVerificationError(
+            "Authorization is not yet valid", x402ErrorCode.EXPIRED_PAYMENT
+        )
+    if valid_before < now + min_validity_seconds:
+        raise PaymentVerificationError(
+            "Authorization has expired", x402ErrorCode.EXPIRED_PAYMENT
+        )
+
+
+def pre_verify_exact_payment(
+    payload: PaymentPayload,
+    requirements: PaymentRequirements,
+    now: Optional[float] = None,
+    min_validity_seconds: int = 6,
+) -> Optional[str]:
+    """Rejects implausible ``exact`` payments without a network call.
+
+    Checks the recipient, amount, network and validity window against the
+    matched requirement, then recovers the EIP-712 signer (with the asset as
+    verifying contract) and compares it to ``authorization.from``. Passing
+    does not make a payment valid: balances and nonce state are on chain and
+    still need the facilitator.
+
+    Payments for other schemes, and tokens whose EIP-712 name/version are
+    unknown, skip the checks that do not apply to them.
+
+    Returns:
+        The recovered payer address, or None if the signature was not checked
+
+    Raises:
+        PaymentVerificationError: With the x402 error code for the failure
+    """
+    if requirements.scheme != "exact" or payload.scheme != "exact":
+        return None
+
+    check_exact_authorization(payload, requirements, now, min_validity_seconds)
+
+    domain = eip712_domain(requirements)
+    if domain is None:
+        return None
+    try:
+        signer = recover_authorization_signer(payload, domain)
+    except Exception as e:
+        raise PaymentVerificationError(f"Malformed signature: {e}") from e
+    if signer.lower() != payload.payload.authorization.from_.lower():
+        raise PaymentVerificationError("Signature does not match authorization.from")
+    return signer
@@ -0,0 +1,304 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Signed entitlement tokens checked locally instead of paying again."""
+
+import base64
+import hashlib
+import hmac
+import json
+import secrets
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional
+
+from ..types import PaymentRequirements
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def _b64decode(data: str) -> bytes:
+    decoded = base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+    # Only the encoding _b64encode produces is accepted, so a token has
+    # exactly one valid spelling.
+    if _b64encode(decoded) != data:
+        raise ValueError("Non-canonical base64url")
+    return decoded
+
+
+class EntitlementSigner(ABC):
+    """Signs and verifies the claims segment of entitlement tokens."""
+
+    @abstractmethod
+    def sign(self, message: bytes) -> bytes:
+        """Returns the signature of ``message``."""
+
+    @abstractmethod
+    def verify(self, message: bytes, signature: bytes) -> bool:
+        """Whether ``signature`` is valid for ``message``."""
+
+
+class HMACEntitlementSigner(EntitlementSigner):
+    """HMAC-SHA256 signer for tokens issued and checked by the same merchant."""
+
+    def __init__(self, key: bytes):
+        if len(key) < 32:
+            raise ValueError("HMAC key must be at least 32 bytes")
+        self._key = key
+
+    def sign(self, message: bytes) -> bytes:
+        return hmac.digest(self._key, message, hashlib.sha256)
+
+    def verify(self, message: bytes, signature: bytes) -> bool:
+        return hmac.compare_digest(self.sign(message), signature)
+
+
+class Ed25519EntitlementSigner(EntitlementSigner):
+    """Ed25519 signer, so workers that only check tokens hold no secret.
+
+    Pass the private key where tokens are issued and only the public key
+    where they are checked.
+    """
+
+    def __init__(
+        self, private_key: Optional[Any] = None, public_key: Optional[Any] = None
+    ):
+        """Initialize the signer.
+
+        Args:
+            private_key: ``cryptography`` Ed25519PrivateKey; generated when
+                neither key is given
+            public_key: Ed25519PublicKey; derived from ``private_key`` when
+                omitted
+        """
+        try:
+            from cryptography.exceptions import InvalidSignature
+            from cryptography.hazmat.primitives.asymmetric.ed25519 import (
+                Ed25519PrivateKey,
+            )
+        except ImportError as e:
+            raise ImportError(
+                "Ed25519EntitlementSigner requires the 'cryptography' package. "
+                "Install it with: pip install 'x402-a2a[ed25519]'"
+            ) from e
+        if private_key is None and public_key is None:
+            private_key = Ed25519PrivateKey.generate()
+        self._private_key = private_key
+        self._public_key = public_key or private_key.public_key()
+        self._invalid_signature = InvalidSignature
+
+    def sign(self, message: bytes) -> bytes:
+        if self._private_key is None:
+            raise ValueError("Signing requires the private key")
+        return self._private_key.sign(message)
+
+    def verify(self, message: bytes, signature: bytes) -> bool:
+        try:
+            self._public_key.verify(signature, message)
+        except self._invalid_signature:
+            return False
+        return True
+
+
+class Entitlement:
+    """The scope of a checked entitlement token."""
+
+    __slots__ = ("token_id", "resource", "payer", "expires_at", "uses", "uses_left")
+
+    def __init__(
+        self,
+        token_id: str,
+        resource: str,
+        payer: str,
+        expires_at: int,
+        uses: int,
+        uses_left: int,
+    ):
+        self.token_id = token_id
+        self.resource = resource
+        self.payer = payer
+        self.expires_at = expires_at
+        self.uses = uses
+        self.uses_left = uses_left
+
+
+class EntitlementAuthority:
+    """Issues entitlement tokens after a payment and checks them locally.
+
+    A token is ``<claims>.<signature>``, both base64url: the claims name the
+    resource with the network, asset and amount that were paid for it, the
+    payer, an expiry and the number of uses granted. A token is only
+    accepted for requirements in the same asset that cost no more than the
+    payment it was issued for, so raising a price retires older tokens.
+    Checking one is a signature check, a JSON parse and a few dictionary
+    lookups on the event loop, with no facilitator call.
+
+    Uses are counted in this process, and revocations (by token id or by
+    payer) are kept in memory until the tokens they cover expire. Workers
+    that share a signer accept each other's tokens, but each counts uses on
+    its own; keep ``uses`` low or pin clients to a worker where that
+    matters.
+
+    Example:
+        authority = EntitlementAuthority(
+            HMACEntitlementSigner(secret), ttl_seconds=3600, uses=10
+        )
+        server = MyServerExecutor(agent, config, entitlements=authority)
+    """
+
+    def __init__(
+        self,
+        signer: EntitlementSigner,
+        ttl_seconds: int = 3600,
+        uses: int = 1,
+    ):
+        """Initialize the authority.
+
+        Args:
+            signer: Signer for issued tokens
+            ttl_seconds: Lifetime of issued tokens
+            uses: Calls an issued token grants
+        """
+        if uses <= 0:
+            raise ValueError("uses must be greater than 0")
+        self._signer = signer
+        self._ttl = ttl_seconds
+        self._uses = uses
+        # token id -> (uses consumed, expires_at)
+        self._used: Dict[str, list] = {}
+        # token id -> expires_at
+        self._revoked: Dict[str, int] = {}
+        self._revoked_payers: set = set()
+        self._prune_at = 4096
+
+        self._issued = 0
+        self._accepted = 0
+        self._rejected = 0
+
+    def issue(self, requirements: PaymentRequirements, payer: str) -> Dict[str, Any]:
+        """Issues a token for the resource ``payer`` paid ``requirements`` for.
+
+        Returns:
+            The token with its expiry and uses, as recorded on the task
+        """
+        expires_at = int(time.time()) + self._ttl
+        resource = requirements.resource
+        claims = {
+            "jti": secrets.token_urlsafe(12),
+            "res": resource,
+            "net": requirements.network,
+            "asset": requirements.asset.lower(),
+            "amt": requirements.max_amount_required,
+            "sub": payer.lower(),
+            "exp": expires_at,
+            "uses": self._uses,
+        }
+        body = _b64encode(json.dumps(claims, separators=(",", ":")).encode())
+        signature = _b64encode(self._signer.sign(body.encode()))
+        self._issued += 1
+        return {
+            "token": f"{body}.{signature}",
+            "resource": resource,
+            "expiresAt": expires_at,
+            "usesLeft": self._uses,
+        }
+
+    def check(
+        self, token: str, requirements: PaymentRequirements
+    ) -> Optional[Entitlement]:
+        """Consumes one use of ``token`` for ``requirements``.
+
+        Returns:
+            The entitlement, or None if the token is malformed, forged,
+            expired, revoked, used up, scoped to another resource or paid
+            for at a lower price
+        """
+        entitlement = self._check(token, requirements)
+        if entitlement is None:
+            self._rejected += 1
+        else:
+            self._accepted += 1
+        return entitlement
+
+    def _check(
+        self, token: str, requirements: PaymentRequirements
+    ) -> Optional[Entitlement]:
+        body, _, signature = token.partition(".")
+        try:
+            if not self._signer.verify(body.encode(), _b64decode(signature)):
+                return None
+            claims = json.loads(_b64decode(body))
+            token_id = claims["jti"]
+            expires_at = claims["exp"]
+            uses = claims["uses"]
+            payer = claims["sub"]
+            scope = claims["res"]
+            paid = int(claims["amt"])
+            priced_in = (claims["net"], claims["asset"])
+            price = int(requirements.max_amount_required)
+        except (ValueError, KeyError, TypeError):
+            return None
+
+        now = time.time()
+        if scope != requirements.resource or expires_at <= now:
+            return None
+        if priced_in != (requirements.network, requirements.asset.lower()):
+            return None
+        if paid < price:
+            return None
+        if token_id in self._revoked or payer in self._revoked_payers:
+            return None
+        used = self._used.get(token_id)
+        if used is None:
+            if len(self._used) >= self._prune_at:
+                self._prune(now)
+            used = self._used[token_id] = [0, expires_at]
+        if used[0] >= uses:
+            return None
+        used[0] += 1
+        return Entitlement(token_id, scope, payer, expires_at, uses, uses - used[0])
+
+    def release(self, entitlement: Entitlement) -> None:
+        """Gives back a use whose call did not complete."""
+        used = self._used.get(entitlement.token_id)
+        if used is not None and used[0] > 0:
+            used[0] -= 1
+            entitlement.uses_left += 1
+
+    def revoke(self, token: str) -> None:
+        """Revokes a token until it expires."""
+        try:
+            claims = json.loads(_b64decode(token.partition(".")[0]))
+            self._revoked[claims["jti"]] = claims["exp"]
+        except (ValueError, KeyError, TypeError):
+            raise ValueError("Malformed entitlement token") from None
+
+    def revoke_payer(self, payer: str) -> None:
+        """Revokes every token issued to ``payer``."""
+        self._revoked_payers.add(payer.lower())
+
+    def _prune(self, now: float) -> None:
+        self._used = {k: v for k, v in self._used.items() if v[1] > now}
+        self._revoked = {k: exp for k, exp in self._revoked.items() if exp > now}
+        self._prune_at = max(4096, 2 * len(self._used))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "issued": self._issued,
+            "accepted": self._accepted,
+            "rejected": self._rejected,
+            "tracked": len(self._used),
+            "revoked": len(self._revoked) + len(self._revoked_payers),
+        }
@@ -0,0 +1,200 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Shared, connection-pooled facilitator clients."""
+
+import asyncio
+import importlib.util
+import weakref
+from typing import Any, Dict, Optional, Tuple
+
+import httpx
+from x402.types import ListDiscoveryResourcesRequest, ListDiscoveryResourcesResponse
+
+from ..types import (
+    FacilitatorClient,
+    FacilitatorConfig,
+    PaymentPayload,
+    PaymentRequirements,
+    SettleResponse,
+    VerifyResponse,
+)
+
+DEFAULT_FACILITATOR_URL = "https://x402.org/facilitator"
+
+
+def http2_available() -> bool:
+    """Returns True if httpx can negotiate HTTP/2 (the ``h2`` package is installed)."""
+    return importlib.util.find_spec("h2") is not None
+
+
+class PooledFacilitatorClient(FacilitatorClient):
+    """FacilitatorClient that reuses one pooled ``httpx.AsyncClient``.
+
+    The stock client opens a new HTTP client, and so new TCP/TLS connections,
+    for every verify and settle. This one keeps connections alive between
+    calls and negotiates HTTP/2 when ``h2`` is installed
+    (``pip install httpx[http2]``). Call ``aclose()`` when done, or obtain it
+    from ``get_facilitator_client`` and close everything with
+    ``close_facilitator_clients`` at shutdown.
+
+    Example:
+        client = PooledFacilitatorClient({"url": "https://x402.org/facilitator"})
+        response = await verify_payment(payload, requirements, client)
+        await client.aclose()
+    """
+
+    def __init__(
+        self,
+        config: Optional[FacilitatorConfig] = None,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 30.0,
+        timeout: float = 30.0,
+        http2: Optional[bool] = None,
+    ):
+        """Initialize the client; the connection pool opens on first use.
+
+        Args:
+            config: Facilitator URL and optional header factory
+            max_connections: Upper bound on open connections
+            max_keepalive_connections: Idle connections kept for reuse
+            keepalive_expiry: Seconds an idle connection is kept
+            timeout: Default HTTP timeout in seconds
+            http2: Force HTTP/2 on or off (defaults to whether h2 is installed)
+        """
+        super().__init__(config)
+        self._limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self._timeout = timeout
+        self._http2 = http2_available() if http2 is None else http2
+        self._http: Optional[httpx.AsyncClient] = None
+
+    def _client(self) -> httpx.AsyncClient:
+        if self._http is None or self._http.is_closed:
+            self._http = httpx.AsyncClient(
+                limits=self._limits,
+                timeout=self._timeout,
+                http2=self._http2,
+                follow_redirects=True,
+            )
+        return self._http
+
+    async def _headers(self, operation: str) -> Dict[str, str]:
+        headers = {"Content-Type": "application/json"}
+        if self.config.get("create_headers"):
+            custom_headers = await self.config["create_headers"]()
+            headers.update(custom_headers.get(operation, {}))
+        return headers
+
+    async def _post(
+        self,
+        operation: str,
+        payment: PaymentPayload,
+        payment_requirements: PaymentRequirements,
+    ) -> Any:
+        response = await self._client().post(
+            f"{self.config['url']}/{operation}",
+            json={
+                "x402Version": payment.x402_version,
+                "paymentPayload": payment.model_dump(by_alias=True),
+                "paymentRequirements": payment_requirements.model_dump(
+                    by_alias=True, exclude_none=True
+                ),
+            },
+            headers=await self._headers(operation),
+        )
+        return response.json()
+
+    async def verify(
+        self, payment: PaymentPayload, payment_requirements: PaymentRequirements
+    ) -> VerifyResponse:
+        data = await self._post("verify", payment, payment_requirements)
+        return VerifyResponse(**data)
+
+    async def settle(
+        self, payment: PaymentPayload, payment_requirements: PaymentRequirements
+    ) -> SettleResponse:
+        data = await self._post("settle", payment, payment_requirements)
+        return SettleResponse(**data)
+
+    async def list(
+        self, request: Optional[ListDiscoveryResourcesRequest] = None
+    ) -> ListDiscoveryResourcesResponse:
+        if request is None:
+            request = ListDiscoveryResourcesRequest()
+        params = {
+            k: str(v)
+            for k, v in request.model_dump(by_alias=True).items()
+            if v is not None
+        }
+        response = await self._client().get(
+            f"{self.config['url']}/discovery/resources",
+            params=params,
+            headers=await self._headers("list"),
+        )
+        if response.status_code != 200:
+            raise ValueError(
+                f"Failed to list discovery resources: {response.status_code} {response.text}"
+            )
+        return ListDiscoveryResourcesResponse(**response.json())
+
+    async def aclose(self) -> None:
+        """Closes pooled connections."""
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+
+# Pooled connections belong to the event loop that opened them, so clients
+# are registered per loop and disappear with it.
+_registry: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Tuple[str, int], PooledFacilitatorClient]]" = weakref.WeakKeyDictionary()
+_pool_options: Dict[str, Any] = {}
+
+
+def configure_facilitator_pool(**options: Any) -> None:
+    """Sets ``PooledFacilitatorClient`` options for clients created afterwards.
+
+    Accepts the keyword arguments of ``PooledFacilitatorClient`` other than
+    ``config`` (``max_connections``, ``max_keepalive_connections``,
+    ``keepalive_expiry``, ``timeout``, ``http2``).
+    """
+    _pool_options.clear()
+    _pool_options.update(options)
+
+
+def get_facilitator_client(
+    config: Optional[FacilitatorConfig] = None,
+) -> PooledFacilitatorClient:
+    """Returns the shared pooled client for a facilitator config.
+
+    Clients are created lazily, one per (url, header factory) and event loop,
+    and reused by every caller with the same config.
+    """
+    config = config or {"url": DEFAULT_FACILITATOR_URL}
+    url = config.get("url", DEFAULT_FACILITATOR_URL).rstrip("/")
+    key = (url, id(config.get("create_headers")))
+    clients = _registry.setdefault(asyncio.get_running_loop(), {})
+    client = clients.get(key)
+    if client is None:
+        client = clients[key] = PooledFacilitatorClient(config, **_pool_options)
+    return client
+
+
+async def close_facilitator_clients() -> None:
+    """Closes the shared clients of the running event loop (call at shutdown)."""
+    clients = _registry.pop(asyncio.get_running_loop(), {})
+    await asyncio.gather(*(client.aclose() for client in clients.values()))
@@ -0,0 +1,193 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Indexed lookup of the payment requirement a payload was signed for."""
+
+import asyncio
+from typing import (
+    Awaitable,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    overload,
+)
+
+from ..types import PaymentPayload, PaymentRequirements
+from .eip3009 import eip712_domain, recover_authorization_signer
+
+PayeeKey = Tuple[str, str, str]
+# Recovers the signer of a payload over a requirement's EIP-712 domain, or
+# returns None if it cannot be recovered.
+SignerRecovery = Callable[
+    [PaymentPayload, PaymentRequirements], Awaitable[Optional[str]]
+]
+
+
+def _recover_signer(
+    payload: PaymentPayload, requirement: PaymentRequirements
+) -> Optional[str]:
+    domain = eip712_domain(requirement)
+    if domain is None:
+        return None
+    try:
+        return recover_authorization_signer(payload, domain)
+    except Exception:
+        return None
+
+
+async def _recover_signer_in_thread(
+    payload: PaymentPayload, requirement: PaymentRequirements
+) -> Optional[str]:
+    return await asyncio.get_running_loop().run_in_executor(
+        None, _recover_signer, payload, requirement
+    )
+
+
+class PaymentRequirementsIndex(Sequence[PaymentRequirements]):
+    """An accepts array indexed for O(1) matching of submitted payments.
+
+    Built once when the 402 is issued and stored in place of the plain list;
+    it is still a sequence, so every store backend accepts it unchanged.
+    An ``exact`` payload names the payee (``authorization.to``) but not the
+    asset, which is only bound by the signature, so payloads resolve through
+    (scheme, network, pay_to) to the few requirements that share a payee.
+    Tiers are compared within one asset only, since atomic amounts of tokens
+    with different decimals are not comparable. When the payment covers a
+    tier in more than one asset, the asset is the one whose EIP-712 domain
+    the signature recovers to ``authorization.from``; ``match_async`` does
+    that recovery off the event loop.
+
+    Example:
+        index = PaymentRequirementsIndex(accepts)
+        requirement = index.match(payment_payload)
+    """
+
+    __slots__ = ("_requirements", "_by_payee")
+
+    def __init__(self, requirements: Sequence[PaymentRequirements]):
+        self._requirements: Tuple[PaymentRequirements, ...] = tuple(requirements)
+        # payee key -> asset -> tiers, assets in the order they were offered
+        self._by_payee: Dict[PayeeKey, Dict[str, List[PaymentRequirements]]] = {}
+        for requirement in self._requirements:
+            key = (
+                requirement.scheme,
+                requirement.network,
+                requirement.pay_to.lower(),
+            )
+            assets = self._by_payee.setdefault(key, {})
+            assets.setdefault(requirement.asset.lower(), []).append(requirement)
+        for assets in self._by_payee.values():
+            for tiers in assets.values():
+                # Highest tier first, so a match is the best tier the payment covers.
+                tiers.sort(key=lambda r: int(r.max_amount_required), reverse=True)
+
+    @classmethod
+    def of(
+        cls, requirements: Sequence[PaymentRequirements]
+    ) -> "PaymentRequirementsIndex":
+        """Returns ``requirements`` as an index, building one only if needed."""
+        if isinstance(requirements, cls):
+            return requirements
+        return cls(requirements)
+
+    def _assets(self, payload: PaymentPayload) -> Dict[str, List[PaymentRequirements]]:
+        key = (
+            payload.scheme,
+            payload.network,
+            payload.payload.authorization.to.lower(),
+        )
+        return self._by_payee.get(key, {})
+
+    def candidates(self, payload: PaymentPayload) -> List[PaymentRequirements]:
+        """Returns the requirements with the payload's scheme, network and payee."""
+        return [r for tiers in self._assets(payload).values() for r in tiers]
+
+    def _covered(self, payload: PaymentPayload) -> List[PaymentRequirements]:
+        """Returns the best tier the payload's value covers in each asset."""
+        try:
+            value = int(payload.payload.authorization.value)
+        except ValueError:
+            return []
+        covered = []
+        for tiers in self._assets(payload).values():
+            for requirement in tiers:
+                if value >= int(requirement.max_amount_required):
+                    covered.append(requirement)
+                    break
+        return covered
+
+    def match(self, payload: PaymentPayload) -> Optional[PaymentRequirements]:
+        """Returns the requirement the payload pays for, if its value covers it."""
+        covered = self._covered(payload)
+        if len(covered) <= 1:
+            return covered[0] if covered else None
+        signers = [_recover_signer(payload, requirement) for requirement in covered]
+        return self._signed_asset(payload, covered, signers)
+
+    async def match_async(
+        self, payload: PaymentPayload, recover: Optional[SignerRecovery] = None
+    ) -> Optional[PaymentRequirements]:
+        """``match`` with signer recovery, needed only to break ties, off the loop.
+
+        Args:
+            payload: Submitted payment payload
+            recover: Signer recovery to use (defaults to eth-account in the
+                loop's default executor)
+        """
+        covered = self._covered(payload)
+        if len(covered) <= 1:
+            return covered[0] if covered else None
+        recover = recover or _recover_signer_in_thread
+        signers = await asyncio.gather(
+            *(recover(payload, requirement) for requirement in covered)
+        )
+        return self._signed_asset(payload, covered, signers)
+
+    @staticmethod
+    def _signed_asset(
+        payload: PaymentPayload,
+        covered: List[PaymentRequirements],
+        signers: Sequence[Optional[str]],
+    ) -> PaymentRequirements:
+        """Picks the asset whose domain the signature was made over.
+
+        Falls back to the first asset offered when none recovers to the
+        payer; verification then decides.
+        """
+        payer = payload.payload.authorization.from_.lower()
+        for requirement, signer in zip(covered, signers):
+            if signer is not None and signer.lower() == payer:
+                return requirement
+        return covered[0]
+
+    @overload
+    def __getitem__(self, index: int) -> PaymentRequirements: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> Sequence[PaymentRequirements]: ...
+
+    def __getitem__(self, index):
+        return self._requirements[index]
+
+    def __len__(self) -> int:
+        return len(self._requirements)
+
+    def __iter__(self) -> Iterator[PaymentRequirements]:
+        return iter(self._requirements)
+
+    def __repr__(self) -> str:
+        return f"PaymentRequirementsIndex({list(self._requirements)!r})"
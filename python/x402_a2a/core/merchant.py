@@ -13,11 +13,99 @@
 # limitations under the License.
 """Payment requirements creation functions."""
 
-from typing import Optional, Any, cast
+from collections import OrderedDict
+from typing import Optional, Any, Dict, Tuple, cast
 from x402.common import process_price_to_atomic_amount
 from x402.types import Price
 from ..types import PaymentRequirements, SupportedNetworks
 
+ResolvedPrice = Tuple[str, str, Dict[str, str]]
+
+
+class PriceResolutionCache:
+    """Bounded LRU memo of resolved prices.
+
+    Resolving a money price parses it as a Decimal and looks up the
+    network's chain id, default stablecoin, its decimals and EIP-712 domain
+    on every call, although a merchant only ever quotes a handful of prices.
+    Money prices are always quoted in the network's default stablecoin, so
+    entries are keyed by (price, network) and hold the atomic amount, asset
+    address and domain. Token amounts already carry their asset and are
+    resolved directly.
+
+    Asset tables (``x402.chains``) are read once per entry, so call
+    ``invalidate_price_cache()`` after changing them.
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        """Initialize the cache.
+
+        Args:
+            max_entries: Resolved prices kept before the least recently used
+                ones are evicted
+        """
+        self._max_entries = max_entries
+        # (price, network) -> resolved price, least recently used first
+        self._entries: "OrderedDict[Tuple[Price, str], ResolvedPrice]" = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+
+    def resolve(self, price: Price, network: str) -> ResolvedPrice:
+        """Returns (max_amount_required, asset_address, eip712_domain)."""
+        if not isinstance(price, (str, int)):
+            return process_price_to_atomic_amount(price, network)
+        key = (price, network)
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._hits += 1
+            self._entries.move_to_end(key)
+        else:
+            self._misses += 1
+            entry = process_price_to_atomic_amount(price, network)
+            self._entries[key] = entry
+            if len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+        amount, asset, domain = entry
+        # Requirements keep the domain as ``extra``; hand out a copy.
+        return amount, asset, dict(domain)
+
+    def invalidate(self, network: Optional[str] = None) -> None:
+        """Drops every entry, or only those for ``network``."""
+        if network is None:
+            self._entries.clear()
+            return
+        for key in [key for key in self._entries if key[1] == network]:
+            del self._entries[key]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "hits": self._hits,
+            "misses": self._misses,
+        }
+
+
+_price_cache = PriceResolutionCache()
+
+
+def resolve_price(price: Price, network: str) -> ResolvedPrice:
+    """Resolves a price to its atomic amount, asset and EIP-712 domain, memoized."""
+    return _price_cache.resolve(price, network)
+
+
+def invalidate_price_cache(network: Optional[str] = None) -> None:
+    """Forgets resolved prices after the asset tables have changed.
+
+    Args:
+        network: Only forget prices on this network (default: all)
+    """
+    _price_cache.invalidate(network)
+
+
+def price_cache_stats() -> Dict[str, Any]:
+    """Returns the price resolution cache's size and hit counters."""
+    return _price_cache.stats()
+
 
 def create_payment_requirements(
     price: Price,
@@ -51,9 +139,7 @@ def create_payment_requirements(
         PaymentRequirements object ready for x402PaymentRequiredResponse
     """
 
-    max_amount_required, asset_address, eip712_domain = process_price_to_atomic_amount(
-        price, network
-    )
+    max_amount_required, asset_address, eip712_domain = resolve_price(price, network)
 
     return PaymentRequirements(
         scheme=scheme,
@@ -22,6 +22,7 @@ from ..types import (
     VerifyResponse,
     FacilitatorClient,
 )
+from .facilitator import get_facilitator_client
 
 
 async def verify_payment(
@@ -34,13 +35,14 @@ async def verify_payment(
     Args:
         payment_payload: Signed payment authorization
         payment_requirements: Payment requirements to verify against
-        facilitator_client: Optional FacilitatorClient instance
+        facilitator_client: Optional FacilitatorClient instance (defaults to
+            the shared pooled client for the default facilitator)
 
     Returns:
         VerifyResponse with is_valid status and invalid_reason if applicable
     """
     if facilitator_client is None:
-        facilitator_client = FacilitatorClient()
+        facilitator_client = get_facilitator_client()
 
     return await facilitator_client.verify(payment_payload, payment_requirements)
 
@@ -55,13 +57,14 @@ async def settle_payment(
     Args:
         payment_payload: Signed payment authorization
         payment_requirements: Payment requirements for settlement
-        facilitator_client: Optional FacilitatorClient instance
+        facilitator_client: Optional FacilitatorClient instance (defaults to
+            the shared pooled client for the default facilitator)
 
     Returns:
         SettleResponse with settlement result and transaction hash
     """
     if facilitator_client is None:
-        facilitator_client = FacilitatorClient()
+        facilitator_client = get_facilitator_client()
 
     # Call facilitator to settle payment
     settle_response = await facilitator_client.settle(
@@ -0,0 +1,250 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Batched, multi-process signer recovery for EIP-3009 authorizations."""
+
+import asyncio
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from eth_account import Account
+from eth_account.messages import SignableMessage, encode_typed_data
+from eth_utils import keccak, to_checksum_address
+
+from ..types import (
+    PaymentPayload,
+    PaymentRequirements,
+    PaymentVerificationError,
+)
+from .batching import _MicroBatcher
+from .eip3009 import (
+    TRANSFER_WITH_AUTHORIZATION_TYPES,
+    check_exact_authorization,
+    eip712_domain,
+    transfer_with_authorization_message,
+)
+
+try:
+    import coincurve
+except ImportError:  # pragma: no cover - optional native backend
+    coincurve = None
+
+# (domain, message, signature) with plain values, cheap to send to a worker.
+RecoveryJob = Tuple[Dict[str, Any], Dict[str, Any], str]
+
+
+def native_backend_available() -> bool:
+    """Returns True if the libsecp256k1 bindings (coincurve) are installed."""
+    return coincurve is not None
+
+
+def _eip191_digest(signable: SignableMessage) -> bytes:
+    """Returns the EIP-191 hash that was signed (0x19 || version || header || body)."""
+    return keccak(b"\x19" + signable.version + signable.header + signable.body)
+
+
+def _recover_one(job: RecoveryJob, native: bool) -> Optional[str]:
+    domain, message, signature = job
+    try:
+        signable = encode_typed_data(
+            domain_data=domain,
+            message_types=TRANSFER_WITH_AUTHORIZATION_TYPES,
+            message_data=message,
+        )
+        if not native:
+            return Account.recover_message(signable, signature=signature)
+
+        digest = _eip191_digest(signable)
+        raw = bytes.fromhex(signature.removeprefix("0x"))
+        if len(raw) != 65:
+            return None
+        v = raw[64] - 27 if raw[64] >= 27 else raw[64]
+        public_key = coincurve.PublicKey.from_signature_and_message(
+            raw[:64] + bytes([v]), digest, hasher=None
+        ).format(compressed=False)
+        return to_checksum_address(keccak(public_key[1:])[-20:])
+    except Exception:
+        return None
+
+
+def recover_signers(jobs: Sequence[RecoveryJob], native: bool) -> List[Optional[str]]:
+    """Recovers the signer of each job; unrecoverable signatures give None.
+
+    Module level so it can run in a worker process.
+    """
+    return [_recover_one(job, native) for job in jobs]
+
+
+def recovery_job(
+    payload: PaymentPayload, requirements: PaymentRequirements
+) -> Optional[RecoveryJob]:
+    """Extracts what signer recovery needs, or None if the domain is unknown."""
+    domain = eip712_domain(requirements)
+    if domain is None:
+        return None
+    message = transfer_with_authorization_message(payload.payload.authorization)
+    return domain, message, payload.payload.signature
+
+
+def _safe_recovery_job(
+    payload: PaymentPayload, requirements: PaymentRequirements
+) -> Optional[RecoveryJob]:
+    """``recovery_job`` that maps a malformed authorization to None.
+
+    Jobs are built for a whole batch at once, so one bad payload must not
+    fail its neighbours; it is reported as an unrecoverable signature.
+    """
+    try:
+        return recovery_job(payload, requirements)
+    except Exception:
+        return None
+
+
+class SignatureRecoveryEngine:
+    """Recovers EIP-712 signers in batches across a process pool.
+
+    secp256k1 recovery is the CPU hot spot of local verification and would
+    stall every other request on the event loop. The engine coalesces
+    concurrent ``pre_verify`` calls into batches (``max_batch_size`` or
+    ``max_delay``), splits each batch into one chunk per worker process and
+    awaits the results. With ``coincurve`` installed
+    (``pip install x402-a2a[native]``) recovery uses libsecp256k1; otherwise
+    it falls back to eth-account.
+
+    Example:
+        engine = SignatureRecoveryEngine(workers=4)
+        server = MyServerExecutor(
+            agent, config, local_verification=True, signature_engine=engine
+        )
+        ...
+        engine.close()  # on shutdown
+    """
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        max_batch_size: int = 256,
+        max_delay: float = 0.001,
+        native: Optional[bool] = None,
+        executor: Optional[Executor] = None,
+    ):
+        """Initialize the engine; the process pool starts on first use.
+
+        Args:
+            workers: Worker processes (defaults to the CPU count)
+            max_batch_size: Recoveries that trigger an immediate dispatch
+            max_delay: Longest time, in seconds, a recovery waits for a batch
+            native: Force the coincurve backend on or off (defaults to
+                whether it is installed)
+            executor: Optional executor to use instead of a process pool
+        """
+        if native and coincurve is None:
+            raise ImportError(
+                "The native backend requires coincurve. "
+                "Install it with: pip install x402-a2a[native]"
+            )
+        self._workers = workers or os.cpu_count() or 1
+        self._native = native_backend_available() if native is None else native
+        self._executor = executor
+        self._owns_executor = executor is None
+        self._batcher = _MicroBatcher[Optional[str]](
+            None, self._recover_pairs, max_batch_size, max_delay
+        )
+
+    @property
+    def native(self) -> bool:
+        return self._native
+
+    def _ensure_executor(self) -> Executor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self._workers)
+        return self._executor
+
+    async def recover_batch(self, jobs: Sequence[RecoveryJob]) -> List[Optional[str]]:
+        """Recovers signers for a batch, one chunk per worker."""
+        if not jobs:
+            return []
+        executor = self._ensure_executor()
+        loop = asyncio.get_running_loop()
+        chunk_size = -(-len(jobs) // self._workers)
+        chunks = [jobs[i : i + chunk_size] for i in range(0, len(jobs), chunk_size)]
+        results = await asyncio.gather(
+            *(
+                loop.run_in_executor(executor, recover_signers, chunk, self._native)
+                for chunk in chunks
+            )
+        )
+        return [signer for chunk in results for signer in chunk]
+
+    async def _recover_pairs(
+        self, pairs: List[Tuple[PaymentPayload, PaymentRequirements]]
+    ) -> List[Optional[str]]:
+        jobs = [
+            _safe_recovery_job(payload, requirements) for payload, requirements in pairs
+        ]
+        recoverable = [job for job in jobs if job is not None]
+        signers = iter(await self.recover_batch(recoverable))
+        return [next(signers) if job is not None else None for job in jobs]
+
+    async def recover_signer(
+        self, payload: PaymentPayload, requirements: PaymentRequirements
+    ) -> Optional[str]:
+        """Recovers the payload's signer over the requirement's domain in the pool.
+
+        Returns:
+            The signer, or None if the domain is unknown or the signature
+            cannot be recovered
+        """
+        if eip712_domain(requirements) is None:
+            return None
+        return await self._batcher.submit(payload, requirements)
+
+    async def pre_verify(
+        self, payload: PaymentPayload, requirements: PaymentRequirements
+    ) -> Optional[str]:
+        """Async equivalent of ``pre_verify_exact_payment``.
+
+        Field checks run inline; signer recovery runs in the pool.
+
+        Returns:
+            The recovered payer address, or None if the signature was not checked
+
+        Raises:
+            PaymentVerificationError: With the x402 error code for the failure
+        """
+        if requirements.scheme != "exact" or payload.scheme != "exact":
+            return None
+        check_exact_authorization(payload, requirements)
+        if eip712_domain(requirements) is None:
+            return None
+
+        signer = await self._batcher.submit(payload, requirements)
+        if signer is None:
+            raise PaymentVerificationError("Malformed signature")
+        if signer.lower() != payload.payload.authorization.from_.lower():
+            raise PaymentVerificationError(
+                "Signature does not match authorization.from"
+            )
+        return signer
+
+    def close(self) -> None:
+        """Shuts down the process pool if the engine created it."""
+        if self._owns_executor and self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def stats(self) -> Dict[str, float]:
+        return {"workers": self._workers, "native": int(self._native)} | (
+            self._batcher.stats()
+        )
@@ -0,0 +1,202 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Redis-protocol payment requirements store shared across worker processes."""
+
+import json
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from ..types import PaymentRequirements
+from .store import PaymentRequirementsStore, requirements_ttl
+
+
+class RedisPaymentRequirementsStore(PaymentRequirementsStore):
+    """Stores issued payment requirements in Redis.
+
+    Lets a 402 issued by one uvicorn/gunicorn worker be correlated with a
+    payment submission that lands on another. Every operation costs exactly
+    one network round trip: writes pipeline SET and EXPIRE together, reads
+    are a single GET.
+
+    Example:
+        import redis.asyncio as redis
+
+        store = RedisPaymentRequirementsStore(redis.from_url("redis://cache:6379/0"))
+        server = MyServerExecutor(agent, config, requirements_store=store)
+    """
+
+    def __init__(
+        self,
+        client: Optional[Any] = None,
+        url: str = "redis://localhost:6379/0",
+        key_prefix: str = "x402:requirements:",
+        default_ttl_seconds: int = 600,
+    ):
+        """Initialize the store.
+
+        Args:
+            client: Async Redis client (``redis.asyncio.Redis`` or compatible);
+                created from ``url`` when omitted
+            url: Connection URL used when no client is supplied
+            key_prefix: Namespace prepended to task ids
+            default_ttl_seconds: TTL used when no requirement carries a timeout
+        """
+        if client is None:
+            try:
+                import redis.asyncio as redis
+            except ImportError as e:
+                raise ImportError(
+                    "RedisPaymentRequirementsStore requires the 'redis' package. "
+                    "Install it with: pip install 'x402-a2a[redis]'"
+                ) from e
+            client = redis.from_url(url)
+
+        self._client = client
+        self._key_prefix = key_prefix
+        self._default_ttl = default_ttl_seconds
+
+        self._hits = 0
+        self._misses = 0
+        self._round_trips = 0
+
+    def _key(self, task_id: str) -> str:
+        return f"{self._key_prefix}{task_id}"
+
+    async def get(self, task_id: str) -> Optional[Sequence[PaymentRequirements]]:
+        self._round_trips += 1
+        raw = await self._client.get(self._key(task_id))
+        if raw is None:
+            self._misses += 1
+            return None
+
+        self._hits += 1
+        return [PaymentRequirements.model_validate(r) for r in json.loads(raw)]
+
+    async def put(
+        self, task_id: str, requirements: Sequence[PaymentRequirements]
+    ) -> None:
+        key = self._key(task_id)
+        value = json.dumps(
+            [r.model_dump(mode="json", by_alias=True) for r in requirements],
+            separators=(",", ":"),
+        )
+        ttl = int(requirements_ttl(requirements, self._default_ttl))
+
+        pipe = self._client.pipeline(transaction=False)
+        pipe.set(key, value)
+        pipe.expire(key, ttl)
+        self._round_trips += 1
+        await pipe.execute()
+
+    async def delete(self, task_id: str) -> None:
+        self._round_trips += 1
+        await self._client.delete(self._key(task_id))
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self._hits,
+            "misses": self._misses,
+            "round_trips": self._round_trips,
+        }
+
+
+class _LocalPipeline:
+    """Queues commands and applies them in one call, like a Redis pipeline."""
+
+    def __init__(self, server: "LocalRedis"):
+        self._server = server
+        self._commands: List[Tuple[str, tuple, dict]] = []
+
+    def get(self, *args, **kwargs) -> "_LocalPipeline":
+        self._commands.append(("get", args, kwargs))
+        return self
+
+    def set(self, *args, **kwargs) -> "_LocalPipeline":
+        self._commands.append(("set", args, kwargs))
+        return self
+
+    def expire(self, *args, **kwargs) -> "_LocalPipeline":
+        self._commands.append(("expire", args, kwargs))
+        return self
+
+    def delete(self, *args, **kwargs) -> "_LocalPipeline":
+        self._commands.append(("delete", args, kwargs))
+        return self
+
+    async def execute(self) -> List[Any]:
+        self._server.round_trips += 1
+        commands, self._commands = self._commands, []
+        return [getattr(self._server, f"_{name}")(*a, **kw) for name, a, kw in commands]
+
+
+class LocalRedis:
+    """In-process stand-in for the subset of the async Redis API the store uses.
+
+    Intended for tests and single-process development; it is not shared
+    between processes. ``round_trips`` counts the calls that would have hit
+    the network against a real server.
+    """
+
+    def __init__(self):
+        self._data: Dict[str, Tuple[bytes, Optional[float]]] = {}
+        self.round_trips = 0
+
+    def _live(self, key: str) -> Optional[bytes]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._data[key]
+            return None
+        return value
+
+    def _get(self, key: str) -> Optional[bytes]:
+        return self._live(key)
+
+    def _set(self, key: str, value: Any, ex: Optional[int] = None) -> bool:
+        if isinstance(value, str):
+            value = value.encode()
+        expires_at = time.monotonic() + ex if ex is not None else None
+        self._data[key] = (value, expires_at)
+        return True
+
+    def _expire(self, key: str, seconds: int) -> bool:
+        value = self._live(key)
+        if value is None:
+            return False
+        self._data[key] = (value, time.monotonic() + seconds)
+        return True
+
+    def _delete(self, *keys: str) -> int:
+        return sum(1 for key in keys if self._data.pop(key, None) is not None)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        self.round_trips += 1
+        return self._get(key)
+
+    async def set(self, key: str, value: Any, ex: Optional[int] = None) -> bool:
+        self.round_trips += 1
+        return self._set(key, value, ex)
+
+    async def expire(self, key: str, seconds: int) -> bool:
+        self.round_trips += 1
+        return self._expire(key, seconds)
+
+    async def delete(self, *keys: str) -> int:
+        self.round_trips += 1
+        return self._delete(*keys)
+
+    def pipeline(self, transaction: bool = True) -> _LocalPipeline:
+        return _LocalPipeline(self)
@@ -0,0 +1,330 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Local replay detection for EIP-3009 authorization nonces."""
+
+import asyncio
+import hashlib
+import heapq
+import math
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from ..types import PaymentPayload, PaymentRequirements
+
+
+def nonce_key(payload: PaymentPayload, requirements: PaymentRequirements) -> str:
+    """Returns the replay key for a payment: network, payer, asset and nonce.
+
+    The network is included because the same token address on two chains is
+    two different contracts, each with its own nonce space.
+    """
+    authorization = payload.payload.authorization
+    return "|".join(
+        (
+            requirements.network,
+            authorization.from_.lower(),
+            requirements.asset.lower(),
+            authorization.nonce.lower(),
+        )
+    )
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over string keys.
+
+    Answers "definitely not seen" in O(1) without touching the exact set.
+    Bloom filters cannot forget, so ``NonceReplayIndex`` rebuilds it from the
+    live nonces once it has absorbed ``capacity`` insertions.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        if capacity <= 0:
+            raise ValueError("capacity must be greater than 0")
+        if not 0 < error_rate < 1:
+            raise ValueError("error_rate must be between 0 and 1")
+        self.capacity = capacity
+        self._size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self._hashes = max(1, round(self._size / capacity * math.log(2)))
+        self._bits = bytearray((self._size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: str) -> Iterable[int]:
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self._hashes):
+            yield (h1 + i * h2) % self._size
+
+    def add(self, key: str) -> None:
+        for position in self._positions(key):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        return all(
+            self._bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(key)
+        )
+
+
+class NonceSet(ABC):
+    """Exact set of used nonces, each remembered until it expires."""
+
+    # True if operations do I/O, so the index runs them in a worker thread.
+    blocking = False
+
+    @abstractmethod
+    def add_if_absent(self, key: str, expires_at: float) -> bool:
+        """Adds a key unless a live entry exists; returns True if added."""
+        raise NotImplementedError
+
+    def add_new(self, key: str, expires_at: float) -> bool:
+        """Adds a key the Bloom filter has never seen in this process.
+
+        Backends that are private to the process may skip the existence
+        check; shared backends keep it, since other workers may have added
+        the key. Returns True if added.
+        """
+        return self.add_if_absent(key, expires_at)
+
+    @abstractmethod
+    def discard(self, key: str) -> None:
+        """Forgets a key."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def live_keys(self) -> List[str]:
+        """Returns the keys that have not expired."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+
+class InMemoryNonceSet(NonceSet):
+    """Process-local nonce set; expired entries are purged on insert."""
+
+    # Expired entries removed from the heap on each insert.
+    _SWEEP_BATCH = 8
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: Dict[str, float] = {}
+        # (expires_at, key); stale heap items are skipped when popped.
+        self._expiry: List[Tuple[float, str]] = []
+
+    def _sweep(self, now: float) -> None:
+        for _ in range(self._SWEEP_BATCH):
+            if not self._expiry or self._expiry[0][0] > now:
+                return
+            expires_at, key = heapq.heappop(self._expiry)
+            if self._entries.get(key) == expires_at:
+                del self._entries[key]
+
+    def add_if_absent(self, key: str, expires_at: float) -> bool:
+        now = time.time()
+        with self._lock:
+            self._sweep(now)
+            current = self._entries.get(key)
+            if current is not None and current > now:
+                return False
+            self._entries[key] = expires_at
+            heapq.heappush(self._expiry, (expires_at, key))
+            return True
+
+    def add_new(self, key: str, expires_at: float) -> bool:
+        with self._lock:
+            self._sweep(time.time())
+            self._entries[key] = expires_at
+            heapq.heappush(self._expiry, (expires_at, key))
+            return True
+
+    def discard(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def live_keys(self) -> List[str]:
+        now = time.time()
+        with self._lock:
+            return [
+                key for key, expires_at in self._entries.items() if expires_at > now
+            ]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteNonceSet(NonceSet):
+    """Nonce set persisted in SQLite (WAL) so replays are caught across restarts."""
+
+    blocking = True
+
+    _SCHEMA = """
+    CREATE TABLE IF NOT EXISTS used_nonces (
+        nonce_key TEXT PRIMARY KEY,
+        expires_at REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS used_nonces_expires_at ON used_nonces (expires_at);
+    """
+
+    # Replaces an expired row; a live row leaves the insert a no-op.
+    _ADD = """
+    INSERT INTO used_nonces (nonce_key, expires_at) VALUES (?, ?)
+    ON CONFLICT (nonce_key) DO UPDATE SET expires_at = excluded.expires_at
+    WHERE used_nonces.expires_at <= ?
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            path, check_same_thread=False, isolation_level=None
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.executescript(self._SCHEMA)
+
+    def add_if_absent(self, key: str, expires_at: float) -> bool:
+        with self._lock:
+            cursor = self._conn.execute(self._ADD, (key, expires_at, time.time()))
+            return cursor.rowcount == 1
+
+    def discard(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM used_nonces WHERE nonce_key = ?", (key,))
+
+    def live_keys(self) -> List[str]:
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM used_nonces WHERE expires_at <= ?", (time.time(),)
+            )
+            rows = self._conn.execute("SELECT nonce_key FROM used_nonces").fetchall()
+        return [row[0] for row in rows]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM used_nonces").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class NonceReplayIndex:
+    """Rejects a payment whose (payer, asset, nonce) has already been used.
+
+    A Bloom filter sits in front of an exact ``NonceSet``: a nonce the filter
+    has never seen is recorded without an exact lookup, and only possible
+    repeats pay for one. ``SQLiteNonceSet`` keeps replays detectable across
+    restarts (the filter is rebuilt from it on startup) and keeps its
+    existence check, so the file can be shared by several workers; its
+    queries run in a worker thread rather than on the event loop. Nonces
+    are remembered until the authorization's ``validBefore`` plus
+    ``grace_seconds``; after that the token contract rejects the
+    authorization on its own.
+
+    Example:
+        index = NonceReplayIndex(SQLiteNonceSet("/var/lib/merchant/nonces.db"))
+        server = MyServerExecutor(agent, config, replay_index=index)
+    """
+
+    def __init__(
+        self,
+        nonce_set: Optional[NonceSet] = None,
+        capacity: int = 100_000,
+        error_rate: float = 0.001,
+        grace_seconds: float = 60.0,
+    ):
+        """Initialize the index.
+
+        Args:
+            nonce_set: Exact backing set (defaults to an in-memory set)
+            capacity: Minimum insertions the Bloom filter absorbs before a
+                rebuild; it grows to twice the live nonces when they exceed it
+            error_rate: Target false positive rate of the Bloom filter
+            grace_seconds: How long past ``validBefore`` a nonce is kept
+        """
+        self._nonces = nonce_set if nonce_set is not None else InMemoryNonceSet()
+        self._capacity = capacity
+        self._error_rate = error_rate
+        self._grace = grace_seconds
+        self._bloom = self._rebuild()
+
+        self._filtered = 0
+        self._checked = 0
+        self._duplicates = 0
+
+    def _rebuild(self) -> BloomFilter:
+        live = self._nonces.live_keys()
+        # Headroom for as many inserts again keeps rebuilds amortized O(1).
+        bloom = BloomFilter(max(self._capacity, 2 * len(live)), self._error_rate)
+        for key in live:
+            bloom.add(key)
+        return bloom
+
+    async def _call(self, fn, *args):
+        """Runs a nonce set operation, off the event loop if it blocks."""
+        if not self._nonces.blocking:
+            return fn(*args)
+        return await asyncio.get_running_loop().run_in_executor(None, fn, *args)
+
+    async def reserve(
+        self, payload: PaymentPayload, requirements: PaymentRequirements
+    ) -> bool:
+        """Marks the payment's nonce as used.
+
+        Returns:
+            False if the nonce was already used and the payment is a replay
+        """
+        key = nonce_key(payload, requirements)
+        try:
+            valid_before = float(payload.payload.authorization.valid_before)
+        except ValueError:
+            valid_before = time.time()
+        expires_at = valid_before + self._grace
+
+        if key in self._bloom:
+            self._checked += 1
+            added = await self._call(self._nonces.add_if_absent, key, expires_at)
+        else:
+            self._filtered += 1
+            added = await self._call(self._nonces.add_new, key, expires_at)
+        if not added:
+            self._duplicates += 1
+            return False
+
+        if self._bloom.count >= self._bloom.capacity:
+            self._bloom = await self._call(self._rebuild)
+        else:
+            self._bloom.add(key)
+        return True
+
+    async def release(
+        self, payload: PaymentPayload, requirements: PaymentRequirements
+    ) -> None:
+        """Forgets a nonce whose payment was rejected before it could be used."""
+        await self._call(self._nonces.discard, nonce_key(payload, requirements))
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self._nonces),
+            "bloom_filtered": self._filtered,
+            "exact_checks": self._checked,
+            "duplicates": self._duplicates,
+        }
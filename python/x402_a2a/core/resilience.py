@@ -0,0 +1,294 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Deadlines, hedging and circuit breaking around facilitator calls."""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, TypeVar
+
+from ..types import (
+    FacilitatorClient,
+    FacilitatorUnavailableError,
+    PaymentPayload,
+    PaymentRequirements,
+    SettleResponse,
+    VerifyResponse,
+)
+
+
+logger = logging.getLogger(__name__)
+
+R = TypeVar("R")
+
+StateChangeHook = Callable[[str, str], None]
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker.
+
+    ``closed``: calls pass. After ``failure_threshold`` consecutive failures
+    it goes ``open`` and rejects calls for ``reset_timeout`` seconds, then
+    ``half_open``, where a single trial call decides between closing again
+    and reopening.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        on_state_change: Optional[StateChangeHook] = None,
+    ):
+        if failure_threshold <= 0:
+            raise ValueError("failure_threshold must be greater than 0")
+        self._failure_threshold = failure_threshold
+        self._reset_timeout = reset_timeout
+        self._on_state_change = on_state_change
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self.transitions: Dict[str, int] = {
+            self.CLOSED: 0,
+            self.OPEN: 0,
+            self.HALF_OPEN: 0,
+        }
+        self.rejected = 0
+
+    def _transition(self, state: str) -> None:
+        if state == self.state:
+            return
+        previous, self.state = self.state, state
+        self.transitions[state] += 1
+        logger.warning(f"Facilitator circuit {previous} -> {state}")
+        if self._on_state_change:
+            self._on_state_change(previous, state)
+
+    def allow(self) -> bool:
+        """Returns True if a call may proceed; counts a rejection otherwise."""
+        if self.state == self.OPEN:
+            if time.monotonic() - self._opened_at < self._reset_timeout:
+                self.rejected += 1
+                return False
+            self._transition(self.HALF_OPEN)
+        if self.state == self.HALF_OPEN:
+            if self._trial_in_flight:
+                self.rejected += 1
+                return False
+            self._trial_in_flight = True
+        return True
+
+    def record_success(self) -> None:
+        self._failures = 0
+        self._trial_in_flight = False
+        self._transition(self.CLOSED)
+
+    def release(self) -> None:
+        """Ends a call that neither succeeded nor failed (it was cancelled)."""
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        was_trial, self._trial_in_flight = self._trial_in_flight, False
+        if was_trial or self._failures >= self._failure_threshold:
+            self._opened_at = time.monotonic()
+            self._transition(self.OPEN)
+
+
+class _LatencyWindow:
+    """Rolling window of recent latencies for percentile estimates."""
+
+    def __init__(self, size: int):
+        self._samples: Deque[float] = deque(maxlen=size)
+
+    def add(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def percentile(self, p: float) -> float:
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(p * len(ordered)))]
+
+
+class ResilientFacilitatorClient(FacilitatorClient):
+    """FacilitatorClient with per-call deadlines, hedging and a circuit breaker.
+
+    - Every call runs under a deadline (``verify_timeout``/``settle_timeout``).
+    - A verify still pending after the ``hedge_percentile`` latency of recent
+      verifies gets one duplicate request; the first answer wins and the other
+      is cancelled. Settlement is never hedged, since a duplicate could submit
+      a second transaction.
+    - Timeouts and errors feed a circuit breaker; while it is open calls fail
+      immediately with ``FacilitatorUnavailableError``, which carries the
+      x402 error code reported to the client.
+
+    Example:
+        client = ResilientFacilitatorClient(FacilitatorClient(config))
+        response = await verify_payment(payload, requirements, client)
+    """
+
+    def __init__(
+        self,
+        client: FacilitatorClient,
+        verify_timeout: float = 5.0,
+        settle_timeout: float = 30.0,
+        hedge_percentile: Optional[float] = 0.95,
+        hedge_min_samples: int = 20,
+        latency_window: int = 256,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        on_state_change: Optional[StateChangeHook] = None,
+    ):
+        """Initialize the wrapper.
+
+        Args:
+            client: The facilitator client to protect
+            verify_timeout: Deadline in seconds for a verify, hedges included
+            settle_timeout: Deadline in seconds for a settle
+            hedge_percentile: Verify latency percentile after which a hedge is
+                sent (None disables hedging)
+            hedge_min_samples: Verifies observed before hedging starts
+            latency_window: Recent verify latencies kept for the percentile
+            failure_threshold: Consecutive failures that open the circuit
+            reset_timeout: Seconds the circuit stays open before a trial call
+            on_state_change: Optional callback receiving (old, new) states
+        """
+        self.config = getattr(client, "config", {})
+        self._client = client
+        self._verify_timeout = verify_timeout
+        self._settle_timeout = settle_timeout
+        self._hedge_percentile = hedge_percentile
+        self._hedge_min_samples = hedge_min_samples
+        self._latencies = _LatencyWindow(latency_window)
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout, on_state_change)
+
+        self._timeouts = 0
+        self._errors = 0
+        self._hedges = 0
+        self._hedge_wins = 0
+
+    def _hedge_delay(self) -> Optional[float]:
+        if self._hedge_percentile is None:
+            return None
+        if len(self._latencies) < self._hedge_min_samples:
+            return None
+        return self._latencies.percentile(self._hedge_percentile)
+
+    async def _timed(self, call: Callable[[], Awaitable[R]]) -> R:
+        start = time.monotonic()
+        result = await call()
+        self._latencies.add(time.monotonic() - start)
+        return result
+
+    async def _hedged(self, call: Callable[[], Awaitable[R]]) -> R:
+        delay = self._hedge_delay()
+        primary = asyncio.ensure_future(self._timed(call))
+        if delay is None:
+            return await primary
+
+        pending = {primary}
+        try:
+            done, _ = await asyncio.wait(pending, timeout=delay)
+            if done:
+                return primary.result()
+
+            self._hedges += 1
+            hedge = asyncio.ensure_future(self._timed(call))
+            pending.add(hedge)
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for attempt in done:
+                    if attempt.exception() is None:
+                        if attempt is hedge:
+                            self._hedge_wins += 1
+                        return attempt.result()
+                    error = attempt.exception()
+            raise error
+        finally:
+            for attempt in pending:
+                attempt.cancel()
+
+    async def _call(
+        self, operation: str, timeout: float, call: Callable[[], Awaitable[R]]
+    ) -> R:
+        if not self.breaker.allow():
+            raise FacilitatorUnavailableError(
+                f"Facilitator circuit is open; {operation} rejected"
+            )
+        try:
+            async with asyncio.timeout(timeout):
+                result = await call()
+        except TimeoutError as e:
+            self._timeouts += 1
+            self.breaker.record_failure()
+            raise FacilitatorUnavailableError(
+                f"Facilitator {operation} timed out after {timeout}s"
+            ) from e
+        except asyncio.CancelledError:
+            # The caller gave up; that says nothing about the facilitator.
+            self.breaker.release()
+            raise
+        except Exception:
+            self._errors += 1
+            self.breaker.record_failure()
+            raise
+        self.breaker.record_success()
+        return result
+
+    async def verify(
+        self, payment: PaymentPayload, payment_requirements: PaymentRequirements
+    ) -> VerifyResponse:
+        return await self._call(
+            "verify",
+            self._verify_timeout,
+            lambda: self._hedged(
+                lambda: self._client.verify(payment, payment_requirements)
+            ),
+        )
+
+    async def settle(
+        self, payment: PaymentPayload, payment_requirements: PaymentRequirements
+    ) -> SettleResponse:
+        return await self._call(
+            "settle",
+            self._settle_timeout,
+            lambda: self._client.settle(payment, payment_requirements),
+        )
+
+    async def list(self, request=None):
+        return await self._client.list(request)
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns breaker state transitions and call outcome counters."""
+        return {
+            "state": self.breaker.state,
+            "opened": self.breaker.transitions[CircuitBreaker.OPEN],
+            "half_opened": self.breaker.transitions[CircuitBreaker.HALF_OPEN],
+            "closed": self.breaker.transitions[CircuitBreaker.CLOSED],
+            "rejected": self.breaker.rejected,
+            "timeouts": self._timeouts,
+            "errors": self._errors,
+            "hedges": self._hedges,
+            "hedge_wins": self._hedge_wins,
+        }
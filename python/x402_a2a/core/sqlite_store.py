@@ -0,0 +1,381 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Durable SQLite store for in-flight payment state."""
+
+import asyncio
+import json
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from ..types import (
+    PaymentPayload,
+    PaymentRequirements,
+    SettleResponse,
+    VerifyResponse,
+)
+from .store import PaymentRequirementsStore, PendingSettlement, requirements_ttl
+
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS payment_state (
+    task_id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    requirements TEXT,
+    expires_at REAL,
+    payment_payload TEXT,
+    payment_requirement TEXT,
+    verify_response TEXT,
+    settle_response TEXT,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS payment_state_status ON payment_state (status);
+"""
+
+_PUT = """
+INSERT INTO payment_state (task_id, status, requirements, expires_at, updated_at)
+VALUES (?, 'required', ?, ?, ?)
+ON CONFLICT (task_id) DO UPDATE SET
+    status = 'required',
+    requirements = excluded.requirements,
+    expires_at = excluded.expires_at,
+    payment_payload = NULL,
+    payment_requirement = NULL,
+    verify_response = NULL,
+    settle_response = NULL,
+    updated_at = excluded.updated_at
+"""
+
+_RECORD_VERIFIED = """
+INSERT INTO payment_state (
+    task_id, status, payment_payload, payment_requirement, verify_response,
+    updated_at
+)
+VALUES (?, 'verified', ?, ?, ?, ?)
+ON CONFLICT (task_id) DO UPDATE SET
+    status = 'verified',
+    payment_payload = excluded.payment_payload,
+    payment_requirement = excluded.payment_requirement,
+    verify_response = excluded.verify_response,
+    updated_at = excluded.updated_at
+"""
+
+_RECORD_SETTLEMENT = """
+INSERT INTO payment_state (task_id, status, settle_response, updated_at)
+VALUES (?, ?, ?, ?)
+ON CONFLICT (task_id) DO UPDATE SET
+    status = excluded.status,
+    settle_response = excluded.settle_response,
+    payment_payload = NULL,
+    updated_at = excluded.updated_at
+"""
+
+# Resolved tasks keep their settlement record; only unpaid 402s are removed.
+_DELETE_UNPAID = "DELETE FROM payment_state WHERE task_id = ? AND status = 'required'"
+_CLEAR_REQUIREMENTS = (
+    "UPDATE payment_state SET requirements = NULL, expires_at = NULL WHERE task_id = ?"
+)
+
+_STOP = object()
+
+
+def _dump(model: Any) -> str:
+    return model.model_dump_json(by_alias=True)
+
+
+class SQLitePaymentStateStore(PaymentRequirementsStore):
+    """Embedded SQLite (WAL) backend that survives merchant restarts.
+
+    Persists the issued requirements, the verification result and the
+    settlement outcome of each task. Writes go through a single writer thread
+    that groups every statement queued while the previous commit was running
+    into one transaction (group commit), so sustained write rates in the
+    thousands per second cost one fsync per batch rather than per write.
+    Reads use a separate connection, which WAL mode lets run concurrently
+    with the writer.
+
+    Call ``x402ServerExecutor.recover_pending_settlements()`` at startup to
+    settle payments that were verified before a restart but never settled.
+
+    Example:
+        store = SQLitePaymentStateStore("/var/lib/merchant/payments.db")
+        server = MyServerExecutor(agent, config, requirements_store=store)
+        await server.recover_pending_settlements()
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_batch_size: int = 512,
+        max_commit_delay: float = 0.0,
+        default_ttl_seconds: float = 600.0,
+    ):
+        """Initialize the store and start its writer thread.
+
+        Args:
+            path: Database file path
+            max_batch_size: Maximum statements committed in one transaction
+            max_commit_delay: Seconds the writer lingers to grow a batch;
+                0 commits whatever is queued as soon as the writer is free
+            default_ttl_seconds: TTL used when no requirement carries a timeout
+        """
+        self.path = path
+        self._max_batch_size = max_batch_size
+        self._max_commit_delay = max_commit_delay
+        self._default_ttl = default_ttl_seconds
+
+        self._reader = self._connect()
+        self._reader.executescript(_SCHEMA)
+        self._reader_lock = threading.Lock()
+
+        self._queue: "queue.SimpleQueue[Any]" = queue.SimpleQueue()
+        self._writer = threading.Thread(
+            target=self._writer_loop, name="x402-sqlite-writer", daemon=True
+        )
+        self._closed = False
+        self._commits = 0
+        self._writes = 0
+        self._writer.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        # NORMAL is crash-safe in WAL mode; only an OS crash can lose the
+        # most recent commits.
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA busy_timeout=5000")
+        return conn
+
+    # --- Writer ---
+
+    async def _write(self, *statements: Tuple[str, Tuple[Any, ...]]) -> None:
+        """Queues statements and waits until the batch holding them commits."""
+        if self._closed:
+            raise RuntimeError("SQLitePaymentStateStore is closed")
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._queue.put((statements, loop, future))
+        await future
+
+    def _writer_loop(self) -> None:
+        try:
+            conn = self._connect()
+        except BaseException as e:
+            logger.error(f"SQLite payment state writer failed to start: {e}")
+            self._fail_pending(e)
+            raise
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+            batch = [item]
+            deadline = time.monotonic() + self._max_commit_delay
+            while len(batch) < self._max_batch_size:
+                try:
+                    timeout = deadline - time.monotonic()
+                    item = (
+                        self._queue.get(timeout=timeout)
+                        if timeout > 0
+                        else self._queue.get_nowait()
+                    )
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            try:
+                self._commit(conn, batch)
+            except BaseException as e:
+                # The writer must survive, and no caller may wait forever.
+                logger.error(f"SQLite payment state commit failed: {e}")
+                for _, loop, future in batch:
+                    loop.call_soon_threadsafe(_resolve, future, e)
+                if not isinstance(e, Exception):
+                    self._fail_pending(e)
+                    raise
+        conn.close()
+
+    def _fail_pending(self, error: BaseException) -> None:
+        """Fails every queued write once the writer can no longer run."""
+        self._closed = True
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if item is not _STOP:
+                _, loop, future = item
+                loop.call_soon_threadsafe(_resolve, future, error)
+
+    def _commit(self, conn: sqlite3.Connection, batch: List[Tuple[Any, ...]]) -> None:
+        errors: List[Optional[BaseException]] = [None] * len(batch)
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            for statements, _, _ in batch:
+                for sql, params in statements:
+                    conn.execute(sql, params)
+            conn.execute("COMMIT")
+        except Exception:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            # Isolate the failing write so the rest of the batch commits.
+            for i, (statements, _, _) in enumerate(batch):
+                try:
+                    conn.execute("BEGIN IMMEDIATE")
+                    for sql, params in statements:
+                        conn.execute(sql, params)
+                    conn.execute("COMMIT")
+                except Exception as e:
+                    if conn.in_transaction:
+                        conn.execute("ROLLBACK")
+                    logger.error(f"SQLite payment state write failed: {e}")
+                    errors[i] = e
+        self._commits += 1
+        self._writes += len(batch)
+
+        for (_, loop, future), error in zip(batch, errors):
+            loop.call_soon_threadsafe(_resolve, future, error)
+
+    # --- Reads ---
+
+    def _read(self, sql: str, params: Tuple[Any, ...], one: bool) -> Any:
+        with self._reader_lock:
+            cursor = self._reader.execute(sql, params)
+            return cursor.fetchone() if one else cursor.fetchall()
+
+    async def _fetchone(
+        self, sql: str, params: Tuple[Any, ...]
+    ) -> Optional[Tuple[Any, ...]]:
+        # Reads can block on disk; keep them off the event loop.
+        return await asyncio.get_running_loop().run_in_executor(
+            None, self._read, sql, params, True
+        )
+
+    async def _fetchall(
+        self, sql: str, params: Tuple[Any, ...]
+    ) -> List[Tuple[Any, ...]]:
+        return await asyncio.get_running_loop().run_in_executor(
+            None, self._read, sql, params, False
+        )
+
+    # --- PaymentRequirementsStore ---
+
+    async def get(self, task_id: str) -> Optional[Sequence[PaymentRequirements]]:
+        row = await self._fetchone(
+            "SELECT requirements, expires_at FROM payment_state WHERE task_id = ?",
+            (task_id,),
+        )
+        if row is None or row[0] is None or row[1] <= time.time():
+            return None
+        return [PaymentRequirements.model_validate(r) for r in json.loads(row[0])]
+
+    async def put(
+        self, task_id: str, requirements: Sequence[PaymentRequirements]
+    ) -> None:
+        value = json.dumps(
+            [r.model_dump(mode="json", by_alias=True) for r in requirements]
+        )
+        now = time.time()
+        expires_at = now + requirements_ttl(requirements, self._default_ttl)
+        await self._write((_PUT, (task_id, value, expires_at, now)))
+
+    async def delete(self, task_id: str) -> None:
+        await self._write(
+            (_DELETE_UNPAID, (task_id,)), (_CLEAR_REQUIREMENTS, (task_id,))
+        )
+
+    async def record_verified(
+        self,
+        task_id: str,
+        payment_payload: PaymentPayload,
+        payment_requirements: PaymentRequirements,
+        verify_response: VerifyResponse,
+    ) -> None:
+        params = (
+            task_id,
+            _dump(payment_payload),
+            _dump(payment_requirements),
+            _dump(verify_response),
+            time.time(),
+        )
+        await self._write((_RECORD_VERIFIED, params))
+
+    async def record_settlement(
+        self, task_id: str, settle_response: SettleResponse
+    ) -> None:
+        status = "settled" if settle_response.success else "failed"
+        params = (task_id, status, _dump(settle_response), time.time())
+        await self._write((_RECORD_SETTLEMENT, params))
+
+    async def pending_settlements(self) -> List[PendingSettlement]:
+        rows = await self._fetchall(
+            "SELECT task_id, payment_payload, payment_requirement "
+            "FROM payment_state WHERE status = 'verified' ORDER BY updated_at",
+            (),
+        )
+        return [
+            PendingSettlement(
+                task_id=task_id,
+                payment_payload=PaymentPayload.model_validate_json(payload),
+                payment_requirements=PaymentRequirements.model_validate_json(
+                    requirement
+                ),
+            )
+            for task_id, payload, requirement in rows
+        ]
+
+    async def get_status(self, task_id: str) -> Optional[str]:
+        """Returns the persisted status of a task, if any."""
+        row = await self._fetchone(
+            "SELECT status FROM payment_state WHERE task_id = ?", (task_id,)
+        )
+        return row[0] if row else None
+
+    async def purge(self, older_than_seconds: float) -> None:
+        """Deletes resolved and abandoned tasks not updated within the window."""
+        cutoff = time.time() - older_than_seconds
+        sql = (
+            "DELETE FROM payment_state "
+            "WHERE status IN ('required', 'settled', 'failed') AND updated_at < ?"
+        )
+        await self._write((sql, (cutoff,)))
+
+    async def close(self) -> None:
+        """Flushes pending writes and stops the writer thread."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        await asyncio.to_thread(self._writer.join)
+        with self._reader_lock:
+            self._reader.close()
+
+    def stats(self) -> Dict[str, int]:
+        return {"writes": self._writes, "commits": self._commits}
+
+
+def _resolve(future: "asyncio.Future[None]", error: Optional[BaseException]) -> None:
+    if future.done():
+        return
+    if error is None:
+        future.set_result(None)
+    else:
+        future.set_exception(error)
@@ -0,0 +1,289 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Payment requirements storage for correlating 402 responses with payments."""
+
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from ..types import (
+    PaymentPayload,
+    PaymentRequirements,
+    SettleResponse,
+    VerifyResponse,
+)
+
+
+def requirements_ttl(
+    requirements: Sequence[PaymentRequirements], default: float
+) -> float:
+    """Returns how long a set of requirements stays payable, in seconds.
+
+    A client signs its authorization with ``validBefore`` derived from
+    ``max_timeout_seconds``, so once the longest timeout has elapsed no
+    submission against these requirements can succeed.
+    """
+    if not requirements:
+        return default
+    return float(max(r.max_timeout_seconds for r in requirements))
+
+
+class PendingSettlement(NamedTuple):
+    """A payment that was verified but never settled."""
+
+    task_id: str
+    payment_payload: PaymentPayload
+    payment_requirements: PaymentRequirements
+
+
+class PaymentRequirementsStore(ABC):
+    """Interface for storing the accepts array issued with a 402 response.
+
+    The server executor stores the requirements under the task id when the
+    delegate requests payment and looks them up again when the client submits
+    a payment for that task. Backends may live in-process or be shared by
+    several workers.
+
+    Durable backends can also override the ``record_*`` hooks to track the
+    payment through verification and settlement, and ``pending_settlements``
+    to let a restarted merchant finish the payments it had already verified.
+    """
+
+    @abstractmethod
+    async def get(self, task_id: str) -> Optional[Sequence[PaymentRequirements]]:
+        """Returns the requirements stored for a task, if still payable."""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def put(
+        self, task_id: str, requirements: Sequence[PaymentRequirements]
+    ) -> None:
+        """Stores the requirements issued for a task."""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def delete(self, task_id: str) -> None:
+        """Removes the requirements for a task once its payment is resolved."""
+        raise NotImplementedError
+
+    async def record_verified(
+        self,
+        task_id: str,
+        payment_payload: PaymentPayload,
+        payment_requirements: PaymentRequirements,
+        verify_response: VerifyResponse,
+    ) -> None:
+        """Records that a task's payment passed verification."""
+        return None
+
+    async def record_settlement(
+        self, task_id: str, settle_response: SettleResponse
+    ) -> None:
+        """Records the final settlement outcome (success or failure) of a task."""
+        return None
+
+    async def pending_settlements(self) -> List[PendingSettlement]:
+        """Returns payments that were verified but have no settlement outcome."""
+        return []
+
+    def stats(self) -> Dict[str, int]:
+        """Returns backend counters for monitoring."""
+        return {}
+
+
+# (expires_at, requirements)
+_Entry = Tuple[float, Sequence[PaymentRequirements]]
+
+
+class _Shard:
+    """A single LRU partition of the in-memory store.
+
+    Counters are only updated under the shard's lock, so they stay exact
+    without a store-wide lock; ``stats()`` sums them.
+    """
+
+    __slots__ = ("lock", "entries", "capacity", "hits", "misses", "expired", "evicted")
+
+    def __init__(self, capacity: int):
+        self.lock = threading.Lock()
+        # task_id -> (expires_at, requirements), least recently used first
+        self.entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evicted = 0
+
+
+class InMemoryPaymentRequirementsStore(PaymentRequirementsStore):
+    """Bounded, sharded in-process store with TTL and LRU eviction.
+
+    Entries expire once the longest ``max_timeout_seconds`` of the stored
+    requirements has elapsed. ``max_entries`` is split across the shards, and
+    the least recently used entry is evicted when a shard is full, so
+    abandoned 402s can never grow the store without limit.
+
+    Example:
+        store = InMemoryPaymentRequirementsStore(max_entries=50_000)
+        server = MyServerExecutor(agent, config, requirements_store=store)
+    """
+
+    # Expired entries inspected from the LRU end on each write.
+    _SWEEP_BATCH = 8
+
+    def __init__(
+        self,
+        max_entries: int = 10_000,
+        num_shards: int = 16,
+        default_ttl_seconds: float = 600.0,
+    ):
+        """Initialize the store.
+
+        Args:
+            max_entries: Upper bound on stored tasks across all shards
+            num_shards: Number of independently locked partitions
+            default_ttl_seconds: TTL used when no requirement carries a timeout
+        """
+        if max_entries <= 0:
+            raise ValueError("max_entries must be greater than 0")
+        if num_shards <= 0:
+            raise ValueError("num_shards must be greater than 0")
+
+        num_shards = min(num_shards, max_entries)
+        # The remainder goes one entry each to the first shards, so the
+        # capacities add up to exactly max_entries.
+        base, remainder = divmod(max_entries, num_shards)
+        self._shards = [
+            _Shard(base + (1 if i < remainder else 0)) for i in range(num_shards)
+        ]
+        self._default_ttl = default_ttl_seconds
+        self.max_entries = max_entries
+
+    def _shard(self, task_id: str) -> _Shard:
+        return self._shards[hash(task_id) % len(self._shards)]
+
+    def get_nowait(self, task_id: str) -> Optional[Sequence[PaymentRequirements]]:
+        """Synchronous lookup; the in-memory store never blocks."""
+        shard = self._shard(task_id)
+        now = time.monotonic()
+        with shard.lock:
+            entry = shard.entries.get(task_id)
+            if entry is None:
+                shard.misses += 1
+                return None
+            expires_at, requirements = entry
+            if expires_at <= now:
+                del shard.entries[task_id]
+                shard.expired += 1
+                shard.misses += 1
+                return None
+            shard.entries.move_to_end(task_id)
+            shard.hits += 1
+            return requirements
+
+    def put_nowait(
+        self, task_id: str, requirements: Sequence[PaymentRequirements]
+    ) -> None:
+        """Synchronous insert; the in-memory store never blocks."""
+        shard = self._shard(task_id)
+        now = time.monotonic()
+        expires_at = now + requirements_ttl(requirements, self._default_ttl)
+        with shard.lock:
+            shard.entries[task_id] = (expires_at, requirements)
+            shard.entries.move_to_end(task_id)
+            self._sweep(shard, now)
+            while len(shard.entries) > shard.capacity:
+                shard.entries.popitem(last=False)
+                shard.evicted += 1
+
+    def delete_nowait(self, task_id: str) -> None:
+        """Synchronous removal; missing task ids are ignored."""
+        shard = self._shard(task_id)
+        with shard.lock:
+            shard.entries.pop(task_id, None)
+
+    async def get(self, task_id: str) -> Optional[Sequence[PaymentRequirements]]:
+        return self.get_nowait(task_id)
+
+    async def put(
+        self, task_id: str, requirements: Sequence[PaymentRequirements]
+    ) -> None:
+        self.put_nowait(task_id, requirements)
+
+    async def delete(self, task_id: str) -> None:
+        self.delete_nowait(task_id)
+
+    def _sweep(self, shard: _Shard, now: float) -> None:
+        """Drops expired entries from the LRU end of a locked shard.
+
+        Requirements share similar timeouts in practice, so the least recently
+        used entries are also the ones most likely to have expired.
+        """
+        for _ in range(self._SWEEP_BATCH):
+            if not shard.entries:
+                return
+            task_id, (expires_at, _) = next(iter(shard.entries.items()))
+            if expires_at > now:
+                return
+            del shard.entries[task_id]
+            shard.expired += 1
+
+    def purge_expired(self) -> int:
+        """Removes every expired entry and returns how many were dropped."""
+        now = time.monotonic()
+        removed = 0
+        for shard in self._shards:
+            with shard.lock:
+                expired: List[str] = [
+                    task_id
+                    for task_id, (expires_at, _) in shard.entries.items()
+                    if expires_at <= now
+                ]
+                for task_id in expired:
+                    del shard.entries[task_id]
+                shard.expired += len(expired)
+                removed += len(expired)
+        return removed
+
+    def __len__(self) -> int:
+        return sum(len(shard.entries) for shard in self._shards)
+
+    def __contains__(self, task_id: object) -> bool:
+        return isinstance(task_id, str) and self.get_nowait(task_id) is not None
+
+    def __getitem__(self, task_id: str) -> Sequence[PaymentRequirements]:
+        requirements = self.get_nowait(task_id)
+        if requirements is None:
+            raise KeyError(task_id)
+        return requirements
+
+    def __setitem__(
+        self, task_id: str, requirements: Sequence[PaymentRequirements]
+    ) -> None:
+        self.put_nowait(task_id, requirements)
+
+    def __delitem__(self, task_id: str) -> None:
+        self.delete_nowait(task_id)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self),
+            "capacity": self.max_entries,
+            "hits": sum(shard.hits for shard in self._shards),
+            "misses": sum(shard.misses for shard in self._shards),
+            "expired": sum(shard.expired for shard in self._shards),
+            "evicted": sum(shard.evicted for shard in self._shards),
+        }
@@ -0,0 +1,86 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Usage-metered ``upto`` payment requirements."""
+
+from x402.types import Price
+
+from ..types import PaymentRequirements
+from .merchant import create_payment_requirements, resolve_price
+
+UPTO_SCHEME = "upto"
+METERED_UNITS = ("token", "byte", "part")
+
+
+def create_upto_payment_requirements(
+    max_price: Price,
+    unit_price: Price,
+    pay_to_address: str,
+    resource: str,
+    unit: str = "token",
+    network: str = "bsc",
+    **kwargs,
+) -> PaymentRequirements:
+    """Creates requirements for a service billed by usage up to a ceiling.
+
+    The client authorizes ``max_price``; the server executor meters ``unit``s
+    in the delegate's output and settles ``unit_price`` per unit, never more
+    than the ceiling. Settling less than the authorized value requires a
+    facilitator that implements the ``upto`` scheme.
+
+    Args:
+        max_price: Ceiling the client authorizes
+        unit_price: Price of one unit, in the same asset as ``max_price``
+        pay_to_address: Address to receive the payment
+        resource: Resource identifier
+        unit: What is metered: "token", "byte" or "part" (artifact parts)
+        network: Blockchain network
+        **kwargs: Passed to ``create_payment_requirements``
+
+    Returns:
+        PaymentRequirements with the unit and atomic unit price in ``extra``
+    """
+    if unit not in METERED_UNITS:
+        raise ValueError(f"unit must be one of {', '.join(METERED_UNITS)}")
+    requirements = create_payment_requirements(
+        price=max_price,
+        pay_to_address=pay_to_address,
+        resource=resource,
+        network=network,
+        scheme=UPTO_SCHEME,
+        **kwargs,
+    )
+    unit_amount, unit_asset, _ = resolve_price(unit_price, network)
+    if unit_asset.lower() != requirements.asset.lower():
+        raise ValueError("unit_price and max_price must use the same asset")
+    requirements.extra = {
+        **(requirements.extra or {}),
+        "unit": unit,
+        "unitPrice": unit_amount,
+    }
+    return requirements
+
+
+def usage_amount(requirements: PaymentRequirements, units: int) -> int:
+    """Returns the atomic amount owed for ``units``, capped at the ceiling."""
+    unit_price = int((requirements.extra or {}).get("unitPrice", 0))
+    return min(int(requirements.max_amount_required), units * unit_price)
+
+
+def metered_requirements(
+    requirements: PaymentRequirements, units: int
+) -> PaymentRequirements:
+    """Returns a copy of ``upto`` requirements that settles the metered amount."""
+    return requirements.model_copy(
+        update={"max_amount_required": str(usage_amount(requirements, units))}
+    )
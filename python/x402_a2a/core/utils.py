@@ -79,6 +79,9 @@ class x402Utils:
     PAYLOAD_KEY = x402Metadata.PAYLOAD_KEY
     RECEIPTS_KEY = x402Metadata.RECEIPTS_KEY
     ERROR_KEY = x402Metadata.ERROR_KEY
+    TIMEOUT_PHASE_KEY = x402Metadata.TIMEOUT_PHASE_KEY
+    CREDIT_KEY = x402Metadata.CREDIT_KEY
+    ENTITLEMENT_KEY = x402Metadata.ENTITLEMENT_KEY
 
     def get_payment_status_from_message(
         self, message: Message
@@ -274,10 +277,70 @@ class x402Utils:
         task.status.message.metadata.pop(self.REQUIRED_KEY, None)
         return task
 
+    def _record_prepaid(self, task: Task, text: str) -> dict:
+        """Marks a task paid without a settlement and returns its metadata."""
+        # Ensure task has a status message for metadata
+        if not hasattr(task.status, "message") or not task.status.message:
+            from ..types import Message
+            from a2a.types import TextPart
+
+            task.status.message = Message(
+                messageId=f"{task.id}-status",
+                role="agent",
+                parts=[TextPart(kind="text", text=text)],
+                metadata={},
+            )
+
+        # Ensure message has metadata
+        if (
+            not hasattr(task.status.message, "metadata")
+            or not task.status.message.metadata
+        ):
+            task.status.message.metadata = {}
+
+        metadata = task.status.message.metadata
+        metadata[self.STATUS_KEY] = PaymentStatus.PAYMENT_COMPLETED.value
+        metadata.pop(self.PAYLOAD_KEY, None)
+        metadata.pop(self.REQUIRED_KEY, None)
+        return metadata
+
+    def record_credit_debit(self, task: Task, debited: str, balance: int) -> Task:
+        """Record a call paid from prepaid credit, with the remaining balance."""
+        metadata = self._record_prepaid(task, "Paid from prepaid credit.")
+        metadata[self.CREDIT_KEY] = {"debited": debited, "balance": str(balance)}
+        return task
+
+    def record_entitlement(self, task: Task, entitlement: dict) -> Task:
+        """Record an issued or used entitlement on a completed task.
+
+        An issued entitlement carries its ``token``; clients send that string
+        back under the same metadata key to be served without paying again.
+        """
+        metadata = self._record_prepaid(task, "Paid with an entitlement.")
+        metadata[self.ENTITLEMENT_KEY] = entitlement
+        return task
+
+    def get_entitlement_token(self, task: Task) -> Optional[str]:
+        """Get the entitlement token issued with a task's payment, if any."""
+        if not task.status.message or not task.status.message.metadata:
+            return None
+        entitlement = task.status.message.metadata.get(self.ENTITLEMENT_KEY)
+        return entitlement.get("token") if isinstance(entitlement, dict) else None
+
     def record_payment_failure(
-        self, task: Task, error_code: str, settle_response: SettleResponse
+        self,
+        task: Task,
+        error_code: str,
+        settle_response: Optional[SettleResponse],
+        timeout_phase: Optional[str] = None,
     ) -> Task:
-        """Record payment failure with error details."""
+        """Record payment failure with error details.
+
+        ``settle_response`` is None when the payment was never processed, so
+        there is no receipt to record. ``timeout_phase`` names the phase
+        (verify, execute or settle) that ran past the request deadline, when
+        that caused the failure.
+        """
         # Ensure task has a status message for metadata
         if not hasattr(task.status, "message") or not task.status.message:
             from ..types import Message
@@ -301,12 +364,15 @@ class x402Utils:
             PaymentStatus.PAYMENT_FAILED.value
         )
         task.status.message.metadata[self.ERROR_KEY] = error_code
-        # Append to receipts array (spec requirement for complete history)
-        if self.RECEIPTS_KEY not in task.status.message.metadata:
-            task.status.message.metadata[self.RECEIPTS_KEY] = []
-        task.status.message.metadata[self.RECEIPTS_KEY].append(
-            settle_response.model_dump(by_alias=True)
-        )
+        if timeout_phase:
+            task.status.message.metadata[self.TIMEOUT_PHASE_KEY] = timeout_phase
+        if settle_response is not None:
+            # Append to receipts array (spec requirement for complete history)
+            if self.RECEIPTS_KEY not in task.status.message.metadata:
+                task.status.message.metadata[self.RECEIPTS_KEY] = []
+            task.status.message.metadata[self.RECEIPTS_KEY].append(
+                settle_response.model_dump(by_alias=True)
+            )
         # Clean up intermediate data
         task.status.message.metadata.pop(self.PAYLOAD_KEY, None)
         return task
@@ -16,5 +16,39 @@
 from .base import x402BaseExecutor
 from .server import x402ServerExecutor
 from .client import x402ClientExecutor
+from .payment_context import PaymentContext
+from .event_log import PaymentEventLogger
+from .event_queues import (
+    EventQueueWrapper,
+    BufferedEventQueue,
+    SettlementGatedEventQueue,
+)
+from .settlement import SettlementQueue, SettlementJob
+from .verify_cache import VerifyCache
+from .ledger import SettlementLedger
+from .deadlines import DeadlinePolicy, RequestDeadline
+from .admission import AdmissionController
+from .metering import UsageMeter
+from .credit import CreditLedger, CreditStore, SQLiteCreditStore
 
-__all__ = ["x402BaseExecutor", "x402ServerExecutor", "x402ClientExecutor"]
+__all__ = [
+    "x402BaseExecutor",
+    "x402ServerExecutor",
+    "x402ClientExecutor",
+    "PaymentContext",
+    "PaymentEventLogger",
+    "EventQueueWrapper",
+    "BufferedEventQueue",
+    "SettlementGatedEventQueue",
+    "SettlementQueue",
+    "SettlementJob",
+    "VerifyCache",
+    "SettlementLedger",
+    "DeadlinePolicy",
+    "RequestDeadline",
+    "AdmissionController",
+    "UsageMeter",
+    "CreditLedger",
+    "CreditStore",
+    "SQLiteCreditStore",
+]
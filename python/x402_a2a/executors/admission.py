@@ -0,0 +1,198 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Admission control with payment-aware priority for the server executor."""
+
+import asyncio
+import heapq
+import itertools
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from ..types import AdmissionRejectedError
+
+PAID = 0
+UNPAID = 1
+
+
+class _Waiter:
+    __slots__ = ("future", "priority", "tag", "enqueued_at")
+
+    def __init__(self, future: "asyncio.Future[None]", priority: int, tag: float):
+        self.future = future
+        self.priority = priority
+        self.tag = tag
+        self.enqueued_at = time.monotonic()
+
+
+class AdmissionController:
+    """Bounds concurrent executions and orders the backlog by payment.
+
+    Requests beyond ``max_concurrency`` wait in a priority queue:
+
+    - Payment submissions go before unpaid requests, which at best produce
+      a 402.
+    - Payments are fair-queued per payer: each payer's requests are spaced
+      out in virtual time, so a payer flooding the server cannot starve the
+      others. With ``amount_weighted`` the spacing shrinks in proportion to
+      the authorized amount, favouring larger payments.
+    - When the queue is full an unpaid request is shed first (the newest
+      waiting one, or the arrival itself); a payment is rejected only when
+      every waiter is a payment too.
+
+    Shed requests get ``AdmissionRejectedError``.
+
+    Example:
+        server = MyServerExecutor(
+            agent, config, admission_controller=AdmissionController(64)
+        )
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 64,
+        max_queue: int = 1024,
+        amount_weighted: bool = False,
+    ):
+        """Initialize the controller.
+
+        Args:
+            max_concurrency: Requests executing at once
+            max_queue: Requests allowed to wait for a slot
+            amount_weighted: Weight each payer's share by the authorized amount
+        """
+        if max_concurrency <= 0:
+            raise ValueError("max_concurrency must be greater than 0")
+        self._max_concurrency = max_concurrency
+        self._max_queue = max_queue
+        self._amount_weighted = amount_weighted
+
+        self._in_flight = 0
+        self._heap: List[Tuple[int, float, int, _Waiter]] = []
+        self._unpaid: Deque[_Waiter] = deque()
+        self._depth = {PAID: 0, UNPAID: 0}
+        self._sequence = itertools.count()
+        self._virtual_time = 0.0
+        self._payer_tags: Dict[str, float] = {}
+
+        self._admitted = 0
+        self._shed = {PAID: 0, UNPAID: 0}
+        self._dispatched = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    def _waiting(self) -> int:
+        return self._depth[PAID] + self._depth[UNPAID]
+
+    def _tag(self, payer: Optional[str], amount: int) -> float:
+        cost = 1.0 / amount if self._amount_weighted and amount > 0 else 1.0
+        if payer is None:
+            return self._virtual_time + cost
+        payer = payer.lower()
+        tag = max(self._virtual_time, self._payer_tags.get(payer, 0.0)) + cost
+        self._payer_tags[payer] = tag
+        if len(self._payer_tags) > 4 * self._max_queue:
+            # Payers behind the virtual clock have no backlog left to space.
+            self._payer_tags = {
+                p: t for p, t in self._payer_tags.items() if t > self._virtual_time
+            }
+        return tag
+
+    def _shed_newest_unpaid(self) -> bool:
+        while self._unpaid:
+            waiter = self._unpaid.pop()
+            if not waiter.future.done():
+                waiter.future.set_exception(
+                    AdmissionRejectedError("Server overloaded; request shed")
+                )
+                self._depth[UNPAID] -= 1
+                self._shed[UNPAID] += 1
+                return True
+        return False
+
+    async def acquire(
+        self, paid: bool = False, payer: Optional[str] = None, amount: int = 0
+    ) -> None:
+        """Waits for an execution slot; ``release()`` must follow.
+
+        Args:
+            paid: Whether the request carries a payment submission
+            payer: Payer address used for fair queueing
+            amount: Authorized amount in atomic units
+
+        Raises:
+            AdmissionRejectedError: If the request was shed
+        """
+        priority = PAID if paid else UNPAID
+        if self._in_flight < self._max_concurrency and not self._waiting():
+            self._in_flight += 1
+            self._admitted += 1
+            return
+
+        if self._waiting() >= self._max_queue:
+            if priority == UNPAID or not self._shed_newest_unpaid():
+                self._shed[priority] += 1
+                raise AdmissionRejectedError("Server overloaded; request shed")
+
+        tag = self._tag(payer, amount) if paid else float(next(self._sequence))
+        waiter = _Waiter(asyncio.get_running_loop().create_future(), priority, tag)
+        heapq.heappush(self._heap, (priority, tag, next(self._sequence), waiter))
+        if priority == UNPAID:
+            self._unpaid.append(waiter)
+        self._depth[priority] += 1
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # The slot was handed over just as the caller gave up.
+                self.release()
+            else:
+                self._depth[priority] -= 1
+            raise
+
+    def release(self) -> None:
+        """Frees a slot, handing it to the highest-priority waiter."""
+        while self._heap:
+            _, tag, _, waiter = heapq.heappop(self._heap)
+            if waiter.future.done():
+                continue
+            self._depth[waiter.priority] -= 1
+            if waiter.priority == PAID:
+                self._virtual_time = max(self._virtual_time, tag)
+            wait = time.monotonic() - waiter.enqueued_at
+            self._total_wait += wait
+            self._max_wait = max(self._max_wait, wait)
+            self._admitted += 1
+            self._dispatched += 1
+            waiter.future.set_result(None)
+            while self._unpaid and self._unpaid[0].future.done():
+                self._unpaid.popleft()
+            return
+        self._in_flight -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns queue depth, wait times and admission counters."""
+        return {
+            "in_flight": self._in_flight,
+            "queue_depth": self._waiting(),
+            "queued_paid": self._depth[PAID],
+            "queued_unpaid": self._depth[UNPAID],
+            "admitted": self._admitted,
+            "shed_paid": self._shed[PAID],
+            "shed_unpaid": self._shed[UNPAID],
+            "avg_wait_ms": (
+                1000 * self._total_wait / self._dispatched if self._dispatched else 0.0
+            ),
+            "max_wait_ms": 1000 * self._max_wait,
+        }
@@ -0,0 +1,431 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Prepaid credit sessions: one deposit, many local debits."""
+
+import asyncio
+import logging
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..types import PaymentPayload, PaymentRequirements
+
+logger = logging.getLogger(__name__)
+
+# Key in a deposit requirement's ``extra`` holding the per-call debit.
+CREDIT_EXTRA_KEY = "x402.credit"
+
+# (context_id, payer, network, asset, pay_to, balance, updated_at)
+CreditRow = Tuple[str, str, str, str, str, int, float]
+
+# (context_id, network, asset, pay_to)
+SessionKey = Tuple[str, str, str, str]
+
+
+def session_key(context_id: str, requirement: PaymentRequirements) -> SessionKey:
+    """Returns the key of the session a requirement is paid from."""
+    return (
+        context_id,
+        requirement.network,
+        requirement.asset.lower(),
+        requirement.pay_to.lower(),
+    )
+
+
+class CreditSession:
+    """The prepaid balance of one A2A context with one payee and asset."""
+
+    __slots__ = (
+        "context_id",
+        "payer",
+        "network",
+        "asset",
+        "pay_to",
+        "balance",
+        "version",
+        "checkpointed_version",
+        "updated_at",
+    )
+
+    def __init__(
+        self,
+        context_id: str,
+        payer: str,
+        network: str,
+        asset: str,
+        pay_to: str,
+        balance: int = 0,
+        updated_at: Optional[float] = None,
+    ):
+        self.context_id = context_id
+        self.payer = payer
+        self.network = network
+        self.asset = asset.lower()
+        self.pay_to = pay_to.lower()
+        self.balance = balance
+        self.version = 0
+        self.checkpointed_version = 0
+        self.updated_at = time.time() if updated_at is None else updated_at
+
+    @property
+    def key(self) -> SessionKey:
+        return (self.context_id, self.network, self.asset, self.pay_to)
+
+    def row(self) -> CreditRow:
+        return (
+            self.context_id,
+            self.payer,
+            self.network,
+            self.asset,
+            self.pay_to,
+            self.balance,
+            self.updated_at,
+        )
+
+
+class CreditStore(ABC):
+    """Durable storage for credit session checkpoints."""
+
+    @abstractmethod
+    def save(self, rows: List[CreditRow]) -> None:
+        """Upserts session balances."""
+
+    @abstractmethod
+    def load(self) -> List[CreditRow]:
+        """Returns every stored session."""
+
+    @abstractmethod
+    def delete(self, keys: List[SessionKey]) -> None:
+        """Removes sessions."""
+
+
+class SQLiteCreditStore(CreditStore):
+    """Credit checkpoints persisted in SQLite (WAL)."""
+
+    _SCHEMA = """
+    CREATE TABLE IF NOT EXISTS credit_sessions (
+        context_id TEXT NOT NULL,
+        payer TEXT NOT NULL,
+        network TEXT NOT NULL,
+        asset TEXT NOT NULL,
+        pay_to TEXT NOT NULL,
+        balance TEXT NOT NULL,
+        updated_at REAL NOT NULL,
+        PRIMARY KEY (context_id, network, asset, pay_to)
+    );
+    """
+
+    _SAVE = """
+    INSERT INTO credit_sessions
+        (context_id, payer, network, asset, pay_to, balance, updated_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT (context_id, network, asset, pay_to) DO UPDATE SET
+        balance = excluded.balance,
+        updated_at = excluded.updated_at
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            path, check_same_thread=False, isolation_level=None
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.executescript(self._SCHEMA)
+
+    def save(self, rows: List[CreditRow]) -> None:
+        # Balances are stored as text: atomic amounts can exceed 64 bits.
+        params = [(*row[:5], str(row[5]), row[6]) for row in rows]
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.executemany(self._SAVE, params)
+            self._conn.execute("COMMIT")
+
+    def load(self) -> List[CreditRow]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT context_id, payer, network, asset, pay_to, balance, "
+                "updated_at FROM credit_sessions"
+            ).fetchall()
+        return [(*row[:5], int(row[5]), row[6]) for row in rows]
+
+    def delete(self, keys: List[SessionKey]) -> None:
+        with self._lock:
+            self._conn.executemany(
+                "DELETE FROM credit_sessions WHERE context_id = ? AND network = ? "
+                "AND asset = ? AND pay_to = ?",
+                keys,
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class CreditLedger:
+    """In-memory prepaid balances per context and payee, checkpointed to a store.
+
+    With a ledger configured, the server executor offers a deposit option
+    next to every ``exact`` requirement it issues, worth ``deposit_calls``
+    calls. Paying it settles once through the facilitator as usual and opens
+    (or tops up) the context's balance with that payee in that asset, less
+    the call it paid for. Later tasks in the same context that would get a
+    402 are debited locally instead and run as paid, with no facilitator
+    I/O. When the balance no longer covers a call the client gets the 402,
+    with deposit options to top up.
+
+    Balances are only touched on the event loop, with no await between
+    checking and updating one, so concurrent debits never overdraw. Changed
+    balances are written to the store every ``checkpoint_every`` debits or
+    ``checkpoint_interval`` seconds, in a worker thread, and reloaded on
+    construction; call ``checkpoint()`` at shutdown to persist the rest.
+
+    Sessions are bound to the A2A ``context_id``, so context ids must not be
+    guessable by other clients.
+
+    Example:
+        ledger = CreditLedger(SQLiteCreditStore("credit.db"), deposit_calls=100)
+        server = MyServerExecutor(agent, config, credit_ledger=ledger)
+    """
+
+    def __init__(
+        self,
+        store: Optional[CreditStore] = None,
+        deposit_calls: int = 100,
+        checkpoint_every: int = 100,
+        checkpoint_interval: float = 5.0,
+        ttl_seconds: float = 30 * 86400,
+    ):
+        """Initialize the ledger, restoring checkpointed sessions.
+
+        Args:
+            store: Optional durable store for balances
+            deposit_calls: Calls a deposit prepays
+            checkpoint_every: Debits between checkpoints
+            checkpoint_interval: Seconds between checkpoints while debiting
+            ttl_seconds: Idle time after which a session is dropped
+        """
+        if deposit_calls <= 0:
+            raise ValueError("deposit_calls must be greater than 0")
+        self._store = store
+        self._deposit_calls = deposit_calls
+        self._checkpoint_every = checkpoint_every
+        self._checkpoint_interval = checkpoint_interval
+        self._ttl = ttl_seconds
+        self._sessions: Dict[SessionKey, CreditSession] = {}
+        self._expired: List[SessionKey] = []
+        self._checkpoint_task: Optional["asyncio.Future"] = None
+        self._checkpoint_rerun = False
+        self._debits_since_checkpoint = 0
+        self._last_checkpoint = time.monotonic()
+
+        self._debits = 0
+        self._declined = 0
+        self._deposits = 0
+        self._checkpoints = 0
+
+        if store is not None:
+            for row in store.load():
+                session = CreditSession(*row)
+                self._sessions[session.key] = session
+
+    def deposit_requirements(
+        self, requirement: PaymentRequirements
+    ) -> PaymentRequirements:
+        """Returns the deposit option prepaying ``deposit_calls`` of a requirement."""
+        amount = int(requirement.max_amount_required)
+        extra = dict(requirement.extra or {})
+        extra[CREDIT_EXTRA_KEY] = {
+            "debit": requirement.max_amount_required,
+            "calls": self._deposit_calls,
+        }
+        return requirement.model_copy(
+            update={
+                "max_amount_required": str(amount * self._deposit_calls),
+                "description": (
+                    f"Prepaid credit for {self._deposit_calls} calls"
+                    + (
+                        f": {requirement.description}"
+                        if requirement.description
+                        else ""
+                    )
+                ),
+                "extra": extra,
+            }
+        )
+
+    @staticmethod
+    def is_deposit(requirement: Optional[PaymentRequirements]) -> bool:
+        return bool(requirement and requirement.extra) and (
+            CREDIT_EXTRA_KEY in requirement.extra
+        )
+
+    def _session(self, key: SessionKey) -> Optional[CreditSession]:
+        session = self._sessions.get(key)
+        if session is not None and session.updated_at + self._ttl <= time.time():
+            del self._sessions[key]
+            self._expired.append(key)
+            return None
+        return session
+
+    @staticmethod
+    def _update(session: CreditSession, balance: int) -> None:
+        session.balance = balance
+        session.version += 1
+        session.updated_at = time.time()
+
+    def open(
+        self,
+        context_id: str,
+        payment_payload: PaymentPayload,
+        requirement: PaymentRequirements,
+    ) -> int:
+        """Credits a settled deposit, less the call it paid for.
+
+        Returns:
+            The session's new balance
+        """
+        credit = int(requirement.max_amount_required) - int(
+            requirement.extra[CREDIT_EXTRA_KEY]["debit"]
+        )
+        key = session_key(context_id, requirement)
+        session = self._session(key)
+        if session is None:
+            session = CreditSession(
+                context_id,
+                payment_payload.payload.authorization.from_,
+                requirement.network,
+                requirement.asset,
+                requirement.pay_to,
+            )
+            self._sessions[key] = session
+        self._update(session, session.balance + credit)
+        self._deposits += 1
+        self._maybe_checkpoint(force=True)
+        return session.balance
+
+    def debit(self, context_id: str, requirement: PaymentRequirements) -> Optional[int]:
+        """Debits one call at the requirement's price.
+
+        Returns:
+            The remaining balance, or None if there is no covering session
+            or its balance is too low
+        """
+        session = self._session(session_key(context_id, requirement))
+        if session is None:
+            return None
+        amount = int(requirement.max_amount_required)
+        if session.balance < amount:
+            self._declined += 1
+            return None
+        self._update(session, session.balance - amount)
+        self._debits += 1
+        self._debits_since_checkpoint += 1
+        self._maybe_checkpoint()
+        return session.balance
+
+    def refund(self, context_id: str, requirement: PaymentRequirements) -> None:
+        """Returns a debit whose call did not complete."""
+        session = self._session(session_key(context_id, requirement))
+        if session is not None:
+            self._update(
+                session, session.balance + int(requirement.max_amount_required)
+            )
+
+    def balance(self, context_id: str, requirement: PaymentRequirements) -> int:
+        session = self._session(session_key(context_id, requirement))
+        return session.balance if session is not None else 0
+
+    def _dirty_rows(self) -> List[CreditRow]:
+        rows = []
+        for session in self._sessions.values():
+            if session.version != session.checkpointed_version:
+                rows.append(session.row())
+                session.checkpointed_version = session.version
+        return rows
+
+    def _maybe_checkpoint(self, force: bool = False) -> None:
+        if self._store is None:
+            return
+        if self._checkpoint_task is not None and not self._checkpoint_task.done():
+            # A forced checkpoint (a deposit) must not be lost; the running
+            # one writes again once it finishes.
+            self._checkpoint_rerun = self._checkpoint_rerun or force
+            return
+        due = (
+            force
+            or self._debits_since_checkpoint >= self._checkpoint_every
+            or time.monotonic() - self._last_checkpoint >= self._checkpoint_interval
+        )
+        if not due:
+            return
+        rows = self._dirty_rows()
+        self._debits_since_checkpoint = 0
+        self._last_checkpoint = time.monotonic()
+        if rows or self._expired:
+            self._checkpoint_task = asyncio.ensure_future(self._run_checkpoint(rows))
+
+    async def _run_checkpoint(self, rows: List[CreditRow]) -> None:
+        """Writes ``rows``, then whatever changed if a rerun was requested."""
+        await self._write(rows)
+        while self._checkpoint_rerun:
+            self._checkpoint_rerun = False
+            rows = self._dirty_rows()
+            if rows or self._expired:
+                await self._write(rows)
+
+    async def _write(self, rows: List[CreditRow]) -> None:
+        """Writes a snapshot taken on the loop; the store I/O runs in a thread."""
+        expired, self._expired = self._expired, []
+        try:
+            await asyncio.get_running_loop().run_in_executor(
+                None, self._save, rows, expired
+            )
+        except Exception as e:
+            logger.error(f"Credit checkpoint failed: {e}", exc_info=True)
+            self._expired.extend(expired)
+            for row in rows:
+                session = self._sessions.get((row[0], *row[2:5]))
+                if session is not None:
+                    session.checkpointed_version = -1
+        else:
+            self._checkpoints += 1
+
+    def _save(self, rows: List[CreditRow], expired: List[SessionKey]) -> None:
+        if expired:
+            self._store.delete(expired)
+        self._store.save(rows)
+
+    async def checkpoint(self) -> None:
+        """Writes every changed balance to the store (call at shutdown)."""
+        if self._store is None:
+            return
+        if self._checkpoint_task is not None:
+            await self._checkpoint_task
+        rows = self._dirty_rows()
+        if rows or self._expired:
+            await self._write(rows)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "sessions": len(self._sessions),
+            "debits": self._debits,
+            "declined": self._declined,
+            "deposits": self._deposits,
+            "checkpoints": self._checkpoints,
+        }
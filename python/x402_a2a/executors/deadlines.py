@@ -0,0 +1,103 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Per-request deadlines split across the verify, execute and settle phases."""
+
+import time
+from typing import Dict, Optional
+
+from ..types import PaymentRequirements
+
+PHASES = ("verify", "execute", "settle")
+
+
+class RequestDeadline:
+    """The deadline of one paid request and the point each phase must end by.
+
+    Phase ends are cumulative, so time a phase leaves unused carries over to
+    the phases after it.
+    """
+
+    __slots__ = ("started_at", "expires_at", "_phase_ends")
+
+    def __init__(self, started_at: float, phase_ends: Dict[str, float]):
+        self.started_at = started_at
+        self._phase_ends = phase_ends
+        self.expires_at = phase_ends[PHASES[-1]]
+
+    def remaining(self, phase: Optional[str] = None) -> float:
+        """Seconds left for ``phase``, or for the whole request if omitted."""
+        end = self._phase_ends[phase] if phase else self.expires_at
+        return max(0.0, end - time.monotonic())
+
+
+class DeadlinePolicy:
+    """Derives request deadlines from ``max_timeout_seconds``.
+
+    The deadline starts when the payment submission arrives and lasts the
+    requirement's ``max_timeout_seconds`` (capped at ``max_seconds``). It is
+    divided between the phases in proportion to their shares; the server
+    executor cancels a phase that runs past its end and fails the payment,
+    recording the phase under ``x402.payment.timeout_phase``.
+
+    Cancelling settlement only abandons the wait: a transaction the
+    facilitator has already broadcast may still land.
+
+    Example:
+        server = MyServerExecutor(
+            agent, config, deadline_policy=DeadlinePolicy(verify=1, execute=8, settle=1)
+        )
+    """
+
+    def __init__(
+        self,
+        verify: float = 0.2,
+        execute: float = 0.6,
+        settle: float = 0.2,
+        default_seconds: float = 60.0,
+        max_seconds: Optional[float] = None,
+    ):
+        """Initialize the policy.
+
+        Args:
+            verify: Share of the deadline for verification
+            execute: Share of the deadline for the delegate
+            settle: Share of the deadline for settlement
+            default_seconds: Deadline when the requirement sets no timeout
+            max_seconds: Optional upper bound on any request's deadline
+        """
+        shares = {"verify": verify, "execute": execute, "settle": settle}
+        if any(share < 0 for share in shares.values()) or not sum(shares.values()):
+            raise ValueError("Phase shares must be non-negative and not all zero")
+        total = sum(shares.values())
+        self._fractions = {phase: share / total for phase, share in shares.items()}
+        self._default_seconds = default_seconds
+        self._max_seconds = max_seconds
+
+    def seconds_for(self, requirements: PaymentRequirements) -> float:
+        """Returns the total deadline in seconds for a requirement."""
+        seconds = requirements.max_timeout_seconds or self._default_seconds
+        if self._max_seconds is not None:
+            seconds = min(seconds, self._max_seconds)
+        return seconds
+
+    def start(self, requirements: PaymentRequirements) -> RequestDeadline:
+        """Starts the deadline of a request paying for ``requirements``."""
+        total = self.seconds_for(requirements)
+        now = time.monotonic()
+        phase_ends: Dict[str, float] = {}
+        elapsed = 0.0
+        for phase in PHASES:
+            elapsed += self._fractions[phase]
+            phase_ends[phase] = now + total * elapsed
+        return RequestDeadline(now, phase_ends)
@@ -0,0 +1,97 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Structured, lazily serialized event logging for the payment executors."""
+
+import json
+import logging
+import random
+from typing import Any, Dict, Optional
+
+
+def _to_jsonable(value: Any) -> Any:
+    if hasattr(value, "model_dump"):
+        return value.model_dump(mode="json", by_alias=True, exclude_none=True)
+    return value
+
+
+class _LazyEvent:
+    """Log message that serializes its fields only when a handler formats it."""
+
+    __slots__ = ("phase", "event", "fields")
+
+    def __init__(self, phase: str, event: str, fields: Dict[str, Any]):
+        self.phase = phase
+        self.event = event
+        self.fields = fields
+
+    def __str__(self) -> str:
+        record = {"event": f"x402.{self.phase}.{self.event}"}
+        for key, value in self.fields.items():
+            record[key] = _to_jsonable(value)
+        return json.dumps(record, separators=(",", ":"), default=str)
+
+
+class PaymentEventLogger:
+    """Emits payment lifecycle events as compact single-line JSON.
+
+    Events are only serialized when a handler actually emits the record:
+    nothing is built when the level is disabled, and Pydantic models passed
+    as fields are dumped during formatting rather than at the call site.
+    Below WARNING, each phase can additionally be sampled so busy merchants
+    can keep INFO logging on at a fraction of the cost.
+
+    Example:
+        events = PaymentEventLogger(sample_rates={"verify": 0.01, "settle": 0.1})
+        server = MyServerExecutor(agent, config, event_logger=events)
+    """
+
+    def __init__(
+        self,
+        logger: Optional[logging.Logger] = None,
+        sample_rates: Optional[Dict[str, float]] = None,
+        default_sample_rate: float = 1.0,
+    ):
+        """Initialize the event logger.
+
+        Args:
+            logger: Target logger (defaults to ``x402_a2a.events``)
+            sample_rates: Fraction of INFO/DEBUG events kept, per phase
+            default_sample_rate: Fraction kept for phases not listed
+        """
+        self._logger = logger or logging.getLogger("x402_a2a.events")
+        self._sample_rates = dict(sample_rates or {})
+        self._default_sample_rate = default_sample_rate
+
+    def enabled(self, phase: str, level: int = logging.INFO) -> bool:
+        """Returns whether an event at this level and phase would be logged."""
+        if not self._logger.isEnabledFor(level):
+            return False
+        if level >= logging.WARNING:
+            return True
+        rate = self._sample_rates.get(phase, self._default_sample_rate)
+        return rate >= 1.0 or random.random() < rate
+
+    def log(self, level: int, phase: str, event: str, **fields: Any) -> None:
+        """Logs an event; serialization is deferred to the handler."""
+        if self.enabled(phase, level):
+            self._logger.log(level, "%s", _LazyEvent(phase, event, fields))
+
+    def debug(self, phase: str, event: str, **fields: Any) -> None:
+        self.log(logging.DEBUG, phase, event, **fields)
+
+    def info(self, phase: str, event: str, **fields: Any) -> None:
+        self.log(logging.INFO, phase, event, **fields)
+
+    def warning(self, phase: str, event: str, **fields: Any) -> None:
+        self.log(logging.WARNING, phase, event, **fields)
@@ -0,0 +1,136 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Event queue wrappers that control what a delegate's events reach the client."""
+
+from collections import deque
+from typing import Any, Deque
+
+from a2a.types import TaskArtifactUpdateEvent, TaskStatusUpdateEvent
+
+from ..types import EventQueue, Task, TaskState
+
+_TERMINAL_STATES = frozenset(
+    {TaskState.completed, TaskState.failed, TaskState.canceled, TaskState.rejected}
+)
+
+
+class EventQueueWrapper:
+    """Base for wrappers handed to a delegate in place of its event queue.
+
+    Delegates (and the A2A ``TaskUpdater``) only enqueue events, so wrappers
+    intercept ``enqueue_event`` and forward everything else to the real queue.
+    """
+
+    def __init__(self, target: EventQueue):
+        self._target = target
+
+    async def enqueue_event(self, event: Any) -> None:
+        await self._target.enqueue_event(event)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._target, name)
+
+
+class BufferedEventQueue(EventQueueWrapper):
+    """Holds a delegate's events until they are released or discarded.
+
+    Used by optimistic execution: the delegate starts before payment
+    verification completes, and nothing it produces reaches the client unless
+    the payment turns out to be valid.
+    """
+
+    def __init__(self, target: EventQueue):
+        super().__init__(target)
+        self._buffer: Deque[Any] = deque()
+        self._released = False
+        self._discarded = False
+
+    async def enqueue_event(self, event: Any) -> None:
+        if self._discarded:
+            return
+        if self._released:
+            await self._target.enqueue_event(event)
+        else:
+            self._buffer.append(event)
+
+    async def release(self) -> None:
+        """Forwards buffered events in order, then passes new events through."""
+        # Events enqueued while flushing are appended to the buffer and picked
+        # up by this loop, which keeps the original order intact.
+        while self._buffer:
+            await self._target.enqueue_event(self._buffer.popleft())
+        self._released = True
+
+    def discard(self) -> None:
+        """Drops buffered events and ignores any further ones."""
+        self._discarded = True
+        self._buffer.clear()
+
+    @property
+    def buffered(self) -> int:
+        return len(self._buffer)
+
+
+class SettlementGatedEventQueue(EventQueueWrapper):
+    """Streams a delegate's events but holds back its final ones.
+
+    Artifact chunks and interim status updates reach the client as they are
+    produced. The closing events (an artifact's ``last_chunk``, a ``final``
+    status update or a Task in a terminal state) and anything after them
+    are held until settlement: ``release()`` delivers them once the payment
+    is collected, ``discard()`` drops them when it is not.
+    """
+
+    def __init__(self, target: EventQueue):
+        super().__init__(target)
+        self._held: Deque[Any] = deque()
+        self._holding = False
+        self._released = False
+        self._discarded = False
+
+    @staticmethod
+    def _is_closing(event: Any) -> bool:
+        if isinstance(event, TaskArtifactUpdateEvent):
+            return bool(event.last_chunk)
+        if isinstance(event, TaskStatusUpdateEvent):
+            return event.final
+        if isinstance(event, Task):
+            return event.status.state in _TERMINAL_STATES
+        return False
+
+    async def enqueue_event(self, event: Any) -> None:
+        if self._discarded:
+            return
+        if self._released:
+            await self._target.enqueue_event(event)
+        elif self._holding or self._is_closing(event):
+            self._holding = True
+            self._held.append(event)
+        else:
+            await self._target.enqueue_event(event)
+
+    async def release(self) -> None:
+        """Delivers the held events in order, then passes new events through."""
+        while self._held:
+            await self._target.enqueue_event(self._held.popleft())
+        self._released = True
+
+    def discard(self) -> None:
+        """Drops the held events and ignores any further ones."""
+        self._discarded = True
+        self._held.clear()
+
+    @property
+    def held(self) -> int:
+        return len(self._held)
@@ -0,0 +1,139 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Idempotent settlement ledger for duplicate payment submissions."""
+
+import asyncio
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional, Tuple
+
+from ..types import Task
+
+LedgerKey = Tuple[str, str]
+
+
+class _LedgerEntry:
+    __slots__ = ("task", "settlement", "recorded_at")
+
+    def __init__(self, recorded_at: float):
+        self.task: Optional[Task] = None
+        self.settlement: Optional["asyncio.Future"] = None
+        self.recorded_at = recorded_at
+
+
+class _KeyLock:
+    __slots__ = ("lock", "waiters")
+
+    def __init__(self):
+        self.lock = asyncio.Lock()
+        self.waiters = 0
+
+
+class SettlementLedger:
+    """Records the outcome of each paid submission, keyed by task and nonce.
+
+    The server executor processes a submission while holding the key's lock.
+    A duplicate submission, whether a client retry or a second worker
+    handling the same message, waits for the lock and then receives the
+    recorded task instead of running the delegate or settling again. When
+    settlement runs in the background, duplicates also wait for it to finish.
+
+    Locks exist only while a key is in use; outcomes are kept for
+    ``ttl_seconds`` in a bounded LRU.
+
+    Example:
+        server = MyServerExecutor(agent, config, settlement_ledger=SettlementLedger())
+    """
+
+    def __init__(self, max_entries: int = 10_000, ttl_seconds: float = 3600.0):
+        """Initialize the ledger.
+
+        Args:
+            max_entries: Outcomes kept before the oldest are evicted
+            ttl_seconds: How long an outcome is replayed to duplicates
+        """
+        if max_entries <= 0:
+            raise ValueError("max_entries must be greater than 0")
+        self._max_entries = max_entries
+        self._ttl = ttl_seconds
+        self._entries: "OrderedDict[LedgerKey, _LedgerEntry]" = OrderedDict()
+        self._locks: Dict[LedgerKey, _KeyLock] = {}
+
+        self._duplicates = 0
+
+    def _lookup(self, key: LedgerKey) -> Optional[_LedgerEntry]:
+        entry = self._entries.get(key)
+        if entry is not None and entry.recorded_at + self._ttl <= time.monotonic():
+            del self._entries[key]
+            return None
+        return entry
+
+    def _entry(self, key: LedgerKey) -> _LedgerEntry:
+        entry = self._lookup(key)
+        if entry is None:
+            entry = _LedgerEntry(time.monotonic())
+            self._entries[key] = entry
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    @asynccontextmanager
+    async def guard(self, task_id: str, nonce: str) -> AsyncIterator[Optional[Task]]:
+        """Holds the key's lock and yields the recorded outcome, if any.
+
+        Yields None for the first submission, which should be processed and
+        recorded before the block exits.
+        """
+        key = (task_id, nonce.lower())
+        key_lock = self._locks.get(key)
+        if key_lock is None:
+            key_lock = self._locks[key] = _KeyLock()
+        key_lock.waiters += 1
+        try:
+            async with key_lock.lock:
+                entry = self._lookup(key)
+                if entry is not None:
+                    self._duplicates += 1
+                    if entry.settlement is not None:
+                        await asyncio.shield(entry.settlement)
+                    entry = self._lookup(key)
+                yield entry.task if entry is not None else None
+        finally:
+            key_lock.waiters -= 1
+            if not key_lock.waiters:
+                del self._locks[key]
+
+    def record(self, task_id: str, nonce: str, task: Task) -> None:
+        """Records the final task for a submission."""
+        self._entry((task_id, nonce.lower())).task = task
+
+    def record_pending(
+        self, task_id: str, nonce: str, task: Task, settlement: "asyncio.Future"
+    ) -> None:
+        """Records a submission whose settlement is still running.
+
+        Duplicates wait for ``settlement`` and then get the task recorded by
+        ``record`` when it completed.
+        """
+        entry = self._entry((task_id, nonce.lower()))
+        entry.task = task
+        entry.settlement = settlement
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self._entries),
+            "locked": len(self._locks),
+            "duplicates": self._duplicates,
+        }
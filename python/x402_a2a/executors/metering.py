@@ -0,0 +1,88 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Usage metering of a delegate's event stream for ``upto`` payments."""
+
+from typing import Any
+
+from a2a.types import Artifact, TaskArtifactUpdateEvent, TextPart
+
+from ..types import EventQueue
+from .event_queues import EventQueueWrapper
+
+# Artifact metadata key a delegate can set to report exact usage (e.g. the
+# token count returned by an LLM) instead of having it estimated.
+USAGE_KEY = "x402.usage"
+
+_CHARS_PER_TOKEN = 4
+
+
+def _text_bytes(artifact: Artifact) -> int:
+    total = 0
+    for part in artifact.parts:
+        root = part.root
+        if isinstance(root, TextPart):
+            text = root.text
+            # len() is the UTF-8 size of ASCII text; only encode otherwise.
+            total += len(text) if text.isascii() else len(text.encode())
+    return total
+
+
+def _parts(artifact: Artifact) -> int:
+    return len(artifact.parts)
+
+
+def _tokens(artifact: Artifact) -> int:
+    if artifact.metadata:
+        reported = artifact.metadata.get(USAGE_KEY)
+        if reported is not None:
+            return int(reported)
+    chars = 0
+    for part in artifact.parts:
+        root = part.root
+        if isinstance(root, TextPart):
+            chars += len(root.text)
+    return -(-chars // _CHARS_PER_TOKEN)
+
+
+_COUNTERS = {"byte": _text_bytes, "part": _parts, "token": _tokens}
+
+
+class UsageMeter(EventQueueWrapper):
+    """Counts billable units in the artifact events a delegate enqueues.
+
+    Each artifact chunk is counted once as it passes, in constant work per
+    event plus a scan of its text for byte and estimated token counts.
+    Events are forwarded unchanged and nothing is retained, so metering
+    adds no allocation per chunk. Token counts are estimated at four
+    characters per token unless the delegate reports them in the artifact's
+    ``x402.usage`` metadata.
+
+    Example:
+        meter = UsageMeter(event_queue, "token")
+        await delegate.execute(context, meter)
+        amount = usage_amount(requirements, meter.units)
+    """
+
+    def __init__(self, target: EventQueue, unit: str):
+        super().__init__(target)
+        if unit not in _COUNTERS:
+            raise ValueError(f"Cannot meter unit {unit!r}")
+        self.unit = unit
+        self.units = 0
+        self._count = _COUNTERS[unit]
+
+    async def enqueue_event(self, event: Any) -> None:
+        if isinstance(event, TaskArtifactUpdateEvent):
+            self.units += self._count(event.artifact)
+        await self._target.enqueue_event(event)
@@ -0,0 +1,100 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Per-request payment state shared by the server executor's phases."""
+
+from typing import Optional, Sequence
+
+from ..core.utils import x402Utils
+from .deadlines import RequestDeadline
+from .event_queues import SettlementGatedEventQueue
+from .metering import UsageMeter
+from ..types import (
+    PaymentPayload,
+    PaymentRequirements,
+    PaymentStatus,
+    RequestContext,
+    SettleResponse,
+    Task,
+    VerifyResponse,
+)
+
+
+class PaymentContext:
+    """Payment state for a single paid request.
+
+    Built once when a payment submission arrives, so the payload is validated
+    a single time and the same typed objects are reused by verification, the
+    delegate, settlement and the failure paths.
+    """
+
+    __slots__ = (
+        "task",
+        "request",
+        "payment_payload",
+        "accepts",
+        "payment_requirements",
+        "status",
+        "verify_response",
+        "settle_response",
+        "deadline",
+        "stream",
+        "meter",
+        "nonce_reserved",
+        "settle_attempted",
+    )
+
+    def __init__(
+        self,
+        task: Task,
+        request: RequestContext,
+        payment_payload: Optional[PaymentPayload],
+    ):
+        self.task = task
+        self.request = request
+        self.payment_payload = payment_payload
+        self.accepts: Optional[Sequence[PaymentRequirements]] = None
+        self.payment_requirements: Optional[PaymentRequirements] = None
+        self.status = PaymentStatus.PAYMENT_SUBMITTED
+        self.verify_response: Optional[VerifyResponse] = None
+        self.settle_response: Optional[SettleResponse] = None
+        self.deadline: Optional[RequestDeadline] = None
+        self.stream: Optional[SettlementGatedEventQueue] = None
+        self.meter: Optional[UsageMeter] = None
+        # Whether this request holds the nonce in the replay index, and
+        # whether the facilitator was asked to settle it.
+        self.nonce_reserved = False
+        self.settle_attempted = False
+
+    @classmethod
+    def from_request(
+        cls, task: Task, request: RequestContext, utils: x402Utils
+    ) -> "PaymentContext":
+        """Parses the submitted payload from the task, falling back to the message."""
+        payment_payload = utils.get_payment_payload(
+            task
+        ) or utils.get_payment_payload_from_message(request.message)
+        return cls(task, request, payment_payload)
+
+    @property
+    def task_id(self) -> str:
+        return self.task.id
+
+    @property
+    def network(self) -> str:
+        """Network for failure receipts, taken from the most specific source."""
+        if self.payment_requirements is not None:
+            return self.payment_requirements.network
+        if self.payment_payload is not None:
+            return self.payment_payload.network
+        return "base"
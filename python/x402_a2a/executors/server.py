@@ -13,14 +13,34 @@
 # limitations under the License.
 """Server-side executor for merchant implementations."""
 
+import asyncio
 import logging
 from abc import ABCMeta, abstractmethod
-from typing import Optional, Dict, List
+from typing import Callable, Optional, Sequence
 
 from a2a.server.tasks import TaskUpdater
+from a2a.types import TextPart
 
+from .admission import AdmissionController
 from .base import x402BaseExecutor
+from .credit import CREDIT_EXTRA_KEY, CreditLedger
+from .deadlines import DeadlinePolicy
+from .event_log import PaymentEventLogger
+from .event_queues import BufferedEventQueue, SettlementGatedEventQueue
+from .payment_context import PaymentContext
+from .ledger import SettlementLedger
+from .metering import UsageMeter
+from .settlement import SettlementQueue
+from .verify_cache import VerifyCache
+from ..core.eip3009 import pre_verify_exact_payment
+from ..core.entitlements import EntitlementAuthority
+from ..core.matching import PaymentRequirementsIndex
+from ..core.recovery import SignatureRecoveryEngine
+from ..core.replay import NonceReplayIndex
+from ..core.store import PaymentRequirementsStore, InMemoryPaymentRequirementsStore
+from ..core.upto import UPTO_SCHEME, metered_requirements
 from ..types import (
+    AdmissionRejectedError,
     AgentExecutor,
     RequestContext,
     EventQueue,
@@ -30,17 +50,23 @@ from ..types import (
     x402ExtensionConfig,
     x402ErrorCode,
     x402PaymentRequiredException,
+    map_error_to_code,
     PaymentPayload,
+    PaymentVerificationError,
     Task,
     TaskStatus,
     TaskState,
     x402PaymentRequiredResponse,
     VerifyResponse,
+    x402Metadata,
 )
 
 
 logger = logging.getLogger(__name__)
 
+_STATUS_KEY = x402Metadata.STATUS_KEY
+_SUBMITTED = PaymentStatus.PAYMENT_SUBMITTED.value
+
 
 class x402ServerExecutor(x402BaseExecutor, metaclass=ABCMeta):
     """Server-side payment middleware for merchant agents.
@@ -61,20 +87,102 @@ class x402ServerExecutor(x402BaseExecutor, metaclass=ABCMeta):
     """
 
     # Class-level store to persist across requests for a single server instance.
-    _payment_requirements_store: Dict[str, List[PaymentRequirements]] = {}
+    # Bounded and TTL-evicting so abandoned 402s cannot grow without limit.
+    _payment_requirements_store: PaymentRequirementsStore = (
+        InMemoryPaymentRequirementsStore()
+    )
 
     def __init__(
         self,
         delegate: AgentExecutor,
         config: x402ExtensionConfig,
+        requirements_store: Optional[PaymentRequirementsStore] = None,
+        event_logger: Optional[PaymentEventLogger] = None,
+        optimistic_execution: bool = False,
+        settlement_queue: Optional[SettlementQueue] = None,
+        verify_cache: Optional[VerifyCache] = None,
+        replay_index: Optional[NonceReplayIndex] = None,
+        local_verification: bool = False,
+        signature_engine: Optional[SignatureRecoveryEngine] = None,
+        settlement_ledger: Optional[SettlementLedger] = None,
+        deadline_policy: Optional[DeadlinePolicy] = None,
+        admission_controller: Optional[AdmissionController] = None,
+        streaming: bool = False,
+        credit_ledger: Optional[CreditLedger] = None,
+        entitlements: Optional[EntitlementAuthority] = None,
     ):
         """Initialize server executor.
 
         Args:
             delegate: Underlying agent executor for business logic
             config: x402 extension configuration
+            requirements_store: Optional store for issued payment requirements
+                (defaults to the shared in-memory store)
+            event_logger: Optional structured logger for payment lifecycle
+                events (defaults to this module's logger, unsampled)
+            optimistic_execution: Start the delegate while the payment is still
+                being verified. Its events are buffered and only released once
+                verification passes; on failure the delegate is cancelled and
+                its output discarded.
+            settlement_queue: Optional settlement worker pool. When set, a
+                worker settles the payment, with retries, and the request
+                waits for the receipt so it is published before the task's
+                event queue closes.
+            verify_cache: Optional cache of verification results, so resubmitted
+                or concurrent identical payloads reach the facilitator once.
+                An authorization only ever pays for the task that claimed it.
+            replay_index: Optional index of used (payer, asset, nonce) triples.
+                A payment reusing a nonce fails with DUPLICATE_NONCE before
+                it is verified.
+            local_verification: Check ``exact`` payments offline (recipient,
+                amount, validity window and EIP-712 signer) and reject them
+                before calling the facilitator.
+            signature_engine: Optional engine that recovers signers for local
+                verification in a process pool instead of on the event loop.
+                Setting it enables local verification.
+            settlement_ledger: Optional ledger keyed by task id and nonce. A
+                duplicate submission waits for the first one and receives its
+                recorded outcome instead of re-running the delegate or
+                settling again.
+            deadline_policy: Optional policy deriving a deadline from the
+                requirement's ``max_timeout_seconds`` and splitting it across
+                verify, execute and settle. A phase that overruns is cancelled
+                and the payment fails with the phase recorded in the task's
+                failure metadata.
+            admission_controller: Optional concurrency limit with a priority
+                backlog. Payment submissions are admitted ahead of unpaid
+                requests and fair-queued per payer; under overload unpaid
+                requests are shed first.
+            streaming: Stream the delegate's artifact chunks and interim
+                status updates of paid requests as they are produced, holding
+                back only its closing events (``last_chunk``, final status)
+                until settlement succeeds. If the payment fails instead, the
+                stream is closed with a failed status.
+            credit_ledger: Optional ledger of prepaid balances per context. 402s
+                also offer a deposit covering many calls; once one settles,
+                later calls in the same context are debited locally and run
+                without a payment round trip or facilitator call.
+            entitlements: Optional authority that issues a signed entitlement
+                token with every settled payment. A request carrying a valid
+                token in its message metadata runs as paid after a local
+                signature check, scope check and use count.
         """
         super().__init__(delegate, config)
+        if requirements_store is not None:
+            self._payment_requirements_store = requirements_store
+        self._events = event_logger or PaymentEventLogger(logger)
+        self._optimistic_execution = optimistic_execution
+        self._settlement_queue = settlement_queue
+        self._verify_cache = verify_cache
+        self._replay_index = replay_index
+        self._local_verification = local_verification or signature_engine is not None
+        self._signature_engine = signature_engine
+        self._settlement_ledger = settlement_ledger
+        self._deadline_policy = deadline_policy
+        self._admission_controller = admission_controller
+        self._streaming = streaming
+        self._credit_ledger = credit_ledger
+        self._entitlements = entitlements
 
     @abstractmethod
     async def verify_payment(
@@ -91,29 +199,71 @@ class x402ServerExecutor(x402BaseExecutor, metaclass=ABCMeta):
         raise NotImplementedError
 
     async def execute(self, context: RequestContext, event_queue: EventQueue):
-        """Payment middleware: verify → execute service → settle."""
+        """Payment middleware: verify → execute service → settle.
+
+        Requests that carry no payment submission go straight to the
+        delegate, without any task events from this wrapper, so the
+        middleware costs a metadata lookup and nothing else.
+        """
+        if not self._is_payment_submission(context):
+            if self._admission_controller is not None:
+                return await self._execute_admitted(context, event_queue)
+            try:
+                return await self._delegate.execute(context, event_queue)
+            except x402PaymentRequiredException as e:
+                await self._handle_payment_required_exception(e, context, event_queue)
+                return
+
         # The wrapper MUST take responsibility for starting the task.
         # This ensures the task exists in the TaskManager before the delegate runs.
         updater = TaskUpdater(event_queue, context.task_id, context.context_id)
         if not context.current_task:
             await updater.submit()
         await updater.start_work()
+        if context.current_task is not None:
+            # Work on a copy: the task store's object is updated by the request
+            # handler as events are consumed. It still reads input-required,
+            # which must not end the client's stream before the receipt.
+            context.current_task = context.current_task.model_copy(deep=True)
+            context.current_task.status.state = TaskState.working
+        return await self._process_paid_request(context, event_queue)
 
-        task = context.current_task or Task(
-            id=context.task_id,
-            contextId=context.context_id,
-            status=TaskStatus(state=TaskState.working),
-        )
-        self.utils.get_payment_status(task)
+    @staticmethod
+    async def _publish(event_queue: EventQueue, task: Task) -> None:
+        """Sends a snapshot of ``task``, which this executor keeps updating."""
+        await event_queue.enqueue_event(task.model_copy(deep=True))
 
-        if (
-            self.utils.get_payment_status_from_task(context.current_task)
-            == PaymentStatus.PAYMENT_SUBMITTED
-            or self.utils.get_payment_status_from_message(context.message)
-            == PaymentStatus.PAYMENT_SUBMITTED
-        ):
-            return await self._process_paid_request(context, event_queue)
+    @staticmethod
+    def _is_payment_submission(context: RequestContext) -> bool:
+        """Checks the x402 status key of the message and the current task once."""
+        message = context.message
+        metadata = message.metadata if message is not None else None
+        if metadata and metadata.get(_STATUS_KEY) == _SUBMITTED:
+            return True
+        task = context.current_task
+        if task is None or task.status is None or task.status.message is None:
+            return False
+        metadata = task.status.message.metadata
+        return bool(metadata) and metadata.get(_STATUS_KEY) == _SUBMITTED
+
+    async def _execute_admitted(self, context: RequestContext, event_queue: EventQueue):
+        """Runs an unpaid request once the admission controller lets it in."""
+        try:
+            await self._admission_controller.acquire()
+        except AdmissionRejectedError as e:
+            self._events.warning("admission", "shed", task_id=context.task_id)
+            updater = TaskUpdater(event_queue, context.task_id, context.context_id)
+            await updater.reject(
+                updater.new_agent_message([TextPart(kind="text", text=str(e))])
+            )
+            return
+        try:
+            return await self._execute_unpaid(context, event_queue)
+        finally:
+            self._admission_controller.release()
 
+    async def _execute_unpaid(self, context: RequestContext, event_queue: EventQueue):
+        """Runs the delegate, turning a payment request into a 402."""
         try:
             return await self._delegate.execute(context, event_queue)
         except x402PaymentRequiredException as e:
@@ -124,20 +274,13 @@ class x402ServerExecutor(x402BaseExecutor, metaclass=ABCMeta):
         self, context: RequestContext, event_queue: EventQueue
     ):
         """Process paid request: verify → execute → settle."""
-        logger.info("Starting payment processing...")
         task = context.current_task
         if not task:
             logger.error("Task not found in context during payment processing.")
             raise ValueError("Task not found in context")
 
-        logger.info(
-            f"✅ Received payment payload. Beginning verification for task: {task.id}"
-        )
-
-        payment_payload = self.utils.get_payment_payload(
-            task
-        ) or self.utils.get_payment_payload_from_message(context.message)
-        if not payment_payload:
+        payment = PaymentContext.from_request(task, context, self.utils)
+        if not payment.payment_payload:
             logger.warning(
                 "Payment payload missing from both task and message metadata."
             )
@@ -146,115 +289,547 @@ class x402ServerExecutor(x402BaseExecutor, metaclass=ABCMeta):
                 x402ErrorCode.INVALID_SIGNATURE,
                 "Missing payment data",
                 event_queue,
+                payment,
             )
 
-        logger.info(
-            f"Retrieved payment payload: {payment_payload.model_dump_json(indent=2)}"
+        self._events.info(
+            "payment",
+            "received",
+            task_id=task.id,
+            payload=payment.payment_payload,
         )
 
-        logger.info(
-            f"Attempting to retrieve payment requirements for task ID: {task.id}"
-        )
-        payment_requirements = self._extract_payment_requirements_from_context(
-            task, context
+        if self._admission_controller is None:
+            return await self._process_submission(payment, event_queue)
+        authorization = payment.payment_payload.payload.authorization
+        try:
+            await self._admission_controller.acquire(
+                paid=True,
+                payer=authorization.from_,
+                amount=int(authorization.value) if authorization.value.isdigit() else 0,
+            )
+        except AdmissionRejectedError as e:
+            self._events.warning("admission", "shed", task_id=task.id, paid=True)
+            # The payment was not processed: there is no receipt, and its
+            # requirements stay stored so the client can resubmit.
+            task = self.utils.record_payment_failure(task, map_error_to_code(e), None)
+            await self._publish(event_queue, task)
+            return
+        try:
+            return await self._process_submission(payment, event_queue)
+        finally:
+            self._admission_controller.release()
+
+    async def _process_submission(
+        self, payment: PaymentContext, event_queue: EventQueue
+    ):
+        """Processes a submission once, replaying recorded outcomes to duplicates."""
+        task = payment.task
+        if self._settlement_ledger is not None:
+            nonce = payment.payment_payload.payload.authorization.nonce
+            async with self._settlement_ledger.guard(task.id, nonce) as recorded:
+                if recorded is not None:
+                    self._events.info("payment", "duplicate", task_id=task.id)
+                    await self._publish(event_queue, recorded)
+                    return
+                return await self._process_payment(payment, event_queue)
+
+        return await self._process_payment(payment, event_queue)
+
+    async def _process_payment(self, payment: PaymentContext, event_queue: EventQueue):
+        """Matches, verifies, executes and settles a parsed payment."""
+        task = payment.task
+        context = payment.request
+        payment_requirements = await self._extract_payment_requirements_from_context(
+            payment
         )
         if not payment_requirements:
+            if payment.accepts and PaymentRequirementsIndex.of(
+                payment.accepts
+            ).candidates(payment.payment_payload):
+                return await self._fail_payment(
+                    task,
+                    x402ErrorCode.INVALID_AMOUNT,
+                    "Payment value does not cover max_amount_required",
+                    event_queue,
+                    payment,
+                )
             logger.warning("Payment requirements missing from context.")
             return await self._fail_payment(
                 task,
                 x402ErrorCode.INVALID_SIGNATURE,
                 "Missing payment requirements",
                 event_queue,
+                payment,
             )
 
-        logger.info(
-            f"Retrieved payment requirements: {payment_requirements.model_dump_json(indent=2)}"
+        self._events.info(
+            "requirements",
+            "matched",
+            task_id=task.id,
+            requirements=payment_requirements,
         )
+        if self._deadline_policy is not None:
+            payment.deadline = self._deadline_policy.start(payment_requirements)
 
+        if self._replay_index is not None:
+            if not await self._replay_index.reserve(
+                payment.payment_payload, payment_requirements
+            ):
+                self._events.warning(
+                    "replay",
+                    "rejected",
+                    task_id=task.id,
+                    nonce=payment.payment_payload.payload.authorization.nonce,
+                )
+                return await self._fail_payment(
+                    task,
+                    x402ErrorCode.DUPLICATE_NONCE,
+                    "Payment nonce has already been used",
+                    event_queue,
+                    payment,
+                )
+            payment.nonce_reserved = True
+
+        if self._optimistic_execution:
+            return await self._process_optimistically(payment, event_queue)
+
+        if not await self._verify(payment, event_queue):
+            return
+
+        task = payment.task
+        delegate_queue = self._delegate_queue(payment, event_queue)
         try:
-            logger.info("Calling self.verify_payment...")
-            verify_response = await self.verify_payment(
-                payment_payload, payment_requirements
+            self._events.info("execute", "started", task_id=task.id)
+            async with asyncio.timeout(self._phase_timeout(payment, "execute")):
+                await self._delegate.execute(context, delegate_queue)
+            self._events.info("execute", "finished", task_id=task.id)
+        except TimeoutError:
+            return await self._fail_phase_timeout(payment, "execute", event_queue)
+        except Exception as e:
+            logger.error(f"Exception during delegate execution: {e}", exc_info=True)
+            return await self._fail_payment(
+                task,
+                x402ErrorCode.SETTLEMENT_FAILED,
+                f"Service failed: {e}",
+                event_queue,
+                payment,
             )
-            logger.info(
-                f"Verification response: {verify_response.model_dump_json(indent=2)}"
+
+        await self._settle(payment, event_queue)
+
+    async def _process_optimistically(
+        self, payment: PaymentContext, event_queue: EventQueue
+    ):
+        """Runs the delegate concurrently with verification, gating its output.
+
+        Removes a facilitator round trip from time-to-first-event for paid
+        requests, at the cost of wasted delegate work when verification fails.
+        """
+        task = payment.task
+        context = payment.request
+
+        # The delegate only ever runs as paid; if verification fails its
+        # buffered output is thrown away and the flag is withdrawn.
+        if not task.metadata:
+            task.metadata = {}
+        task.metadata["x402_payment_verified"] = True
+
+        buffered_queue = BufferedEventQueue(self._delegate_queue(payment, event_queue))
+        self._events.info("execute", "started", task_id=task.id, optimistic=True)
+        delegate_run = asyncio.create_task(
+            self._delegate.execute(context, buffered_queue)
+        )
+        try:
+            verified = await self._verify(payment, event_queue)
+            if not verified:
+                buffered_queue.discard()
+                delegate_run.cancel()
+                await asyncio.gather(delegate_run, return_exceptions=True)
+                task.metadata.pop("x402_payment_verified", None)
+                self._events.info(
+                    "execute", "discarded", task_id=task.id, optimistic=True
+                )
+                return
+
+            await buffered_queue.release()
+            try:
+                async with asyncio.timeout(self._phase_timeout(payment, "execute")):
+                    await delegate_run
+                self._events.info("execute", "finished", task_id=task.id)
+            except TimeoutError:
+                return await self._fail_phase_timeout(payment, "execute", event_queue)
+            except Exception as e:
+                logger.error(f"Exception during delegate execution: {e}", exc_info=True)
+                return await self._fail_payment(
+                    payment.task,
+                    x402ErrorCode.SETTLEMENT_FAILED,
+                    f"Service failed: {e}",
+                    event_queue,
+                    payment,
+                )
+        finally:
+            if not delegate_run.done():
+                delegate_run.cancel()
+
+        await self._settle(payment, event_queue)
+
+    async def _verify(self, payment: PaymentContext, event_queue: EventQueue) -> bool:
+        """Verifies the payment and marks the task verified for the delegate.
+
+        Returns:
+            True if the delegate may run; on failure the task has already been
+            failed and reported.
+        """
+        task = payment.task
+        verify_timeout = self._phase_timeout(payment, "verify")
+        if self._local_verification:
+            try:
+                if self._signature_engine is not None:
+                    async with asyncio.timeout(verify_timeout):
+                        await self._signature_engine.pre_verify(
+                            payment.payment_payload, payment.payment_requirements
+                        )
+                else:
+                    pre_verify_exact_payment(
+                        payment.payment_payload, payment.payment_requirements
+                    )
+            except PaymentVerificationError as e:
+                self._events.warning(
+                    "verify", "rejected", task_id=task.id, reason=str(e), local=True
+                )
+                await self._fail_payment(
+                    task, e.error_code, str(e), event_queue, payment
+                )
+                return False
+            except TimeoutError:
+                await self._fail_phase_timeout(payment, "verify", event_queue)
+                return False
+            except Exception as e:
+                # Local checks only reject; anything unexpected is a payload
+                # they could not make sense of.
+                self._events.warning(
+                    "verify", "rejected", task_id=task.id, reason=str(e), local=True
+                )
+                await self._fail_payment(
+                    task,
+                    x402ErrorCode.INVALID_SIGNATURE,
+                    f"Local verification failed: {e}",
+                    event_queue,
+                    payment,
+                )
+                return False
+
+        try:
+            async with asyncio.timeout(verify_timeout):
+                if self._verify_cache is not None:
+                    verify_response = await self._verify_cache.verify(
+                        payment.payment_payload,
+                        payment.payment_requirements,
+                        self.verify_payment,
+                        task.id,
+                    )
+                else:
+                    verify_response = await self.verify_payment(
+                        payment.payment_payload, payment.payment_requirements
+                    )
+            self._events.info(
+                "verify", "response", task_id=task.id, response=verify_response
             )
             if not verify_response.is_valid:
-                logger.warning(
-                    f"Payment verification failed: {verify_response.invalid_reason}"
+                self._events.warning(
+                    "verify",
+                    "rejected",
+                    task_id=task.id,
+                    reason=verify_response.invalid_reason,
                 )
-                return await self._fail_payment(
+                await self._fail_payment(
                     task,
                     x402ErrorCode.INVALID_SIGNATURE,
                     verify_response.invalid_reason or "Invalid payment",
                     event_queue,
+                    payment,
                 )
+                return False
+        except TimeoutError:
+            await self._fail_phase_timeout(payment, "verify", event_queue)
+            return False
         except Exception as e:
             logger.error(f"Exception during payment verification: {e}", exc_info=True)
-            return await self._fail_payment(
+            await self._fail_payment(
                 task,
-                x402ErrorCode.INVALID_SIGNATURE,
+                # e.g. FacilitatorUnavailableError carries its own code
+                getattr(e, "error_code", None) or x402ErrorCode.INVALID_SIGNATURE,
                 f"Verification failed: {e}",
                 event_queue,
+                payment,
             )
+            return False
 
-        logger.info("Payment verified successfully. Recording and updating task.")
+        payment.verify_response = verify_response
+        payment.status = PaymentStatus.PAYMENT_VERIFIED
+        await self._payment_requirements_store.record_verified(
+            task.id,
+            payment.payment_payload,
+            payment.payment_requirements,
+            verify_response,
+        )
         task = self.utils.record_payment_verified(task)
-        await event_queue.enqueue_event(task)
+        await self._publish(event_queue, task)
 
         # Add the verification status to the task metadata for the delegate agent.
         if not task.metadata:
             task.metadata = {}
         task.metadata["x402_payment_verified"] = True
-        logger.info("Set x402_payment_verified=True in task.metadata")
 
         if (
             not hasattr(task.status.message, "metadata")
             or not task.status.message.metadata
         ):
             task.status.message.metadata = {}
-        try:
-            logger.info("Executing delegate agent...")
-            await self._delegate.execute(context, event_queue)
-            logger.info("Delegate agent execution finished.")
-        except Exception as e:
-            logger.error(f"Exception during delegate execution: {e}", exc_info=True)
-            return await self._fail_payment(
-                task,
-                x402ErrorCode.SETTLEMENT_FAILED,
-                f"Service failed: {e}",
+        payment.task = task
+        return True
+
+    def _forget_verification(self, payment: PaymentContext, settled: bool) -> None:
+        """Retires a cached verification once its payment has an outcome.
+
+        A settled authorization is remembered as spent; a failed one is
+        dropped so the payer can retry it.
+        """
+        if self._verify_cache is None:
+            return
+        if settled:
+            self._verify_cache.record_settled(
+                payment.payment_payload, payment.payment_requirements
+            )
+        else:
+            self._verify_cache.release(
+                payment.payment_payload, payment.payment_requirements, payment.task_id
+            )
+
+    async def _release_nonce(self, payment: PaymentContext) -> None:
+        """Lets a nonce be resubmitted after its payment failed before settling.
+
+        Once settlement has been attempted the authorization may be on chain,
+        so the nonce stays used.
+        """
+        if not payment.nonce_reserved or payment.settle_attempted:
+            return
+        payment.nonce_reserved = False
+        await self._replay_index.release(
+            payment.payment_payload, payment.payment_requirements
+        )
+
+    @staticmethod
+    def _nonce(payment: PaymentContext) -> str:
+        return payment.payment_payload.payload.authorization.nonce
+
+    def _record_outcome(self, payment: PaymentContext, task: Task) -> None:
+        """Records a submission's final task for duplicates of it."""
+        if self._settlement_ledger is not None:
+            self._settlement_ledger.record(task.id, self._nonce(payment), task)
+
+    def _delegate_queue(
+        self, payment: PaymentContext, event_queue: EventQueue
+    ) -> EventQueue:
+        """Returns the queue the delegate of a paid request writes to.
+
+        Streaming gates the delegate's closing events on settlement, and
+        ``upto`` payments meter its output for the amount to settle.
+        """
+        queue = event_queue
+        if self._streaming:
+            payment.stream = queue = SettlementGatedEventQueue(queue)
+        requirements = payment.payment_requirements
+        if requirements.scheme == UPTO_SCHEME:
+            unit = (requirements.extra or {}).get("unit", "token")
+            payment.meter = queue = UsageMeter(queue, unit)
+        return queue
+
+    async def _apply_metered_usage(self, payment: PaymentContext) -> None:
+        """Replaces an ``upto`` payment's ceiling with the metered amount."""
+        requirements = metered_requirements(
+            payment.payment_requirements, payment.meter.units
+        )
+        payment.payment_requirements = requirements
+        self._events.info(
+            "settle",
+            "metered",
+            task_id=payment.task_id,
+            units=payment.meter.units,
+            unit=payment.meter.unit,
+            amount=requirements.max_amount_required,
+        )
+        # A settlement resumed after a restart must charge the metered amount.
+        await self._payment_requirements_store.record_verified(
+            payment.task_id,
+            payment.payment_payload,
+            requirements,
+            payment.verify_response,
+        )
+
+    async def _send_outcome(
+        self,
+        payment: Optional[PaymentContext],
+        task: Task,
+        event_queue: EventQueue,
+        settled: bool,
+    ):
+        """Sends the task with its payment outcome, ending a streamed response.
+
+        A streamed response that failed gets a single terminal ``failed``
+        status carrying the outcome in place of the task.
+        """
+        stream = None
+        if payment is not None:
+            stream, payment.stream = payment.stream, None
+        if stream is not None and not settled:
+            stream.discard()
+            updater = TaskUpdater(event_queue, task.id, task.context_id)
+            await updater.failed(message=task.status.message)
+            return
+        await self._publish(event_queue, task)
+        if stream is not None:
+            await stream.release()
+
+    @staticmethod
+    def _phase_timeout(payment: PaymentContext, phase: str) -> Optional[float]:
+        """Seconds left for a phase of the request (None without a deadline)."""
+        if payment.deadline is None:
+            return None
+        return payment.deadline.remaining(phase)
+
+    async def _fail_phase_timeout(
+        self, payment: PaymentContext, phase: str, event_queue: EventQueue
+    ):
+        """Fails a payment whose phase ran past the request deadline."""
+        self._events.warning(phase, "timeout", task_id=payment.task_id)
+        await self._fail_payment(
+            payment.task,
+            x402ErrorCode.SETTLEMENT_FAILED,
+            f"Request deadline exceeded during {phase}",
+            event_queue,
+            payment,
+            timeout_phase=phase,
+        )
+
+    async def _settle_within_deadline(self, payment: PaymentContext) -> SettleResponse:
+        payment.settle_attempted = True
+        async with asyncio.timeout(self._phase_timeout(payment, "settle")):
+            return await self.settle_payment(
+                payment.payment_payload, payment.payment_requirements
+            )
+
+    async def _settle(self, payment: PaymentContext, event_queue: EventQueue):
+        """Settles a verified payment and reports the outcome on the task.
+
+        With a settlement queue configured, a worker settles the payment and
+        this waits for it: the request handler closes ``event_queue`` as soon
+        as ``execute`` returns, so the receipt must be pushed before then.
+        """
+        if payment.meter is not None:
+            await self._apply_metered_usage(payment)
+            if int(payment.payment_requirements.max_amount_required) == 0:
+                # Nothing was used, so there is nothing to transfer on-chain.
+                self._events.info("settle", "skipped", task_id=payment.task_id)
+                return await self._complete_settlement(
+                    payment,
+                    event_queue,
+                    SettleResponse(
+                        success=True,
+                        network=payment.network,
+                        payer=payment.verify_response.payer
+                        if payment.verify_response
+                        else None,
+                    ),
+                    None,
+                )
+        if self._settlement_queue is not None:
+            job = await self._settlement_queue.submit(
+                payment,
                 event_queue,
+                settle=lambda: self._settle_within_deadline(payment),
+                complete=lambda response, error: self._complete_settlement(
+                    payment, event_queue, response, error
+                ),
             )
+            self._events.info("settle", "queued", task_id=payment.task_id)
+            if self._settlement_ledger is not None:
+                self._settlement_ledger.record_pending(
+                    payment.task_id, self._nonce(payment), payment.task, job.done
+                )
+            # Shielded: a cancelled request must not cancel the job's outcome,
+            # which duplicate submissions wait on.
+            await asyncio.shield(job.done)
+            return
 
-        logger.info("Delegate execution complete. Proceeding to settlement.")
+        try:
+            settle_response = await self._settle_within_deadline(payment)
+        except Exception as e:
+            return await self._complete_settlement(payment, event_queue, None, e)
+        await self._complete_settlement(payment, event_queue, settle_response, None)
 
+    async def _complete_settlement(
+        self,
+        payment: PaymentContext,
+        event_queue: EventQueue,
+        settle_response: Optional[SettleResponse],
+        error: Optional[BaseException],
+    ):
+        """Records a settlement outcome on the task and emits it."""
+        task = payment.task
         try:
-            logger.info("Calling self.settle_payment...")
-            settle_response = await self.settle_payment(
-                payment_payload, payment_requirements
+            if error is not None:
+                raise error
+            self._events.info(
+                "settle", "response", task_id=task.id, response=settle_response
             )
-            logger.info(
-                f"Settlement response: {settle_response.model_dump_json(indent=2)}"
+            payment.settle_response = settle_response
+            await self._payment_requirements_store.record_settlement(
+                task.id, settle_response
             )
+            self._forget_verification(payment, settle_response.success)
             if settle_response.success:
-                logger.info("Settlement successful. Recording payment success.")
+                payment.status = PaymentStatus.PAYMENT_COMPLETED
                 task = self.utils.record_payment_success(task, settle_response)
-
-                self._payment_requirements_store.pop(task.id, None)
+                if self._credit_ledger is not None and CreditLedger.is_deposit(
+                    payment.payment_requirements
+                ):
+                    self._open_credit(payment, task)
+                elif self._entitlements is not None:
+                    # A deposit already prepays later calls as credit.
+                    task = self.utils.record_entitlement(
+                        task,
+                        self._entitlements.issue(
+                            payment.payment_requirements,
+                            payment.payment_payload.payload.authorization.from_,
+                        ),
+                    )
             else:
-                logger.warning(f"Settlement failed: {settle_response.error_reason}")
+                self._events.warning(
+                    "settle",
+                    "failed",
+                    task_id=task.id,
+                    reason=settle_response.error_reason,
+                )
                 error_code = (
                     x402ErrorCode.INSUFFICIENT_FUNDS
                     if "insufficient" in (settle_response.error_reason or "").lower()
                     else x402ErrorCode.SETTLEMENT_FAILED
                 )
+                payment.status = PaymentStatus.PAYMENT_FAILED
                 task = self.utils.record_payment_failure(
                     task, error_code, settle_response
                 )
 
-                self._payment_requirements_store.pop(task.id, None)
-            await event_queue.enqueue_event(task)
-            logger.info("Settlement processing finished.")
+            await self._payment_requirements_store.delete(task.id)
+            payment.task = task
+            self._record_outcome(payment, task)
+            await self._send_outcome(
+                payment, task, event_queue, settle_response.success
+            )
+        except TimeoutError:
+            await self._fail_phase_timeout(payment, "settle", event_queue)
         except Exception as e:
             logger.error(f"Exception during settlement: {e}", exc_info=True)
             await self._fail_payment(
@@ -262,52 +837,88 @@ class x402ServerExecutor(x402BaseExecutor, metaclass=ABCMeta):
                 x402ErrorCode.SETTLEMENT_FAILED,
                 f"Settlement failed: {e}",
                 event_queue,
+                payment,
             )
 
-    def _find_matching_payment_requirement(
+    async def recover_pending_settlements(self) -> int:
+        """Settles payments that were verified but never settled.
+
+        Call once at startup when using a durable requirements store, so that
+        payments interrupted by a restart are still collected. Outcomes are
+        recorded in the store; there is no client event queue to notify.
+
+        Returns:
+            Number of pending settlements that were attempted
+        """
+        pending = await self._payment_requirements_store.pending_settlements()
+        for entry in pending:
+            logger.info(f"Resuming settlement for task {entry.task_id}")
+            try:
+                settle_response = await self.settle_payment(
+                    entry.payment_payload, entry.payment_requirements
+                )
+            except Exception as e:
+                logger.error(
+                    f"Recovered settlement failed for task {entry.task_id}: {e}",
+                    exc_info=True,
+                )
+                settle_response = SettleResponse(
+                    success=False,
+                    network=entry.payment_requirements.network,
+                    error_reason=f"Settlement failed: {e}",
+                )
+            await self._payment_requirements_store.record_settlement(
+                entry.task_id, settle_response
+            )
+            await self._payment_requirements_store.delete(entry.task_id)
+        return len(pending)
+
+    async def _find_matching_payment_requirement(
         self,
-        accepts_array: List[PaymentRequirements],
+        accepts_array: Sequence[PaymentRequirements],
         payment_payload: PaymentPayload,
     ) -> Optional[PaymentRequirements]:
         """
-        Finds a matching payment requirement from the stored list.
-        Developers can override this method to implement custom matching logic.
-        """
-        logger.info("Searching for matching payment requirement...")
-        for requirement in accepts_array:
-            scheme_match = requirement.scheme == payment_payload.scheme
-            network_match = requirement.network == payment_payload.network
+        Finds the stored requirement the payment was made for.
 
-            if scheme_match and network_match:
-                logger.info("  => Found a matching payment requirement.")
-                return requirement
-
-        logger.warning(
-            "No matching payment requirement found after checking all options."
+        Matches scheme, network and payee through the index built when the
+        402 was issued, and requires the authorized value to cover
+        ``max_amount_required``. When tiers in several assets are covered,
+        the signer is recovered off the event loop (in the signature engine's
+        pool, if configured) to find the signed asset. Developers can
+        override this method to implement custom matching logic.
+        """
+        requirement = await PaymentRequirementsIndex.of(accepts_array).match_async(
+            payment_payload,
+            self._signature_engine.recover_signer
+            if self._signature_engine is not None
+            else None,
         )
-        return None
+        if requirement is None:
+            logger.warning(
+                "No matching payment requirement found after checking all options."
+            )
+        return requirement
 
-    def _extract_payment_requirements_from_context(
-        self, task: Task, context: RequestContext
+    async def _extract_payment_requirements_from_context(
+        self, payment: PaymentContext
     ) -> Optional[PaymentRequirements]:
         """
         Extracts the matching payment requirements based on the payment payload.
         """
-        accepts_array = self._payment_requirements_store.get(task.id)
+        task_id = payment.task_id
+        accepts_array = await self._payment_requirements_store.get(task_id)
         if not accepts_array:
             logger.warning(
-                f"No payment requirements found in store for task ID: {task.id}"
+                f"No payment requirements found in store for task ID: {task_id}"
             )
             return None
 
-        payment_payload = self.utils.get_payment_payload(
-            task
-        ) or self.utils.get_payment_payload_from_message(context.message)
-        if not payment_payload:
-            logger.warning("Could not extract payment payload from task or message.")
-            return None
-
-        return self._find_matching_payment_requirement(accepts_array, payment_payload)
+        payment.accepts = accepts_array
+        payment.payment_requirements = await self._find_matching_payment_requirement(
+            accepts_array, payment.payment_payload
+        )
+        return payment.payment_requirements
 
     async def _handle_payment_required_exception(
         self,
@@ -344,8 +955,28 @@ class x402ServerExecutor(x402BaseExecutor, metaclass=ABCMeta):
         accepts_array = exception.get_accepts_array()
         error_message = str(exception)
 
-        # Store payment requirements for later correlation
-        self._payment_requirements_store[task.id] = accepts_array
+        if self._entitlements is not None:
+            if await self._pay_with_entitlement(
+                accepts_array, task, context, event_queue
+            ):
+                return
+        if self._credit_ledger is not None:
+            if await self._pay_with_credit(accepts_array, task, context, event_queue):
+                return
+            accepts_array = [
+                *accepts_array,
+                *(
+                    self._credit_ledger.deposit_requirements(requirement)
+                    for requirement in accepts_array
+                    if requirement.scheme == "exact"
+                ),
+            ]
+
+        # Store payment requirements for later correlation, indexed so the
+        # submitted payment resolves without scanning them.
+        await self._payment_requirements_store.put(
+            task.id, PaymentRequirementsIndex(accepts_array)
+        )
 
         payment_required = x402PaymentRequiredResponse(
             x402_version=1, accepts=accepts_array, error=error_message
@@ -355,17 +986,182 @@ class x402ServerExecutor(x402BaseExecutor, metaclass=ABCMeta):
         task = self.utils.create_payment_required_task(task, payment_required)
 
         # Send the payment required response
-        await event_queue.enqueue_event(task)
+        await self._publish(event_queue, task)
+
+    def _open_credit(self, payment: PaymentContext, task: Task) -> None:
+        """Credits a settled deposit to the payment's context."""
+        balance = self._credit_ledger.open(
+            payment.request.context_id,
+            payment.payment_payload,
+            payment.payment_requirements,
+        )
+        self._events.info("credit", "deposited", task_id=task.id, balance=str(balance))
+        task.status.message.metadata[self.utils.CREDIT_KEY] = {
+            "debited": payment.payment_requirements.extra[CREDIT_EXTRA_KEY]["debit"],
+            "balance": str(balance),
+        }
+
+    async def _pay_with_credit(
+        self,
+        accepts_array: Sequence[PaymentRequirements],
+        task: Task,
+        context: RequestContext,
+        event_queue: EventQueue,
+    ) -> bool:
+        """Runs the delegate as paid if the context's credit covers the call.
+
+        Returns:
+            False if there is no credit to debit, so a 402 must be issued
+        """
+        for requirement in accepts_array:
+            if requirement.scheme != "exact":
+                continue
+            balance = self._credit_ledger.debit(context.context_id, requirement)
+            if balance is not None:
+                break
+        else:
+            return False
+
+        amount = requirement.max_amount_required
+        self._events.info(
+            "credit",
+            "debited",
+            task_id=task.id,
+            amount=amount,
+            balance=str(balance),
+        )
+        task = await self._execute_prepaid(
+            task,
+            context,
+            event_queue,
+            lambda: self._credit_ledger.refund(context.context_id, requirement),
+        )
+        if task is None:
+            return False
+        task = self.utils.record_credit_debit(task, amount, balance)
+        await self._publish(event_queue, task)
+        return True
+
+    async def _pay_with_entitlement(
+        self,
+        accepts_array: Sequence[PaymentRequirements],
+        task: Task,
+        context: RequestContext,
+        event_queue: EventQueue,
+    ) -> bool:
+        """Runs the delegate as paid if the request carries a valid entitlement.
+
+        Returns:
+            False if there is no token accepted for the requested resource
+        """
+        metadata = context.message.metadata if context.message is not None else None
+        token = metadata.get(self.utils.ENTITLEMENT_KEY) if metadata else None
+        if not isinstance(token, str):
+            return False
+        for requirements in accepts_array:
+            entitlement = self._entitlements.check(token, requirements)
+            if entitlement is not None:
+                break
+        else:
+            self._events.warning("entitlement", "rejected", task_id=task.id)
+            return False
+
+        self._events.info(
+            "entitlement",
+            "accepted",
+            task_id=task.id,
+            resource=entitlement.resource,
+            uses_left=entitlement.uses_left,
+        )
+        task = await self._execute_prepaid(
+            task,
+            context,
+            event_queue,
+            lambda: self._entitlements.release(entitlement),
+        )
+        if task is None:
+            return False
+        task = self.utils.record_entitlement(
+            task,
+            {
+                "resource": entitlement.resource,
+                "expiresAt": entitlement.expires_at,
+                "usesLeft": entitlement.uses_left,
+            },
+        )
+        await self._publish(event_queue, task)
+        return True
+
+    async def _execute_prepaid(
+        self,
+        task: Task,
+        context: RequestContext,
+        event_queue: EventQueue,
+        rollback: Callable[[], None],
+    ) -> Optional[Task]:
+        """Runs the delegate for a call that was paid for in advance.
+
+        ``rollback`` undoes the charge if the delegate fails.
+
+        Returns:
+            The completed task, or None if the delegate still asked for a
+            payment, so a 402 must be issued
+        """
+        updater = TaskUpdater(event_queue, task.id, task.context_id)
+        if not context.current_task:
+            await updater.submit()
+        await updater.start_work()
+        task.status.state = TaskState.working
+        if task.metadata is None:
+            task.metadata = {}
+        task.metadata["x402_payment_verified"] = True
+        context.current_task = task
+        try:
+            await self._delegate.execute(context, event_queue)
+        except BaseException as e:
+            rollback()
+            task.metadata.pop("x402_payment_verified", None)
+            if isinstance(e, x402PaymentRequiredException):
+                return None
+            raise
+        task.status.state = TaskState.completed
+        return task
 
     async def _fail_payment(
-        self, task, error_code: str, error_reason: str, event_queue: EventQueue
+        self,
+        task,
+        error_code: str,
+        error_reason: str,
+        event_queue: EventQueue,
+        payment: Optional[PaymentContext] = None,
+        timeout_phase: Optional[str] = None,
     ):
         """Handle payment failure."""
         failure_response = SettleResponse(
-            success=False, network="base", error_reason=error_reason
+            success=False,
+            network=payment.network if payment else "base",
+            error_reason=error_reason,
         )
-        task = self.utils.record_payment_failure(task, error_code, failure_response)
+        # Once verified, the service has run (or started); duplicates must
+        # get this outcome rather than a second attempt.
+        verified = payment is not None and (
+            payment.status == PaymentStatus.PAYMENT_VERIFIED
+        )
+        if payment:
+            if payment.payment_requirements is not None:
+                self._forget_verification(payment, False)
+            await self._release_nonce(payment)
+            payment.status = PaymentStatus.PAYMENT_FAILED
+            payment.settle_response = failure_response
+        task = self.utils.record_payment_failure(
+            task, error_code, failure_response, timeout_phase
+        )
+        if verified:
+            self._record_outcome(payment, task)
 
-        self._payment_requirements_store.pop(task.id, None)
+        await self._payment_requirements_store.record_settlement(
+            task.id, failure_response
+        )
+        await self._payment_requirements_store.delete(task.id)
 
-        await event_queue.enqueue_event(task)
+        await self._send_outcome(payment, task, event_queue, False)
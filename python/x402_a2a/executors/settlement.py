@@ -0,0 +1,263 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Settlement worker pool that retries transient facilitator errors."""
+
+import asyncio
+import logging
+import random
+import time
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from ..types import EventQueue, SettleResponse
+from .payment_context import PaymentContext
+
+
+logger = logging.getLogger(__name__)
+
+SettleCallable = Callable[[], Awaitable[SettleResponse]]
+CompleteCallable = Callable[
+    [Optional[SettleResponse], Optional[BaseException]], Awaitable[None]
+]
+JobHook = Callable[["SettlementJob"], Awaitable[None]]
+
+
+class SettlementJob:
+    """A verified payment waiting to be settled."""
+
+    __slots__ = (
+        "payment",
+        "event_queue",
+        "settle",
+        "complete",
+        "attempts",
+        "enqueued_at",
+        "done",
+    )
+
+    def __init__(
+        self,
+        payment: PaymentContext,
+        event_queue: EventQueue,
+        settle: SettleCallable,
+        complete: CompleteCallable,
+    ):
+        self.payment = payment
+        self.event_queue = event_queue
+        self.settle = settle
+        self.complete = complete
+        self.attempts = 0
+        self.enqueued_at = time.monotonic()
+        self.done: "asyncio.Future[Optional[SettleResponse]]" = (
+            asyncio.get_running_loop().create_future()
+        )
+
+    @property
+    def task_id(self) -> str:
+        return self.payment.task_id
+
+
+class SettlementQueue:
+    """Asyncio queue of settlements drained by a pool of workers.
+
+    The server executor hands a verified payment to the queue once the
+    delegate has produced its result and waits on the job's ``done`` future.
+    A worker settles it, retrying transient errors with exponential backoff,
+    and the executor's completion callback pushes the payment receipt
+    through the task's event queue before the request returns, since a2a
+    closes that queue once ``execute`` has finished. The worker count bounds
+    how many settlements reach the facilitator at once, however many
+    requests are waiting on them.
+
+    Only exceptions raised while settling are retried. A SettleResponse with
+    ``success=False`` is a final answer from the facilitator, and so is
+    running out of the request deadline's settle phase.
+
+    Example:
+        settlements = SettlementQueue(workers=8, max_retries=5)
+        server = MyServerExecutor(agent, config, settlement_queue=settlements)
+        ...
+        await settlements.close()  # on shutdown
+    """
+
+    def __init__(
+        self,
+        workers: int = 4,
+        max_retries: int = 3,
+        backoff_base: float = 0.5,
+        backoff_max: float = 30.0,
+        max_queue_size: int = 10_000,
+        on_enqueued: Optional[JobHook] = None,
+        on_completed: Optional[JobHook] = None,
+    ):
+        """Initialize the queue; workers start with the first submission.
+
+        Args:
+            workers: Number of concurrent settlement workers
+            max_retries: Retries after the first failed attempt
+            backoff_base: Initial retry delay in seconds, doubled per attempt
+            backoff_max: Upper bound on a single retry delay
+            max_queue_size: Pending jobs before ``submit`` applies backpressure
+            on_enqueued: Optional persistence hook called when a job is queued
+            on_completed: Optional persistence hook called when a job finishes
+        """
+        if workers <= 0:
+            raise ValueError("workers must be greater than 0")
+        self._worker_count = workers
+        self._max_retries = max_retries
+        self._backoff_base = backoff_base
+        self._backoff_max = backoff_max
+        self._max_queue_size = max_queue_size
+        self._on_enqueued = on_enqueued
+        self._on_completed = on_completed
+
+        self._queue: Optional["asyncio.Queue[Optional[SettlementJob]]"] = None
+        self._workers: List["asyncio.Task[None]"] = []
+        self._closed = False
+
+        self._in_flight = 0
+        self._settled = 0
+        self._failed = 0
+        self._retries = 0
+
+    def _ensure_started(self) -> "asyncio.Queue[Optional[SettlementJob]]":
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self._max_queue_size)
+            self._workers = [
+                asyncio.create_task(self._worker(), name=f"x402-settlement-{i}")
+                for i in range(self._worker_count)
+            ]
+        return self._queue
+
+    async def submit(
+        self,
+        payment: PaymentContext,
+        event_queue: EventQueue,
+        settle: SettleCallable,
+        complete: CompleteCallable,
+    ) -> SettlementJob:
+        """Queues a settlement and returns its job; await ``job.done`` for it.
+
+        Args:
+            payment: Verified payment to settle
+            event_queue: The task's event queue for deferred updates
+            settle: Performs one settlement attempt
+            complete: Records the outcome (response or final exception)
+        """
+        if self._closed:
+            raise RuntimeError("SettlementQueue is closed")
+        queue = self._ensure_started()
+        job = SettlementJob(payment, event_queue, settle, complete)
+        if self._on_enqueued:
+            await self._on_enqueued(job)
+        await queue.put(job)
+        return job
+
+    async def _worker(self) -> None:
+        queue = self._queue
+        while True:
+            job = await queue.get()
+            try:
+                if job is None:
+                    return
+                self._in_flight += 1
+                await self._run(job)
+            except Exception as e:
+                logger.error(f"Settlement worker error: {e}", exc_info=True)
+            finally:
+                if job is not None:
+                    self._in_flight -= 1
+                    self._abandon(job)
+                queue.task_done()
+
+    async def _run(self, job: SettlementJob) -> None:
+        response: Optional[SettleResponse] = None
+        error: Optional[BaseException] = None
+        while True:
+            job.attempts += 1
+            try:
+                response = await job.settle()
+                error = None
+                break
+            except Exception as e:
+                error = e
+                if job.attempts > self._max_retries or self._past_deadline(job):
+                    break
+                self._retries += 1
+                delay = min(
+                    self._backoff_max, self._backoff_base * 2 ** (job.attempts - 1)
+                )
+                logger.warning(
+                    f"Settlement attempt {job.attempts} for task {job.task_id} "
+                    f"failed: {e}; retrying in {delay:.2f}s"
+                )
+                # Full jitter keeps retries from a facilitator outage in step.
+                await asyncio.sleep(random.uniform(0, delay))
+
+        if response is not None and response.success:
+            self._settled += 1
+        else:
+            self._failed += 1
+
+        try:
+            await job.complete(response, error)
+        finally:
+            if self._on_completed:
+                await self._on_completed(job)
+            if not job.done.done():
+                job.done.set_result(response)
+
+    @staticmethod
+    def _abandon(job: SettlementJob) -> None:
+        """Releases a request waiting on a job that will not complete."""
+        if not job.done.done():
+            job.done.set_result(None)
+
+    @staticmethod
+    def _past_deadline(job: SettlementJob) -> bool:
+        """Whether the request deadline leaves no time for another attempt."""
+        deadline = job.payment.deadline
+        return deadline is not None and deadline.remaining("settle") <= 0
+
+    async def join(self) -> None:
+        """Waits until every queued settlement has completed."""
+        if self._queue is not None:
+            await self._queue.join()
+
+    async def close(self, drain: bool = True) -> None:
+        """Stops the workers, by default after finishing queued settlements."""
+        self._closed = True
+        if self._queue is None:
+            return
+        if drain:
+            await self._queue.join()
+            for _ in self._workers:
+                await self._queue.put(None)
+            await asyncio.gather(*self._workers, return_exceptions=True)
+        else:
+            for worker in self._workers:
+                worker.cancel()
+            await asyncio.gather(*self._workers, return_exceptions=True)
+            while not self._queue.empty():
+                job = self._queue.get_nowait()
+                if job is not None:
+                    self._abandon(job)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "in_flight": self._in_flight,
+            "settled": self._settled,
+            "failed": self._failed,
+            "retries": self._retries,
+        }
@@ -0,0 +1,233 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Verification result cache for resubmitted payment authorizations."""
+
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+from ..types import PaymentPayload, PaymentRequirements, VerifyResponse
+
+VerifyCallable = Callable[
+    [PaymentPayload, PaymentRequirements], Awaitable[VerifyResponse]
+]
+
+
+def authorization_digest(
+    payload: PaymentPayload, requirements: PaymentRequirements
+) -> str:
+    """Hashes a signed authorization together with the terms it is checked against.
+
+    The requirement fields are part of the key because the same signature can
+    be valid for one set of requirements and invalid for another.
+    """
+    authorization = payload.payload.authorization
+    material = "\x1f".join(
+        (
+            payload.scheme,
+            payload.network,
+            payload.payload.signature,
+            authorization.from_,
+            authorization.to,
+            authorization.value,
+            authorization.valid_after,
+            authorization.valid_before,
+            authorization.nonce,
+            requirements.pay_to,
+            requirements.asset,
+            requirements.max_amount_required,
+        )
+    )
+    return hashlib.sha256(material.encode()).hexdigest()
+
+
+class VerifyCache:
+    """Caches successful verifications until the authorization expires.
+
+    Clients retry, resubmit the same payload on a task, or race two
+    submissions; each would otherwise cost a facilitator round trip. Valid
+    responses are kept until the authorization's ``validBefore``, and
+    concurrent verifies of the same authorization share one in-flight call.
+    Invalid responses are shared with concurrent callers but not cached, since
+    conditions such as the payer's balance can change.
+
+    A valid authorization is claimed by the first task it verifies for.
+    Another task presenting it gets an invalid response without a facilitator
+    call, so one payment never runs the delegate twice. Once settled, the
+    authorization stays marked as spent until it expires. If its settlement
+    fails, it is released for the payer to retry.
+
+    Example:
+        server = MyServerExecutor(agent, config, verify_cache=VerifyCache())
+    """
+
+    def __init__(self, max_entries: int = 10_000):
+        """Initialize the cache.
+
+        Args:
+            max_entries: Cached responses kept before the least recently used
+                ones are evicted
+        """
+        if max_entries <= 0:
+            raise ValueError("max_entries must be greater than 0")
+        self._max_entries = max_entries
+        # digest -> (response, expires_at as unix time)
+        self._entries: "OrderedDict[str, Tuple[VerifyResponse, float]]" = OrderedDict()
+        self._in_flight: Dict[str, "asyncio.Task[VerifyResponse]"] = {}
+        # digest -> task id that claimed the authorization
+        self._claims: "OrderedDict[str, str]" = OrderedDict()
+
+        self._hits = 0
+        self._misses = 0
+        self._coalesced = 0
+        self._conflicts = 0
+
+    def _lookup(self, key: str) -> Optional[VerifyResponse]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        response, expires_at = entry
+        if expires_at <= time.time():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return response
+
+    def _store(self, key: str, response: VerifyResponse, expires_at: float) -> None:
+        self._entries[key] = (response, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    async def verify(
+        self,
+        payload: PaymentPayload,
+        requirements: PaymentRequirements,
+        verify: VerifyCallable,
+        task_id: Optional[str] = None,
+    ) -> VerifyResponse:
+        """Returns a cached or shared result, calling ``verify`` at most once.
+
+        Args:
+            payload: Submitted payment payload
+            requirements: Requirement the payload is verified against
+            verify: Performs the actual facilitator verification
+            task_id: Task the payment is for; a valid authorization already
+                claimed by another task is reported invalid
+        """
+        key = authorization_digest(payload, requirements)
+        cached = self._lookup(key)
+        if cached is not None:
+            self._hits += 1
+            return self._claim(key, task_id, cached)
+
+        in_flight = self._in_flight.get(key)
+        if in_flight is None:
+            self._misses += 1
+            in_flight = asyncio.ensure_future(verify(payload, requirements))
+            self._in_flight[key] = in_flight
+            try:
+                expires_at = float(payload.payload.authorization.valid_before)
+            except ValueError:
+                expires_at = 0.0  # unparseable window: share, but never cache
+            in_flight.add_done_callback(
+                lambda done: self._on_verified(key, expires_at, done)
+            )
+        else:
+            self._coalesced += 1
+
+        # Shielded so one caller giving up does not cancel the shared call.
+        return self._claim(key, task_id, await asyncio.shield(in_flight))
+
+    def _claim(
+        self, key: str, task_id: Optional[str], response: VerifyResponse
+    ) -> VerifyResponse:
+        if task_id is None or not response.is_valid:
+            return response
+        current = self._lookup(key)
+        if current is not None and not current.is_valid:
+            # Settled by another task while this one waited on the shared call.
+            self._conflicts += 1
+            return current
+        owner = self._claims.setdefault(key, task_id)
+        if owner != task_id:
+            self._conflicts += 1
+            return VerifyResponse(
+                is_valid=False,
+                invalid_reason="Payment authorization is in use by another task",
+                payer=response.payer,
+            )
+        self._claims.move_to_end(key)
+        while len(self._claims) > self._max_entries:
+            self._claims.popitem(last=False)
+        return response
+
+    def _on_verified(
+        self, key: str, expires_at: float, done: "asyncio.Task[VerifyResponse]"
+    ) -> None:
+        self._in_flight.pop(key, None)
+        if done.cancelled() or done.exception() is not None:
+            return
+        response = done.result()
+        if response.is_valid and expires_at > time.time():
+            self._store(key, response, expires_at)
+
+    def invalidate(self, payload: PaymentPayload, requirements: PaymentRequirements):
+        """Drops the cached result and claim for an authorization."""
+        key = authorization_digest(payload, requirements)
+        self._entries.pop(key, None)
+        self._claims.pop(key, None)
+
+    def release(
+        self, payload: PaymentPayload, requirements: PaymentRequirements, task_id: str
+    ) -> None:
+        """Drops an authorization claimed by ``task_id`` after its payment failed.
+
+        Does nothing for a task that never held the claim, so a rejected
+        duplicate cannot release another task's payment.
+        """
+        key = authorization_digest(payload, requirements)
+        if self._claims.get(key) == task_id:
+            del self._claims[key]
+            self._entries.pop(key, None)
+
+    def record_settled(
+        self, payload: PaymentPayload, requirements: PaymentRequirements
+    ) -> None:
+        """Marks an authorization as spent until it expires."""
+        key = authorization_digest(payload, requirements)
+        self._claims.pop(key, None)
+        try:
+            expires_at = float(payload.payload.authorization.valid_before)
+        except ValueError:
+            self._entries.pop(key, None)
+            return
+        spent = VerifyResponse(
+            is_valid=False,
+            invalid_reason="Payment authorization has already been settled",
+            payer=payload.payload.authorization.from_,
+        )
+        self._store(key, spent, expires_at)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self._entries),
+            "in_flight": len(self._in_flight),
+            "hits": self._hits,
+            "misses": self._misses,
+            "coalesced": self._coalesced,
+            "conflicts": self._conflicts,
+        }
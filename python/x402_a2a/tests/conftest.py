@@ -0,0 +1,110 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Shared test harness that serves executors through the a2a request handler."""
+
+import asyncio
+from typing import List, Optional, Sequence
+
+import pytest
+
+from a2a.server.events import Event
+from a2a.server.request_handlers import DefaultRequestHandler
+from a2a.server.tasks import InMemoryTaskStore
+from a2a.types import (
+    Message,
+    MessageSendParams,
+    Task,
+    TaskState,
+    TaskStatus,
+    TextPart,
+)
+from x402_a2a.core.utils import create_payment_submission_message
+from x402_a2a.executors.server import x402ServerExecutor
+from x402_a2a.types import PaymentPayload, PaymentRequirements
+
+
+class A2AHarness:
+    """Serves an executor the way an A2A server does.
+
+    Messages go through ``DefaultRequestHandler`` with an in-memory task
+    store, so events pass through a real ``EventQueue`` that is closed as
+    soon as ``execute`` returns; anything enqueued later is lost, as it
+    would be for a client.
+    """
+
+    def __init__(self, executor: x402ServerExecutor):
+        self.executor = executor
+        self.task_store = InMemoryTaskStore()
+        self.handler = DefaultRequestHandler(executor, self.task_store)
+
+    async def await_payment(
+        self,
+        task_id: str,
+        requirements: Sequence[PaymentRequirements],
+        context_id: str = "context-456",
+    ) -> None:
+        """Records a task that was answered with a 402 for ``requirements``."""
+        await self.task_store.save(
+            Task(
+                id=task_id,
+                contextId=context_id,
+                status=TaskStatus(state=TaskState.input_required),
+            )
+        )
+        await self.executor._payment_requirements_store.put(task_id, requirements)
+
+    async def send(self, message: Message) -> List[Event]:
+        """Streams ``message`` and returns the events the client received."""
+        # a2a's queue can deadlock on a misbehaving executor; fail instead.
+        async with asyncio.timeout(5):
+            return [
+                event.model_copy(deep=True)
+                async for event in self.handler.on_message_send_stream(
+                    MessageSendParams(message=message)
+                )
+            ]
+
+    async def pay(self, task_id: str, payload: PaymentPayload) -> List[Event]:
+        """Submits a payment for a task recorded with ``await_payment``."""
+        message = create_payment_submission_message(task_id, payload)
+        # Clients continue a task within its context.
+        message.context_id = (await self.task_store.get(task_id)).context_id
+        return await self.send(message)
+
+    async def ask(
+        self,
+        message_id: str,
+        context_id: str = "context-456",
+        metadata: Optional[dict] = None,
+    ) -> List[Event]:
+        """Sends a plain request that starts a new task."""
+        return await self.send(
+            Message(
+                messageId=message_id,
+                contextId=context_id,
+                role="user",
+                parts=[TextPart(text="hi")],
+                metadata=metadata,
+            )
+        )
+
+    async def task(self, task_id: str) -> Optional[Task]:
+        """Returns the task as the server stored it."""
+        return await self.task_store.get(task_id)
+
+
+@pytest.fixture
+def a2a_harness():
+    """Factory serving an executor through the a2a request handler."""
+    return A2AHarness
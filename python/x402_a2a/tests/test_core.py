@@ -11,6 +11,8 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import asyncio
+
 import pytest
 from unittest.mock import AsyncMock, MagicMock
 
@@ -220,3 +222,875 @@ async def test_server_executor_payment_flow():
     executor.verify_payment.assert_called_once()
     delegate.execute.assert_called_once()
     executor.settle_payment.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_server_executor_parses_payment_payload_once(
+    a2a_harness, monkeypatch, sample_payment_payload, sample_payment_requirements
+):
+    """
+    Tests that a paid request validates the submitted payload a single time
+    and hands the same typed objects to verify and settle.
+    """
+    import x402_a2a.core.utils as utils_module
+
+    parse_calls = []
+    original_parse = utils_module._parse_payment_payload
+
+    def counting_parse(payload_data):
+        parse_calls.append(payload_data)
+        return original_parse(payload_data)
+
+    monkeypatch.setattr(utils_module, "_parse_payment_payload", counting_parse)
+
+    executor = MockConcreteExecutor(delegate=AsyncMock(), config=MagicMock())
+    executor.verify_payment = AsyncMock(
+        return_value=VerifyResponse(is_valid=True, payer="0x789")
+    )
+    executor.settle_payment = AsyncMock(return_value=SettleResponse(success=True))
+    harness = a2a_harness(executor)
+    await harness.await_payment("task-parse-once", [sample_payment_requirements])
+
+    await harness.pay("task-parse-once", sample_payment_payload)
+
+    assert len(parse_calls) == 1
+    verified_payload = executor.verify_payment.call_args.args[0]
+    settled_payload = executor.settle_payment.call_args.args[0]
+    assert verified_payload is settled_payload
+
+
+@pytest.mark.asyncio
+async def test_server_executor_recovers_pending_settlements(
+    tmp_path, sample_payment_payload, sample_payment_requirements
+):
+    """
+    Tests that payments verified before a restart are settled on recovery.
+    """
+    from x402_a2a.core.sqlite_store import SQLitePaymentStateStore
+
+    store = SQLitePaymentStateStore(str(tmp_path / "payments.db"))
+    await store.record_verified(
+        "task-123",
+        sample_payment_payload,
+        sample_payment_requirements,
+        VerifyResponse(is_valid=True, payer="0x789"),
+    )
+
+    executor = MockConcreteExecutor(
+        delegate=AsyncMock(), config=MagicMock(), requirements_store=store
+    )
+    executor.settle_payment = AsyncMock(return_value=SettleResponse(success=True))
+
+    assert await executor.recover_pending_settlements() == 1
+    executor.settle_payment.assert_called_once()
+    assert await store.get_status("task-123") == "settled"
+    await store.close()
+
+
+@pytest.mark.asyncio
+async def test_optimistic_execution_releases_events_after_verification(
+    a2a_harness, sample_payment_payload, sample_payment_requirements
+):
+    """
+    Tests that delegate events produced during verification are delivered
+    only after the verified status, in their original order.
+    """
+    from a2a.types import TaskArtifactUpdateEvent
+
+    produced = asyncio.Event()
+
+    async def delegate_execute(context, queue):
+        await queue.enqueue_event(_artifact_chunk(context.task_id, "Hel", False))
+        await queue.enqueue_event(_artifact_chunk(context.task_id, "lo", True))
+        produced.set()
+
+    delegate = MagicMock()
+    delegate.execute = delegate_execute
+
+    async def verify(payload, requirements):
+        await produced.wait()  # the delegate runs meanwhile
+        return VerifyResponse(is_valid=True, payer="0x789")
+
+    executor = MockConcreteExecutor(
+        delegate=delegate, config=MagicMock(), optimistic_execution=True
+    )
+    executor.verify_payment = verify
+    harness = a2a_harness(executor)
+    await harness.await_payment("task-optimistic", [sample_payment_requirements])
+
+    events = await harness.pay("task-optimistic", sample_payment_payload)
+
+    chunks = [e for e in events if isinstance(e, TaskArtifactUpdateEvent)]
+    assert [c.artifact.parts[0].root.text for c in chunks] == ["Hel", "lo"]
+    # The task is first sent when it is marked verified.
+    verified_at = next(i for i, event in enumerate(events) if isinstance(event, Task))
+    status = x402Utils().get_payment_status(events[verified_at])
+    assert status == PaymentStatus.PAYMENT_VERIFIED
+    assert events.index(chunks[0]) > verified_at
+    status = x402Utils().get_payment_status(events[-1])
+    assert status == PaymentStatus.PAYMENT_COMPLETED
+
+
+@pytest.mark.asyncio
+async def test_optimistic_execution_discards_output_on_failed_verification(
+    a2a_harness, sample_payment_payload, sample_payment_requirements
+):
+    """
+    Tests that a failed verification cancels the delegate and that none of
+    its buffered events reach the client.
+    """
+    from a2a.types import TaskArtifactUpdateEvent
+
+    cancelled = asyncio.Event()
+
+    async def delegate_execute(context, queue):
+        await queue.enqueue_event(_artifact_chunk(context.task_id, "Hel", False))
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    delegate = MagicMock()
+    delegate.execute = delegate_execute
+
+    executor = MockConcreteExecutor(
+        delegate=delegate, config=MagicMock(), optimistic_execution=True
+    )
+
+    async def verify(payload, requirements):
+        await asyncio.sleep(0.01)  # the delegate runs meanwhile
+        return VerifyResponse(
+            is_valid=False, invalid_reason="bad signature", payer=None
+        )
+
+    executor.verify_payment = verify
+    executor.settle_payment = AsyncMock()
+    harness = a2a_harness(executor)
+    await harness.await_payment("task-optimistic-fail", [sample_payment_requirements])
+
+    events = await harness.pay("task-optimistic-fail", sample_payment_payload)
+
+    assert cancelled.is_set()
+    assert not any(isinstance(e, TaskArtifactUpdateEvent) for e in events)
+    executor.settle_payment.assert_not_called()
+    status = x402Utils().get_payment_status(events[-1])
+    assert status == PaymentStatus.PAYMENT_FAILED
+
+
+@pytest.mark.asyncio
+async def test_verify_cache_coalesces_identical_submissions(
+    a2a_harness, sample_payment_payload, sample_payment_requirements
+):
+    """
+    Tests that concurrent and repeated submissions of one authorization
+    reach the facilitator a single time and pay for a single run.
+    """
+    from x402_a2a.executors.verify_cache import VerifyCache
+
+    cache = VerifyCache()
+    delegate = AsyncMock()
+    executor = MockConcreteExecutor(
+        delegate=delegate, config=MagicMock(), verify_cache=cache
+    )
+    executor.settle_payment = AsyncMock(return_value=SettleResponse(success=True))
+    calls = []
+
+    async def verify(payload, requirements):
+        calls.append(payload)
+        await asyncio.sleep(0.01)
+        return VerifyResponse(is_valid=True, payer="0x789")
+
+    executor.verify_payment = verify
+    harness = a2a_harness(executor)
+    for task_id in ("task-a", "task-b", "task-c"):
+        await harness.await_payment(task_id, [sample_payment_requirements])
+
+    await asyncio.gather(
+        harness.pay("task-a", sample_payment_payload),
+        harness.pay("task-b", sample_payment_payload),
+    )
+    await harness.pay("task-c", sample_payment_payload)
+
+    assert len(calls) == 1
+    delegate.execute.assert_awaited_once()
+    executor.settle_payment.assert_awaited_once()
+    stats = cache.stats()
+    assert (stats["misses"], stats["coalesced"], stats["hits"]) == (1, 1, 1)
+    assert stats["conflicts"] == 1
+
+
+@pytest.mark.asyncio
+async def test_replayed_nonce_fails_before_verification(
+    a2a_harness, sample_payment_payload, sample_payment_requirements
+):
+    """
+    Tests that a second payment with the same nonce is rejected with
+    DUPLICATE_NONCE without reaching the facilitator.
+    """
+    from x402_a2a.core.replay import NonceReplayIndex
+    from x402_a2a.types import x402ErrorCode
+
+    executor = MockConcreteExecutor(
+        delegate=AsyncMock(), config=MagicMock(), replay_index=NonceReplayIndex()
+    )
+    executor.verify_payment = AsyncMock(
+        return_value=VerifyResponse(is_valid=True, payer="0x789")
+    )
+    harness = a2a_harness(executor)
+    for task_id in ("task-first", "task-replay"):
+        await harness.await_payment(task_id, [sample_payment_requirements])
+
+    await harness.pay("task-first", sample_payment_payload)
+    events = await harness.pay("task-replay", sample_payment_payload)
+
+    executor.verify_payment.assert_called_once()
+    assert (
+        events[-1].status.message.metadata[x402Metadata.ERROR_KEY]
+        == x402ErrorCode.DUPLICATE_NONCE
+    )
+
+
+@pytest.mark.parametrize(
+    "failing_phase, released",
+    [("verify", True), ("execute", True), ("settle", False)],
+)
+@pytest.mark.asyncio
+async def test_failed_payment_releases_nonce_until_settlement_is_attempted(
+    a2a_harness,
+    failing_phase,
+    released,
+    sample_payment_payload,
+    sample_payment_requirements,
+):
+    """
+    Tests that a payment failing before settlement frees its nonce for a
+    retry, while one whose settlement was attempted keeps it used.
+    """
+    from x402_a2a.core.replay import NonceReplayIndex
+
+    replay_index = NonceReplayIndex()
+    delegate = AsyncMock()
+    executor = MockConcreteExecutor(
+        delegate=delegate, config=MagicMock(), replay_index=replay_index
+    )
+    if failing_phase == "verify":
+        executor.verify_payment = AsyncMock(
+            return_value=VerifyResponse(
+                is_valid=False, invalid_reason="bad", payer="0x789"
+            )
+        )
+    elif failing_phase == "execute":
+        delegate.execute.side_effect = RuntimeError("service down")
+    else:
+        executor.settle_payment = AsyncMock(
+            return_value=SettleResponse(success=False, error_reason="reverted")
+        )
+    harness = a2a_harness(executor)
+    await harness.await_payment("task-nonce", [sample_payment_requirements])
+
+    events = await harness.pay("task-nonce", sample_payment_payload)
+
+    assert x402Utils().get_payment_status(events[-1]) == PaymentStatus.PAYMENT_FAILED
+    assert (
+        await replay_index.reserve(sample_payment_payload, sample_payment_requirements)
+        is released
+    )
+
+
+def test_requirements_index_matches_payee_and_best_covered_tier(
+    sample_payment_payload, sample_payment_requirements
+):
+    """
+    Tests that matching checks payee and value, not just scheme and network.
+    """
+    from x402_a2a.core.matching import PaymentRequirementsIndex
+
+    other_payee = sample_payment_requirements.model_copy(update={"pay_to": "0x999"})
+    premium = sample_payment_requirements.model_copy(
+        update={"max_amount_required": "500"}
+    )
+    index = PaymentRequirementsIndex(
+        [other_payee, premium, sample_payment_requirements]
+    )
+
+    assert index.match(sample_payment_payload) is sample_payment_requirements
+
+    sample_payment_payload.payload.authorization.value = "99"
+    assert index.match(sample_payment_payload) is None
+
+
+@pytest.mark.asyncio
+async def test_underpaid_submission_fails_with_invalid_amount(
+    a2a_harness, sample_payment_payload, sample_payment_requirements
+):
+    """
+    Tests that a payment below max_amount_required is rejected before verify.
+    """
+    from x402_a2a.types import x402ErrorCode
+
+    executor = MockConcreteExecutor(delegate=AsyncMock(), config=MagicMock())
+    executor.verify_payment = AsyncMock()
+    sample_payment_payload.payload.authorization.value = "99"
+    harness = a2a_harness(executor)
+    await harness.await_payment("task-underpaid", [sample_payment_requirements])
+
+    events = await harness.pay("task-underpaid", sample_payment_payload)
+
+    executor.verify_payment.assert_not_called()
+    assert (
+        events[-1].status.message.metadata[x402Metadata.ERROR_KEY]
+        == x402ErrorCode.INVALID_AMOUNT
+    )
+
+
+@pytest.mark.asyncio
+async def test_deadline_cancels_overrunning_phase(
+    a2a_harness, sample_payment_payload, sample_payment_requirements
+):
+    """
+    Tests that a delegate running past its share of the request deadline is
+    cancelled and the failure names the execute phase.
+    """
+    from x402_a2a.executors import DeadlinePolicy
+    from x402_a2a.types import x402ErrorCode
+
+    cancelled = asyncio.Event()
+
+    async def delegate_execute(context, queue):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    delegate = MagicMock()
+    delegate.execute = delegate_execute
+    executor = MockConcreteExecutor(
+        delegate=delegate,
+        config=MagicMock(),
+        deadline_policy=DeadlinePolicy(max_seconds=0.05),
+    )
+    executor.settle_payment = AsyncMock()
+    harness = a2a_harness(executor)
+    await harness.await_payment("task-deadline", [sample_payment_requirements])
+
+    events = await harness.pay("task-deadline", sample_payment_payload)
+
+    assert cancelled.is_set()
+    executor.settle_payment.assert_not_called()
+    metadata = events[-1].status.message.metadata
+    assert metadata[x402Metadata.ERROR_KEY] == x402ErrorCode.SETTLEMENT_FAILED
+    assert metadata[x402Metadata.TIMEOUT_PHASE_KEY] == "execute"
+
+
+@pytest.mark.asyncio
+async def test_admission_prioritises_payments_fairly_and_sheds_unpaid():
+    """
+    Tests that queued payments run before unpaid requests, alternate between
+    payers, and that a full queue sheds an unpaid waiter for a payment.
+    """
+    from x402_a2a.executors import AdmissionController
+    from x402_a2a.types import AdmissionRejectedError
+
+    controller = AdmissionController(max_concurrency=1, max_queue=3)
+    await controller.acquire()  # occupies the only slot
+    order = []
+
+    async def request(name, **kwargs):
+        try:
+            await controller.acquire(**kwargs)
+        except AdmissionRejectedError:
+            order.append(f"{name}:shed")
+            return
+        order.append(name)
+        await asyncio.sleep(0)
+        controller.release()
+
+    requests = [
+        asyncio.create_task(request("unpaid")),
+        asyncio.create_task(request("x1", paid=True, payer="0xX")),
+        asyncio.create_task(request("x2", paid=True, payer="0xX")),
+        asyncio.create_task(request("y1", paid=True, payer="0xY")),
+    ]
+    await asyncio.sleep(0)
+    assert controller.stats()["queue_depth"] == 3
+
+    controller.release()
+    await asyncio.gather(*requests)
+
+    assert order == ["unpaid:shed", "x1", "y1", "x2"]
+    stats = controller.stats()
+    assert (stats["in_flight"], stats["queue_depth"]) == (0, 0)
+    assert (stats["shed_unpaid"], stats["admitted"]) == (1, 4)
+
+
+@pytest.mark.asyncio
+async def test_shed_payment_is_reported_busy_without_a_receipt(
+    a2a_harness, sample_payment_payload, sample_payment_requirements
+):
+    """
+    Tests that a payment rejected by admission control gets its own error
+    code, no settlement receipt, and can be resubmitted.
+    """
+    from x402_a2a.executors import AdmissionController
+    from x402_a2a.types import x402ErrorCode
+
+    controller = AdmissionController(max_concurrency=1, max_queue=0)
+    await controller.acquire()  # occupies the only slot
+    executor = MockConcreteExecutor(
+        delegate=AsyncMock(), config=MagicMock(), admission_controller=controller
+    )
+    executor.settle_payment = AsyncMock()
+    harness = a2a_harness(executor)
+    await harness.await_payment("task-busy", [sample_payment_requirements])
+
+    events = await harness.pay("task-busy", sample_payment_payload)
+
+    metadata = events[-1].status.message.metadata
+    assert metadata[x402Metadata.ERROR_KEY] == x402ErrorCode.SERVER_BUSY
+    assert x402Metadata.RECEIPTS_KEY not in metadata
+    executor.settle_payment.assert_not_called()
+    assert "task-busy" in executor._payment_requirements_store
+
+
+@pytest.mark.asyncio
+async def test_request_without_payment_passes_straight_to_delegate():
+    """
+    Tests that a request without x402 metadata reaches the delegate with no
+    task events from the wrapper.
+    """
+    delegate = AsyncMock()
+    executor = MockConcreteExecutor(delegate=delegate, config=MagicMock())
+    context = MagicMock()
+    context.message = Message(
+        messageId="msg-1", role="user", parts=[TextPart(text="hello")]
+    )
+    context.current_task = None
+    event_queue = AsyncMock()
+
+    await executor.execute(context, event_queue)
+
+    delegate.execute.assert_awaited_once_with(context, event_queue)
+    event_queue.enqueue_event.assert_not_called()
+
+
+def _artifact_chunk(task_id, text, last_chunk):
+    from a2a.types import Artifact, Part, TaskArtifactUpdateEvent
+
+    return TaskArtifactUpdateEvent(
+        task_id=task_id,
+        context_id="context-456",
+        artifact=Artifact(artifact_id="answer", parts=[Part(root=TextPart(text=text))]),
+        append=True,
+        last_chunk=last_chunk,
+    )
+
+
+@pytest.mark.parametrize("settled", [True, False])
+@pytest.mark.asyncio
+async def test_streaming_holds_final_chunk_until_settlement(
+    a2a_harness, settled, sample_payment_payload, sample_payment_requirements
+):
+    """
+    Tests that streamed chunks flow before settlement while the last chunk
+    waits for it, and that a failed settlement closes the stream instead.
+    """
+    from a2a.types import TaskArtifactUpdateEvent, TaskStatusUpdateEvent
+
+    async def delegate_execute(context, queue):
+        await queue.enqueue_event(_artifact_chunk(context.task_id, "Hel", False))
+        await queue.enqueue_event(_artifact_chunk(context.task_id, "lo", True))
+
+    async def settle(payload, requirements):
+        return SettleResponse(success=settled, network="base-sepolia")
+
+    delegate = MagicMock()
+    delegate.execute = delegate_execute
+    executor = MockConcreteExecutor(
+        delegate=delegate, config=MagicMock(), streaming=True
+    )
+    executor.settle_payment = settle
+    harness = a2a_harness(executor)
+    await harness.await_payment("task-stream", [sample_payment_requirements])
+
+    events = await harness.pay("task-stream", sample_payment_payload)
+
+    chunks = [e for e in events if isinstance(e, TaskArtifactUpdateEvent)]
+    if settled:
+        assert [c.last_chunk for c in chunks] == [False, True]
+        receipt_at = max(i for i, e in enumerate(events) if isinstance(e, Task))
+        assert events.index(chunks[0]) < receipt_at < events.index(chunks[-1])
+        status = x402Utils().get_payment_status(events[receipt_at])
+        assert status == PaymentStatus.PAYMENT_COMPLETED
+    else:
+        assert [c.last_chunk for c in chunks] == [False]
+        terminal = [
+            e
+            for e in events
+            if isinstance(e, Task)
+            and x402Utils().get_payment_status(e) == PaymentStatus.PAYMENT_FAILED
+            or isinstance(e, TaskStatusUpdateEvent)
+            and e.final
+        ]
+        assert terminal == [events[-1]]
+        assert events[-1].status.state == TaskState.failed
+        metadata = events[-1].status.message.metadata
+        assert metadata[x402Metadata.STATUS_KEY] == PaymentStatus.PAYMENT_FAILED.value
+
+
+@pytest.mark.asyncio
+async def test_upto_payment_settles_metered_usage(a2a_harness, sample_payment_payload):
+    """
+    Tests that an upto payment is settled for the tokens the delegate
+    produced rather than the authorized ceiling.
+    """
+    from a2a.types import Artifact, Part, TaskArtifactUpdateEvent
+
+    from x402_a2a.core.upto import create_upto_payment_requirements
+
+    requirements = create_upto_payment_requirements(
+        max_price="$1.00",
+        unit_price="$0.001",
+        pay_to_address="0x123",
+        resource="/generate",
+        network="base-sepolia",
+    )
+    sample_payment_payload.scheme = "upto"
+    sample_payment_payload.payload.authorization.value = "1000000"
+
+    async def delegate_execute(context, queue):
+        for text, metadata in (("abcdefgh", None), ("ignored", {"x402.usage": 5})):
+            await queue.enqueue_event(
+                TaskArtifactUpdateEvent(
+                    task_id=context.task_id,
+                    context_id="context-456",
+                    artifact=Artifact(
+                        artifact_id="answer",
+                        parts=[Part(root=TextPart(text=text))],
+                        metadata=metadata,
+                    ),
+                )
+            )
+
+    delegate = MagicMock()
+    delegate.execute = delegate_execute
+    executor = MockConcreteExecutor(delegate=delegate, config=MagicMock())
+    executor.settle_payment = AsyncMock(return_value=SettleResponse(success=True))
+    harness = a2a_harness(executor)
+    await harness.await_payment("task-upto", [requirements])
+
+    await harness.pay("task-upto", sample_payment_payload)
+
+    settled = executor.settle_payment.call_args.args[1]
+    assert settled.max_amount_required == str(7 * 1000)  # 2 estimated + 5 reported
+
+
+@pytest.mark.asyncio
+async def test_upto_payment_without_usage_is_not_settled(
+    a2a_harness, sample_payment_payload
+):
+    """
+    Tests that an upto payment whose delegate produced nothing completes
+    without a zero-amount settlement.
+    """
+    from x402_a2a.core.upto import create_upto_payment_requirements
+
+    requirements = create_upto_payment_requirements(
+        max_price="$1.00",
+        unit_price="$0.001",
+        pay_to_address="0x123",
+        resource="/generate",
+        network="base-sepolia",
+    )
+    sample_payment_payload.scheme = "upto"
+    sample_payment_payload.payload.authorization.value = "1000000"
+
+    executor = MockConcreteExecutor(delegate=AsyncMock(), config=MagicMock())
+    executor.settle_payment = AsyncMock(return_value=SettleResponse(success=True))
+    harness = a2a_harness(executor)
+    await harness.await_payment("task-upto", [requirements])
+
+    events = await harness.pay("task-upto", sample_payment_payload)
+
+    executor.settle_payment.assert_not_called()
+    assert x402Utils().get_payment_status(events[-1]) == PaymentStatus.PAYMENT_COMPLETED
+    assert x402Utils().get_latest_receipt(events[-1]).transaction is None
+
+
+@pytest.mark.asyncio
+async def test_credit_session_debits_locally_after_deposit(
+    a2a_harness, tmp_path, sample_payment_payload, sample_payment_requirements
+):
+    """
+    Tests that a settled deposit funds later calls in the same context
+    without settling again, and that the balance survives a restart.
+    """
+    from x402_a2a.executors.credit import CreditLedger, SQLiteCreditStore
+    from x402_a2a.types import x402PaymentRequiredException
+
+    runs = []
+
+    async def delegate_execute(context, queue):
+        task = context.current_task
+        if not (task and task.metadata and task.metadata.get("x402_payment_verified")):
+            raise x402PaymentRequiredException(
+                "Payment required", sample_payment_requirements
+            )
+        runs.append(context.task_id)
+
+    store = SQLiteCreditStore(str(tmp_path / "credit.db"))
+    ledger = CreditLedger(store, deposit_calls=3)
+    delegate = MagicMock()
+    delegate.execute = delegate_execute
+    executor = MockConcreteExecutor(
+        delegate=delegate, config=MagicMock(), credit_ledger=ledger
+    )
+    executor.settle_payment = AsyncMock(return_value=SettleResponse(success=True))
+    harness = a2a_harness(executor)
+
+    required = (await harness.ask("msg-credit-1"))[-1]
+    accepts = x402Utils().get_payment_requirements(required).accepts
+    assert [r.max_amount_required for r in accepts] == ["100", "300"]
+
+    sample_payment_payload.payload.authorization.value = "300"
+    await harness.pay(required.id, sample_payment_payload)
+    assert executor.settle_payment.call_args.args[1].max_amount_required == "300"
+    assert ledger.balance("context-456", sample_payment_requirements) == 200
+
+    task_ids = [required.id]
+    for message_id in ("msg-credit-2", "msg-credit-3"):
+        task = (await harness.ask(message_id))[-1]
+        task_ids.append(task.id)
+        metadata = task.status.message.metadata
+        assert (
+            metadata[x402Metadata.STATUS_KEY] == PaymentStatus.PAYMENT_COMPLETED.value
+        )
+    assert metadata[x402Metadata.CREDIT_KEY] == {"debited": "100", "balance": "0"}
+    assert runs == task_ids
+    assert executor.settle_payment.await_count == 1
+
+    required = (await harness.ask("msg-credit-4"))[-1]
+    assert x402Utils().get_payment_status(required) == PaymentStatus.PAYMENT_REQUIRED
+
+    await ledger.checkpoint()
+    store.close()
+    restored = CreditLedger(SQLiteCreditStore(str(tmp_path / "credit.db")))
+    assert restored.stats()["sessions"] == 1
+    assert restored.balance("context-456", sample_payment_requirements) == 0
+
+
+def test_credit_sessions_are_kept_per_payee_and_asset(
+    sample_payment_payload, sample_payment_requirements
+):
+    """
+    Tests that a deposit to another payee in the same context opens its own
+    session instead of replacing the existing balance.
+    """
+    from x402_a2a.executors.credit import CreditLedger
+
+    ledger = CreditLedger(deposit_calls=3)
+    other_payee = sample_payment_requirements.model_copy(update={"pay_to": "0x999"})
+    for requirement in (sample_payment_requirements, other_payee):
+        ledger.open(
+            "context-456",
+            sample_payment_payload,
+            ledger.deposit_requirements(requirement),
+        )
+
+    assert ledger.debit("context-456", sample_payment_requirements) == 100
+    assert ledger.balance("context-456", other_payee) == 200
+    ledger.refund("context-456", sample_payment_requirements)
+    assert ledger.balance("context-456", sample_payment_requirements) == 200
+    assert ledger.stats()["sessions"] == 2
+
+
+@pytest.mark.asyncio
+async def test_deposit_during_a_checkpoint_is_checkpointed(
+    sample_payment_payload, sample_payment_requirements
+):
+    """
+    Tests that a deposit opened while a checkpoint is being written is
+    persisted by a follow-up checkpoint rather than skipped.
+    """
+    import threading
+
+    from x402_a2a.executors.credit import CreditLedger, CreditStore
+
+    class SlowStore(CreditStore):
+        def __init__(self):
+            self.gate = threading.Event()
+            self.saved = {}
+
+        def save(self, rows):
+            self.gate.wait(5)
+            self.saved.update({row[:5]: row[5] for row in rows})
+
+        def load(self):
+            return []
+
+        def delete(self, keys):
+            pass
+
+    store = SlowStore()
+    ledger = CreditLedger(store, deposit_calls=3)
+    other_payee = sample_payment_requirements.model_copy(update={"pay_to": "0x999"})
+    for requirement in (sample_payment_requirements, other_payee):
+        ledger.open(
+            "context-456",
+            sample_payment_payload,
+            ledger.deposit_requirements(requirement),
+        )
+        await asyncio.sleep(0)
+
+    store.gate.set()
+    await ledger._checkpoint_task
+
+    assert sorted(store.saved.values()) == [200, 200]
+    assert ledger.stats()["checkpoints"] == 2
+
+
+@pytest.mark.asyncio
+async def test_credit_deposit_does_not_issue_an_entitlement(
+    a2a_harness, sample_payment_payload, sample_payment_requirements
+):
+    """
+    Tests that a settled deposit opens a credit balance without also
+    issuing an entitlement token, which would prepay the same calls twice.
+    """
+    from x402_a2a.core.entitlements import EntitlementAuthority, HMACEntitlementSigner
+    from x402_a2a.executors.credit import CreditLedger
+
+    ledger = CreditLedger(deposit_calls=3)
+    executor = MockConcreteExecutor(
+        delegate=AsyncMock(),
+        config=MagicMock(),
+        credit_ledger=ledger,
+        entitlements=EntitlementAuthority(HMACEntitlementSigner(b"k" * 32)),
+    )
+    executor.settle_payment = AsyncMock(return_value=SettleResponse(success=True))
+    harness = a2a_harness(executor)
+    deposit = ledger.deposit_requirements(sample_payment_requirements)
+    await harness.await_payment("task-deposit", [sample_payment_requirements, deposit])
+
+    sample_payment_payload.payload.authorization.value = "300"
+    events = await harness.pay("task-deposit", sample_payment_payload)
+
+    task = events[-1]
+    assert x402Utils().get_payment_status(task) == PaymentStatus.PAYMENT_COMPLETED
+    assert x402Utils().get_entitlement_token(task) is None
+    assert ledger.balance("context-456", sample_payment_requirements) == 200
+
+
+@pytest.mark.parametrize("signer_type", ["hmac", "ed25519"])
+@pytest.mark.asyncio
+async def test_entitlement_token_serves_paid_calls_locally(
+    a2a_harness, signer_type, sample_payment_payload, sample_payment_requirements
+):
+    """
+    Tests that a settled payment issues an entitlement token that later
+    requests redeem without paying, within its uses, scope and revocations.
+    """
+    from x402_a2a.core.entitlements import (
+        Ed25519EntitlementSigner,
+        EntitlementAuthority,
+        HMACEntitlementSigner,
+    )
+    from x402_a2a.types import x402PaymentRequiredException
+
+    signer = (
+        HMACEntitlementSigner(b"k" * 32)
+        if signer_type == "hmac"
+        else Ed25519EntitlementSigner()
+    )
+    authority = EntitlementAuthority(signer, uses=2)
+    runs = []
+
+    async def delegate_execute(context, queue):
+        task = context.current_task
+        if not (task and task.metadata and task.metadata.get("x402_payment_verified")):
+            raise x402PaymentRequiredException(
+                "Payment required", sample_payment_requirements
+            )
+        runs.append(context.task_id)
+
+    delegate = MagicMock()
+    delegate.execute = delegate_execute
+    executor = MockConcreteExecutor(
+        delegate=delegate, config=MagicMock(), entitlements=authority
+    )
+    executor.settle_payment = AsyncMock(return_value=SettleResponse(success=True))
+    harness = a2a_harness(executor)
+    await harness.await_payment("task-ent-1", [sample_payment_requirements])
+
+    events = await harness.pay("task-ent-1", sample_payment_payload)
+    token = x402Utils().get_entitlement_token(events[-1])
+    assert token
+
+    body, signature = token.split(".")
+    middle = len(signature) // 2
+    flipped = "B" if signature[middle] == "A" else "A"
+    forged = f"{body}.{signature[:middle]}{flipped}{signature[middle + 1 :]}"
+
+    statuses = []
+    redeemed = ["task-ent-1"]
+    for message_id, sent in (
+        ("msg-ent-2", token),
+        ("msg-ent-3", forged),
+        ("msg-ent-4", token),
+        ("msg-ent-5", token),  # used up
+    ):
+        task = (
+            await harness.ask(message_id, metadata={x402Metadata.ENTITLEMENT_KEY: sent})
+        )[-1]
+        statuses.append(x402Utils().get_payment_status(task))
+        if statuses[-1] == PaymentStatus.PAYMENT_COMPLETED:
+            redeemed.append(task.id)
+    assert statuses == [
+        PaymentStatus.PAYMENT_COMPLETED,
+        PaymentStatus.PAYMENT_REQUIRED,
+        PaymentStatus.PAYMENT_COMPLETED,
+        PaymentStatus.PAYMENT_REQUIRED,
+    ]
+    assert runs == redeemed
+    assert executor.settle_payment.await_count == 1
+
+    fresh = authority.issue(sample_payment_requirements, "0x789")["token"]
+    for update in (
+        {"resource": "/other"},
+        {"asset": "0xabc"},
+        {"max_amount_required": "101"},  # price raised since payment
+    ):
+        changed = sample_payment_requirements.model_copy(update=update)
+        assert authority.check(fresh, changed) is None
+    # Same signature bytes, spelled with non-zero padding bits.
+    alphabet = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_"
+    respelled = fresh[:-1] + alphabet[alphabet.index(fresh[-1]) ^ 1]
+    assert authority.check(respelled, sample_payment_requirements) is None
+    authority.revoke(fresh)
+    assert authority.check(fresh, sample_payment_requirements) is None
+    assert authority.stats()["issued"] == 2
+
+
+def test_price_resolution_is_memoized_until_invalidated():
+    """
+    Tests that repeated prices are resolved once per network, hand out
+    independent domain dicts, and are resolved again after invalidation.
+    """
+    from x402_a2a.core.merchant import PriceResolutionCache
+
+    cache = PriceResolutionCache(max_entries=2)
+    first = cache.resolve("$0.01", "base-sepolia")
+    first[2]["name"] = "changed"
+    assert cache.resolve("$0.01", "base-sepolia")[2]["name"] != "changed"
+    assert first[0] == "10000"
+    assert cache.stats() == {"entries": 1, "hits": 1, "misses": 1}
+
+    cache.resolve("$0.01", "base")
+    cache.resolve("$0.02", "base")
+    assert cache.stats()["entries"] == 2  # least recently used evicted
+
+    cache.invalidate("base")
+    assert cache.stats()["entries"] == 0
+    cache.resolve("$0.01", "base-sepolia")
+    assert cache.stats()["misses"] == 4
@@ -0,0 +1,67 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import json
+import logging
+
+from x402_a2a.executors.event_log import PaymentEventLogger
+from x402_a2a.types import SettleResponse
+
+
+class _CountingModel:
+    """Stands in for a Pydantic model and counts serializations."""
+
+    def __init__(self):
+        self.dumps = 0
+
+    def model_dump(self, **kwargs):
+        self.dumps += 1
+        return {"ok": True}
+
+
+def test_event_logger_skips_serialization_when_disabled():
+    """Nothing is serialized when the level is disabled or the event sampled out."""
+    logger = logging.getLogger("x402_a2a.tests.disabled")
+    logger.setLevel(logging.WARNING)
+    model = _CountingModel()
+
+    PaymentEventLogger(logger).info("verify", "response", response=model)
+
+    logger.setLevel(logging.INFO)
+    PaymentEventLogger(logger, sample_rates={"verify": 0.0}).info(
+        "verify", "response", response=model
+    )
+
+    assert model.dumps == 0
+
+
+def test_event_logger_emits_compact_json(caplog):
+    """Emitted events are a single line of JSON with models dumped by alias."""
+    logger = logging.getLogger("x402_a2a.tests.enabled")
+    events = PaymentEventLogger(logger)
+
+    with caplog.at_level(logging.INFO, logger=logger.name):
+        events.info(
+            "settle",
+            "response",
+            task_id="task-1",
+            response=SettleResponse(success=True, network="base"),
+        )
+
+    message = caplog.records[0].getMessage()
+    assert "\n" not in message
+    assert json.loads(message) == {
+        "event": "x402.settle.response",
+        "task_id": "task-1",
+        "response": {"success": True, "network": "base"},
+    }
@@ -0,0 +1,284 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import asyncio
+
+import pytest
+
+from x402_a2a.core.batching import BatchingFacilitatorClient
+from x402_a2a.types import (
+    PaymentPayload,
+    PaymentRequirements,
+    SettleResponse,
+    VerifyResponse,
+)
+
+# --- Fixtures ---
+
+
+def _payload(nonce: str) -> PaymentPayload:
+    return PaymentPayload(
+        x402_version=1,
+        scheme="exact",
+        network="base-sepolia",
+        payload={
+            "signature": "0xabc",
+            "authorization": {
+                "from": "0x789",
+                "to": "0x123",
+                "value": "100",
+                "valid_after": "0",
+                "valid_before": "9999999999",
+                "nonce": nonce,
+            },
+        },
+    )
+
+
+@pytest.fixture
+def payment_requirements():
+    return PaymentRequirements(
+        scheme="exact",
+        network="base-sepolia",
+        pay_to="0x123",
+        max_amount_required="100",
+        asset="0x456",
+        description="Test Payment",
+        resource="/test",
+        mime_type="application/json",
+        max_timeout_seconds=600,
+    )
+
+
+class FakeFacilitator:
+    """Answers verify per call; settle only through the batch endpoint."""
+
+    config = {"url": "https://facilitator.test"}
+
+    def __init__(self):
+        self.verify_calls = 0
+        self.settle_batches = []
+
+    async def verify(self, payload, requirements):
+        self.verify_calls += 1
+        nonce = payload.payload.authorization.nonce
+        if nonce == "0xbad":
+            raise ConnectionError("facilitator unavailable")
+        return VerifyResponse(is_valid=True, payer=nonce)
+
+    async def settle(self, payload, requirements):
+        raise AssertionError("settle_batch should be used")
+
+    async def settle_batch(self, pairs):
+        self.settle_batches.append(len(pairs))
+        return [
+            SettleResponse(
+                success=True, transaction=payload.payload.authorization.nonce
+            )
+            for payload, _ in pairs
+        ]
+
+
+# --- Tests ---
+
+
+@pytest.mark.asyncio
+async def test_batching_client_fans_out_concurrent_verifies(payment_requirements):
+    """Each caller gets its own result or error from a shared batch."""
+    facilitator = FakeFacilitator()
+    client = BatchingFacilitatorClient(facilitator, max_batch_size=8, max_delay=0.01)
+
+    results = await asyncio.gather(
+        client.verify(_payload("0x1"), payment_requirements),
+        client.verify(_payload("0xbad"), payment_requirements),
+        client.verify(_payload("0x2"), payment_requirements),
+        return_exceptions=True,
+    )
+
+    assert results[0].payer == "0x1"
+    assert isinstance(results[1], ConnectionError)
+    assert results[2].payer == "0x2"
+    stats = client.stats()["verify"]
+    assert stats["batches"] == 1
+    assert stats["max_batch_size"] == 3
+
+
+@pytest.mark.asyncio
+async def test_batching_client_uses_batch_endpoint(payment_requirements):
+    """Full batches are dispatched immediately through settle_batch."""
+    facilitator = FakeFacilitator()
+    client = BatchingFacilitatorClient(facilitator, max_batch_size=2, max_delay=10)
+
+    responses = await asyncio.gather(
+        *(client.settle(_payload(f"0x{i}"), payment_requirements) for i in range(4))
+    )
+
+    assert [r.transaction for r in responses] == ["0x0", "0x1", "0x2", "0x3"]
+    assert facilitator.settle_batches == [2, 2]
+    assert client.stats()["settle"]["avg_batch_size"] == 2
+
+
+class FlakyFacilitator:
+    """Hangs or fails on demand; otherwise answers immediately."""
+
+    config = {"url": "https://facilitator.test"}
+
+    def __init__(self):
+        self.hang = False
+        self.hang_on_call = None
+        self.calls = 0
+
+    async def verify(self, payload, requirements):
+        self.calls += 1
+        if self.hang or self.calls == self.hang_on_call:
+            await asyncio.sleep(10)
+        return VerifyResponse(is_valid=True, payer="0x789")
+
+    async def settle(self, payload, requirements):
+        raise ConnectionError("facilitator unavailable")
+
+
+@pytest.mark.asyncio
+async def test_resilient_client_times_out_and_opens_circuit(payment_requirements):
+    """Deadlines bound slow calls and repeated failures fail fast."""
+    from x402_a2a.core.resilience import ResilientFacilitatorClient
+    from x402_a2a.types import FacilitatorUnavailableError, x402ErrorCode
+
+    facilitator = FlakyFacilitator()
+    facilitator.hang = True
+    transitions = []
+    client = ResilientFacilitatorClient(
+        facilitator,
+        verify_timeout=0.01,
+        failure_threshold=2,
+        reset_timeout=60,
+        on_state_change=lambda old, new: transitions.append((old, new)),
+    )
+
+    for _ in range(2):
+        with pytest.raises(FacilitatorUnavailableError):
+            await client.verify(_payload("0x1"), payment_requirements)
+    with pytest.raises(FacilitatorUnavailableError) as e:
+        await client.verify(_payload("0x1"), payment_requirements)
+
+    assert e.value.error_code == x402ErrorCode.SETTLEMENT_FAILED
+    assert facilitator.calls == 2
+    assert transitions == [("closed", "open")]
+    stats = client.stats()
+    assert (stats["state"], stats["timeouts"], stats["rejected"]) == ("open", 2, 1)
+
+
+@pytest.mark.asyncio
+async def test_resilient_client_hedges_slow_verify(payment_requirements):
+    """A verify slower than the observed percentile gets a hedge that wins."""
+    from x402_a2a.core.resilience import ResilientFacilitatorClient
+
+    facilitator = FlakyFacilitator()
+    client = ResilientFacilitatorClient(facilitator, hedge_min_samples=3)
+    for _ in range(3):
+        await client.verify(_payload("0x1"), payment_requirements)
+
+    facilitator.hang_on_call = 4  # only the primary of the next verify hangs
+
+    assert (await client.verify(_payload("0x1"), payment_requirements)).is_valid
+    assert (client.stats()["hedges"], client.stats()["hedge_wins"]) == (1, 1)
+
+
+@pytest.mark.asyncio
+async def test_facilitator_registry_shares_pooled_clients(payment_requirements):
+    """Callers with the same config share one pooled client until shutdown."""
+    import httpx
+
+    from x402_a2a.core.facilitator import (
+        close_facilitator_clients,
+        get_facilitator_client,
+    )
+
+    config = {"url": "https://facilitator.test/"}
+    client = get_facilitator_client(config)
+    assert get_facilitator_client({"url": "https://facilitator.test"}) is client
+    assert get_facilitator_client({"url": "https://other.test"}) is not client
+
+    requests = []
+
+    def handler(request):
+        requests.append(request.url.path)
+        return httpx.Response(200, json={"isValid": True, "payer": "0x789"})
+
+    client._http = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    for _ in range(2):
+        response = await client.verify(_payload("0x1"), payment_requirements)
+        assert response.is_valid
+    http = client._http
+
+    await close_facilitator_clients()
+
+    assert requests == ["/verify", "/verify"]
+    assert http.is_closed
+    assert get_facilitator_client(config) is not client
+    await close_facilitator_clients()
+
+
+class TimedFacilitator:
+    """Answers after a fixed delay, or fails while ``down`` is set."""
+
+    def __init__(self, url, delay):
+        self.config = {"url": url}
+        self.delay = delay
+        self.down = False
+        self.calls = 0
+
+    async def verify(self, payload, requirements):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.down:
+            raise ConnectionError("facilitator unavailable")
+        return VerifyResponse(is_valid=True, payer=self.config["url"])
+
+    async def settle(self, payload, requirements):
+        return SettleResponse(success=True, network=requirements.network)
+
+
+@pytest.mark.asyncio
+async def test_load_balanced_client_routes_ejects_and_readmits(payment_requirements):
+    """Calls favour the faster facilitator, skip failing ones, then re-admit them."""
+    from x402_a2a.core.balancing import LoadBalancedFacilitatorClient
+
+    fast = TimedFacilitator("https://fast.test", 0)
+    slow = TimedFacilitator("https://slow.test", 0.01)
+    other = TimedFacilitator("https://other.test", 0)
+    client = LoadBalancedFacilitatorClient(
+        [fast, slow], failure_threshold=1, ejection_seconds=0.2
+    )
+    client.add(other, networks=["base"])
+
+    for _ in range(20):
+        await client.verify(_payload("0x1"), payment_requirements)
+    assert other.calls == 0
+    assert fast.calls > slow.calls
+
+    # A failing facilitator is retried elsewhere and ejected.
+    fast.down = True
+    for _ in range(5):
+        response = await client.verify(_payload("0x1"), payment_requirements)
+        assert response.payer == "https://slow.test"
+    assert client.stats()["https://fast.test"]["ejected"]
+
+    # After the ejection period it is admitted again on its next success.
+    fast.down = False
+    await asyncio.sleep(0.2)
+    calls = fast.calls
+    for _ in range(10):
+        await client.verify(_payload("0x1"), payment_requirements)
+    assert fast.calls > calls
+    assert client.stats()["https://fast.test"]["ejections"] == 0
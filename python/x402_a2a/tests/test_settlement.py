@@ -0,0 +1,253 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import asyncio
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from a2a.types import Task, TaskState, TaskStatus
+from x402_a2a.core.utils import x402Utils, create_payment_submission_message
+from x402_a2a.executors.server import x402ServerExecutor
+from x402_a2a.executors.settlement import SettlementQueue
+from x402_a2a.types import (
+    PaymentPayload,
+    PaymentRequirements,
+    PaymentStatus,
+    SettleResponse,
+    VerifyResponse,
+)
+
+# --- Fixtures ---
+
+
+@pytest.fixture
+def payment_payload():
+    return PaymentPayload(
+        x402_version=1,
+        scheme="exact",
+        network="base-sepolia",
+        payload={
+            "signature": "0xabc",
+            "authorization": {
+                "from": "0x789",
+                "to": "0x123",
+                "value": "100",
+                "valid_after": "0",
+                "valid_before": "9999999999",
+                "nonce": "0xdef",
+            },
+        },
+    )
+
+
+@pytest.fixture
+def payment_requirements():
+    return PaymentRequirements(
+        scheme="exact",
+        network="base-sepolia",
+        pay_to="0x123",
+        max_amount_required="100",
+        asset="0x456",
+        description="Test Payment",
+        resource="/test",
+        mime_type="application/json",
+        max_timeout_seconds=600,
+    )
+
+
+class SlowSettlingExecutor(x402ServerExecutor):
+    """Settles only after the test releases the gate."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.gate = asyncio.Event()
+        self.failures_before_success = 0
+
+    async def verify_payment(self, payload, requirements):
+        return VerifyResponse(is_valid=True, payer="0x789")
+
+    async def settle_payment(self, payload, requirements):
+        await self.gate.wait()
+        if self.failures_before_success:
+            self.failures_before_success -= 1
+            raise ConnectionError("facilitator unavailable")
+        return SettleResponse(success=True, transaction="0xtx")
+
+
+def _context(task_id, payment_payload):
+    context = MagicMock()
+    context.task_id = task_id
+    context.context_id = "context-1"
+    context.message = create_payment_submission_message(task_id, payment_payload)
+    context.current_task = Task(
+        id=task_id,
+        contextId="context-1",
+        status=TaskStatus(state=TaskState.working),
+    )
+    return context
+
+
+# --- Tests ---
+
+
+@pytest.mark.asyncio
+async def test_receipt_is_published_before_the_event_queue_closes(
+    a2a_harness, payment_payload, payment_requirements
+):
+    """The request waits for the queued settlement, so the client gets the receipt."""
+    settlements = SettlementQueue(workers=1)
+    executor = SlowSettlingExecutor(
+        AsyncMock(), MagicMock(), settlement_queue=settlements
+    )
+    harness = a2a_harness(executor)
+    await harness.await_payment("task-bg", [payment_requirements])
+
+    request = asyncio.create_task(harness.pay("task-bg", payment_payload))
+    await asyncio.sleep(0.01)
+    assert not request.done()
+    assert settlements.stats()["in_flight"] == 1
+
+    executor.gate.set()
+    events = await request
+
+    status = x402Utils().get_payment_status(events[-1])
+    assert status == PaymentStatus.PAYMENT_COMPLETED
+    stored = await harness.task("task-bg")
+    assert x402Utils().get_latest_receipt(stored).transaction == "0xtx"
+    assert settlements.stats()["settled"] == 1
+    await settlements.close()
+
+
+@pytest.mark.asyncio
+async def test_streamed_final_chunk_follows_a_queued_settlement(
+    a2a_harness, payment_payload, payment_requirements
+):
+    """The chunk held back for settlement still reaches the client."""
+    from a2a.types import Artifact, Part, TaskArtifactUpdateEvent, TextPart
+
+    async def delegate_execute(context, queue):
+        for text, last in (("Hel", False), ("lo", True)):
+            await queue.enqueue_event(
+                TaskArtifactUpdateEvent(
+                    task_id=context.task_id,
+                    context_id=context.context_id,
+                    artifact=Artifact(
+                        artifact_id="answer", parts=[Part(root=TextPart(text=text))]
+                    ),
+                    append=last,
+                    last_chunk=last,
+                )
+            )
+
+    delegate = MagicMock()
+    delegate.execute = delegate_execute
+    settlements = SettlementQueue(workers=1)
+    executor = SlowSettlingExecutor(
+        delegate, MagicMock(), settlement_queue=settlements, streaming=True
+    )
+    executor.gate.set()
+    harness = a2a_harness(executor)
+    await harness.await_payment("task-stream", [payment_requirements])
+
+    events = await harness.pay("task-stream", payment_payload)
+
+    chunks = [e for e in events if isinstance(e, TaskArtifactUpdateEvent)]
+    assert [c.last_chunk for c in chunks] == [False, True]
+    receipt_at = max(i for i, e in enumerate(events) if isinstance(e, Task))
+    assert receipt_at < events.index(chunks[-1])
+    status = x402Utils().get_payment_status(events[receipt_at])
+    assert status == PaymentStatus.PAYMENT_COMPLETED
+    await settlements.close()
+
+
+@pytest.mark.asyncio
+async def test_settlement_queue_retries_transient_errors(
+    payment_payload, payment_requirements
+):
+    """Exceptions are retried with backoff before a settlement is failed."""
+    settlements = SettlementQueue(workers=1, max_retries=2, backoff_base=0.001)
+    executor = SlowSettlingExecutor(
+        AsyncMock(), MagicMock(), settlement_queue=settlements
+    )
+    executor.failures_before_success = 2
+    executor.gate.set()
+    executor._payment_requirements_store["task-retry"] = [payment_requirements]
+    event_queue = AsyncMock()
+
+    await executor.execute(_context("task-retry", payment_payload), event_queue)
+    await settlements.join()
+
+    status = x402Utils().get_payment_status(event_queue.enqueue_event.call_args.args[0])
+    assert status == PaymentStatus.PAYMENT_COMPLETED
+    assert settlements.stats()["retries"] == 2
+    await settlements.close()
+
+
+@pytest.mark.asyncio
+async def test_duplicate_submission_replays_recorded_outcome(
+    payment_payload, payment_requirements
+):
+    """A concurrent resubmission waits for the first and is not re-run."""
+    from x402_a2a.executors.ledger import SettlementLedger
+
+    ledger = SettlementLedger()
+    delegate = AsyncMock()
+    executor = SlowSettlingExecutor(delegate, MagicMock(), settlement_ledger=ledger)
+    executor._payment_requirements_store["task-dup"] = [payment_requirements]
+    first_queue, second_queue = AsyncMock(), AsyncMock()
+
+    first = asyncio.create_task(
+        executor.execute(_context("task-dup", payment_payload), first_queue)
+    )
+    second = asyncio.create_task(
+        executor.execute(_context("task-dup", payment_payload), second_queue)
+    )
+    await asyncio.sleep(0.01)
+    executor.gate.set()
+    await asyncio.gather(first, second)
+
+    delegate.execute.assert_called_once()
+    replayed = second_queue.enqueue_event.call_args.args[0]
+    assert replayed == first_queue.enqueue_event.call_args.args[0]
+    status = x402Utils().get_payment_status(replayed)
+    assert status == PaymentStatus.PAYMENT_COMPLETED
+    assert ledger.stats() == {"size": 1, "locked": 0, "duplicates": 1}
+
+
+@pytest.mark.asyncio
+async def test_settlement_queue_does_not_retry_past_the_deadline(
+    payment_payload, payment_requirements
+):
+    """A settle attempt cut off by the request deadline is final."""
+    from x402_a2a.executors.deadlines import DeadlinePolicy
+    from x402_a2a.types import x402Metadata
+
+    settlements = SettlementQueue(workers=1, max_retries=3, backoff_base=0.001)
+    executor = SlowSettlingExecutor(
+        AsyncMock(),
+        MagicMock(),
+        settlement_queue=settlements,
+        deadline_policy=DeadlinePolicy(max_seconds=0.2),
+    )
+    executor._payment_requirements_store["task-late"] = [payment_requirements]
+    event_queue = AsyncMock()
+
+    await executor.execute(_context("task-late", payment_payload), event_queue)
+    await settlements.join()
+
+    task = event_queue.enqueue_event.call_args.args[0]
+    assert x402Utils().get_payment_status(task) == PaymentStatus.PAYMENT_FAILED
+    assert task.status.message.metadata[x402Metadata.TIMEOUT_PHASE_KEY] == "settle"
+    assert settlements.stats()["retries"] == 0
+    await settlements.close()
@@ -0,0 +1,283 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import threading
+
+import pytest
+
+from x402_a2a.core.store import InMemoryPaymentRequirementsStore
+from x402_a2a.core.redis_store import RedisPaymentRequirementsStore, LocalRedis
+from x402_a2a.core.sqlite_store import SQLitePaymentStateStore
+from x402_a2a.core.replay import NonceReplayIndex, SQLiteNonceSet
+from x402_a2a.types import (
+    PaymentPayload,
+    PaymentRequirements,
+    SettleResponse,
+    VerifyResponse,
+)
+
+# --- Fixtures ---
+
+
+def _requirements(max_timeout_seconds: int = 600) -> PaymentRequirements:
+    return PaymentRequirements(
+        scheme="exact",
+        network="base-sepolia",
+        pay_to="0x123",
+        max_amount_required="100",
+        asset="0x456",
+        description="Test Payment",
+        resource="/test",
+        mime_type="application/json",
+        max_timeout_seconds=max_timeout_seconds,
+    )
+
+
+def _payload() -> PaymentPayload:
+    return PaymentPayload(
+        x402_version=1,
+        scheme="exact",
+        network="base-sepolia",
+        payload={
+            "signature": "0xabc",
+            "authorization": {
+                "from": "0x789",
+                "to": "0x123",
+                "value": "100",
+                "valid_after": "0",
+                "valid_before": "9999999999",
+                "nonce": "0xdef",
+            },
+        },
+    )
+
+
+# --- Tests for InMemoryPaymentRequirementsStore ---
+
+
+@pytest.mark.asyncio
+async def test_in_memory_store_round_trip():
+    """Stored requirements are returned until deleted."""
+    store = InMemoryPaymentRequirementsStore()
+    accepts = [_requirements()]
+
+    await store.put("task-1", accepts)
+    assert await store.get("task-1") == accepts
+
+    await store.delete("task-1")
+    assert await store.get("task-1") is None
+
+
+@pytest.mark.asyncio
+async def test_in_memory_store_expires_after_max_timeout(monkeypatch):
+    """Entries are dropped once max_timeout_seconds has elapsed."""
+    clock = [1000.0]
+    monkeypatch.setattr("x402_a2a.core.store.time.monotonic", lambda: clock[0])
+    store = InMemoryPaymentRequirementsStore()
+
+    await store.put("task-1", [_requirements(max_timeout_seconds=60)])
+    clock[0] += 59
+    assert await store.get("task-1") is not None
+
+    clock[0] += 2
+    assert await store.get("task-1") is None
+    assert store.stats()["expired"] == 1
+
+
+@pytest.mark.asyncio
+async def test_in_memory_store_evicts_least_recently_used():
+    """The LRU cap bounds the store even when nothing has expired."""
+    store = InMemoryPaymentRequirementsStore(max_entries=2, num_shards=1)
+
+    await store.put("task-1", [_requirements()])
+    await store.put("task-2", [_requirements()])
+    await store.get("task-1")
+    await store.put("task-3", [_requirements()])
+
+    assert await store.get("task-2") is None
+    assert await store.get("task-1") is not None
+    assert store.stats()["evicted"] == 1
+    assert len(store) == 2
+
+
+def test_in_memory_store_shards_hold_exactly_max_entries():
+    """Shard capacities add up to max_entries; counters add up across shards."""
+    store = InMemoryPaymentRequirementsStore(max_entries=10, num_shards=4)
+
+    for i in range(200):
+        store.put_nowait(f"task-{i}", [_requirements()])
+    for i in range(200):
+        store.get_nowait(f"task-{i}")
+
+    stats = store.stats()
+    assert len(store) == stats["size"] == 10
+    assert (stats["hits"], stats["misses"], stats["evicted"]) == (10, 190, 190)
+
+
+# --- Tests for RedisPaymentRequirementsStore ---
+
+
+@pytest.mark.asyncio
+async def test_redis_store_shares_requirements_across_instances():
+    """Two executors' stores backed by one server see the same requirements."""
+    server = LocalRedis()
+    issuing_worker = RedisPaymentRequirementsStore(server)
+    paying_worker = RedisPaymentRequirementsStore(server)
+
+    await issuing_worker.put("task-1", [_requirements()])
+    server.round_trips = 0
+
+    accepts = await paying_worker.get("task-1")
+    assert accepts == [_requirements()]
+    assert server.round_trips == 1
+
+
+@pytest.mark.asyncio
+async def test_redis_store_pipelines_set_and_expire():
+    """A write is one round trip and carries the requirement's TTL."""
+    server = LocalRedis()
+    store = RedisPaymentRequirementsStore(server, key_prefix="t:")
+
+    await store.put("task-1", [_requirements(max_timeout_seconds=30)])
+
+    assert server.round_trips == 1
+    _, expires_at = server._data["t:task-1"]
+    assert expires_at is not None
+
+
+# --- Tests for SQLitePaymentStateStore ---
+
+
+@pytest.mark.asyncio
+async def test_sqlite_store_survives_restart(tmp_path):
+    """Requirements written before a restart are readable afterwards."""
+    path = str(tmp_path / "payments.db")
+    store = SQLitePaymentStateStore(path)
+    await store.put("task-1", [_requirements()])
+    await store.close()
+
+    reopened = SQLitePaymentStateStore(path)
+    assert await reopened.get("task-1") == [_requirements()]
+    await reopened.close()
+
+
+@pytest.mark.asyncio
+async def test_sqlite_store_tracks_pending_settlements(tmp_path):
+    """Verified payments stay pending until a settlement outcome is recorded."""
+    store = SQLitePaymentStateStore(str(tmp_path / "payments.db"))
+    await store.put("task-1", [_requirements()])
+    await store.record_verified(
+        "task-1",
+        _payload(),
+        _requirements(),
+        VerifyResponse(is_valid=True, payer="0x789"),
+    )
+
+    pending = await store.pending_settlements()
+    assert [p.task_id for p in pending] == ["task-1"]
+    assert pending[0].payment_payload == _payload()
+
+    await store.record_settlement("task-1", SettleResponse(success=True))
+    await store.delete("task-1")
+
+    assert await store.pending_settlements() == []
+    assert await store.get_status("task-1") == "settled"
+    await store.close()
+
+
+@pytest.mark.asyncio
+async def test_sqlite_store_writer_survives_unexpected_errors(tmp_path):
+    """A non-SQLite failure fails its batch without stopping the writer."""
+    store = SQLitePaymentStateStore(str(tmp_path / "payments.db"))
+    commit = store._commit
+
+    def failing_commit(conn, batch):
+        store._commit = commit
+        raise RuntimeError("disk on fire")
+
+    store._commit = failing_commit
+    with pytest.raises(RuntimeError):
+        await store.put("task-1", [_requirements()])
+
+    await store.put("task-2", [_requirements()])
+    assert await store.get("task-2") == [_requirements()]
+    await store.close()
+
+
+# --- Tests for NonceReplayIndex ---
+
+
+@pytest.mark.asyncio
+async def test_replay_index_rejects_reused_nonce():
+    index = NonceReplayIndex(capacity=2)
+    requirements = _requirements()
+
+    assert await index.reserve(_payload(), requirements)
+    assert not await index.reserve(_payload(), requirements)
+
+    await index.release(_payload(), requirements)
+    assert await index.reserve(_payload(), requirements)
+    assert index.stats()["duplicates"] == 1
+
+
+@pytest.mark.asyncio
+async def test_replay_index_survives_restart(tmp_path):
+    path = str(tmp_path / "nonces.db")
+    nonces = SQLiteNonceSet(path)
+    assert await NonceReplayIndex(nonces).reserve(_payload(), _requirements())
+    nonces.close()
+
+    reopened = NonceReplayIndex(SQLiteNonceSet(path))
+    assert not await reopened.reserve(_payload(), _requirements())
+
+
+@pytest.mark.asyncio
+async def test_replay_index_queries_sqlite_off_the_event_loop(tmp_path):
+    nonces = SQLiteNonceSet(str(tmp_path / "nonces.db"))
+    threads = []
+    for name in ("add_if_absent", "discard"):
+        method = getattr(nonces, name)
+
+        def recording(*args, _method=method):
+            threads.append(threading.current_thread())
+            return _method(*args)
+
+        setattr(nonces, name, recording)
+    index = NonceReplayIndex(nonces)
+
+    assert await index.reserve(_payload(), _requirements())
+    assert not await index.reserve(_payload(), _requirements())
+    await index.release(_payload(), _requirements())
+
+    assert len(threads) == 3
+    assert threading.main_thread() not in threads
+
+
+@pytest.mark.asyncio
+async def test_replay_index_grows_bloom_filter_instead_of_rebuilding_per_insert():
+    index = NonceReplayIndex(capacity=4)
+    rebuilds = []
+    rebuild = index._rebuild
+
+    def counting_rebuild():
+        rebuilds.append(1)
+        return rebuild()
+
+    index._rebuild = counting_rebuild
+    payload = _payload()
+    for i in range(64):
+        payload.payload.authorization.nonce = f"0x{i:064x}"
+        assert await index.reserve(payload, _requirements())
+
+    # Capacity doubles with the live keys: 4, 8, 16, 32, 64.
+    assert len(rebuilds) <= 5
@@ -0,0 +1,254 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import asyncio
+import time
+
+import pytest
+from eth_account import Account
+from unittest.mock import AsyncMock, MagicMock
+
+from a2a.types import Task, TaskState, TaskStatus
+from x402_a2a.core.eip3009 import pre_verify_exact_payment
+from x402_a2a.core.merchant import create_payment_requirements
+from x402_a2a.core.replay import NonceReplayIndex
+from x402_a2a.core.utils import create_payment_submission_message
+from x402_a2a.core.wallet import process_payment
+from x402_a2a.executors.server import x402ServerExecutor
+from x402_a2a.types import (
+    PaymentStatus,
+    PaymentVerificationError,
+    SettleResponse,
+    VerifyResponse,
+    x402ErrorCode,
+    x402Metadata,
+)
+
+# --- Fixtures ---
+
+
+@pytest.fixture(scope="module")
+def account():
+    return Account.create()
+
+
+@pytest.fixture
+def requirements():
+    return create_payment_requirements(
+        price="$0.01",
+        pay_to_address="0x1111111111111111111111111111111111111111",
+        resource="/test",
+        network="base-sepolia",
+    )
+
+
+@pytest.fixture
+def signed_payload(account, requirements):
+    return process_payment(requirements, account)
+
+
+# --- Tests for pre_verify_exact_payment ---
+
+
+def test_pre_verify_recovers_signer(account, requirements, signed_payload):
+    assert pre_verify_exact_payment(signed_payload, requirements) == account.address
+
+
+def test_pre_verify_rejects_forged_payer(requirements, signed_payload):
+    signed_payload.payload.authorization.from_ = Account.create().address
+
+    with pytest.raises(PaymentVerificationError) as e:
+        pre_verify_exact_payment(signed_payload, requirements)
+    assert e.value.error_code == x402ErrorCode.INVALID_SIGNATURE
+
+
+def test_pre_verify_rejects_amount_and_expiry(requirements, signed_payload):
+    requirements.max_amount_required = str(
+        int(signed_payload.payload.authorization.value) + 1
+    )
+    with pytest.raises(PaymentVerificationError) as e:
+        pre_verify_exact_payment(signed_payload, requirements)
+    assert e.value.error_code == x402ErrorCode.INVALID_AMOUNT
+
+    requirements.max_amount_required = signed_payload.payload.authorization.value
+    with pytest.raises(PaymentVerificationError) as e:
+        pre_verify_exact_payment(signed_payload, requirements, now=time.time() + 3600)
+    assert e.value.error_code == x402ErrorCode.EXPIRED_PAYMENT
+
+
+@pytest.mark.parametrize("nonce", ["0xnot-hex", "0x" + "ab" * 31])
+def test_pre_verify_rejects_malformed_nonce(requirements, signed_payload, nonce):
+    signed_payload.payload.authorization.nonce = nonce
+    with pytest.raises(PaymentVerificationError, match="nonce"):
+        pre_verify_exact_payment(signed_payload, requirements)
+
+
+def test_index_matches_tier_in_the_signed_asset(account, requirements):
+    from x402_a2a.core.matching import PaymentRequirementsIndex
+
+    # Same payee, another token whose atomic amounts are on a different scale.
+    other_asset = requirements.model_copy(
+        update={
+            "asset": "0x3333333333333333333333333333333333333333",
+            "max_amount_required": "1",
+            "extra": {"name": "Other", "version": "1"},
+        }
+    )
+    index = PaymentRequirementsIndex([other_asset, requirements])
+
+    payload = process_payment(requirements, account)
+    assert index.match(payload) is requirements
+    payload = process_payment(other_asset, account)
+    assert index.match(payload) is other_asset
+
+
+@pytest.mark.asyncio
+async def test_index_match_async_recovers_off_the_loop_only_for_ties(
+    account, requirements
+):
+    from concurrent.futures import ThreadPoolExecutor
+
+    from x402_a2a.core.matching import PaymentRequirementsIndex
+    from x402_a2a.core.recovery import SignatureRecoveryEngine
+
+    other_asset = requirements.model_copy(
+        update={
+            "asset": "0x3333333333333333333333333333333333333333",
+            "max_amount_required": "1",
+            "extra": {"name": "Other", "version": "1"},
+        }
+    )
+    # Its value covers a tier in both assets; only the signature tells them apart.
+    payload = process_payment(requirements, account)
+
+    recover = AsyncMock()
+    single = PaymentRequirementsIndex([requirements])
+    assert await single.match_async(payload, recover) is requirements
+    recover.assert_not_called()
+
+    index = PaymentRequirementsIndex([other_asset, requirements])
+    assert await index.match_async(payload) is requirements
+    with ThreadPoolExecutor(1) as pool:
+        engine = SignatureRecoveryEngine(workers=1, executor=pool)
+        assert await index.match_async(payload, engine.recover_signer) is requirements
+    assert engine.stats()["items"] == 2
+
+
+# --- Tests for x402ServerExecutor ---
+
+
+class LocallyVerifyingExecutor(x402ServerExecutor):
+    async def verify_payment(self, payload, requirements):
+        return VerifyResponse(is_valid=True, payer=payload.payload.authorization.from_)
+
+    async def settle_payment(self, payload, requirements):
+        return SettleResponse(success=True)
+
+
+@pytest.mark.asyncio
+async def test_executor_rejects_locally_before_facilitator(
+    requirements, signed_payload
+):
+    executor = LocallyVerifyingExecutor(
+        AsyncMock(), MagicMock(), local_verification=True
+    )
+    executor.verify_payment = AsyncMock()
+    signed_payload.payload.authorization.from_ = Account.create().address
+    executor._payment_requirements_store["task-local"] = [requirements]
+
+    context = MagicMock()
+    context.task_id = "task-local"
+    context.context_id = "context-1"
+    context.message = create_payment_submission_message("task-local", signed_payload)
+    context.current_task = Task(
+        id="task-local",
+        contextId="context-1",
+        status=TaskStatus(state=TaskState.working),
+    )
+    event_queue = AsyncMock()
+
+    await executor.execute(context, event_queue)
+
+    executor.verify_payment.assert_not_called()
+    task = event_queue.enqueue_event.call_args.args[0]
+    assert (
+        task.status.message.metadata[x402Metadata.ERROR_KEY]
+        == x402ErrorCode.INVALID_SIGNATURE
+    )
+
+
+@pytest.mark.asyncio
+async def test_executor_fails_payment_when_local_checks_raise(
+    a2a_harness, requirements, signed_payload
+):
+    engine = MagicMock()
+    engine.pre_verify = AsyncMock(side_effect=ValueError("bad payload"))
+    replay_index = NonceReplayIndex()
+    executor = LocallyVerifyingExecutor(
+        AsyncMock(), MagicMock(), signature_engine=engine, replay_index=replay_index
+    )
+    harness = a2a_harness(executor)
+    await harness.await_payment("task-local", [requirements])
+
+    events = await harness.pay("task-local", signed_payload)
+
+    metadata = events[-1].status.message.metadata
+    assert metadata[x402Metadata.STATUS_KEY] == PaymentStatus.PAYMENT_FAILED.value
+    assert metadata[x402Metadata.ERROR_KEY] == x402ErrorCode.INVALID_SIGNATURE
+    # The payment never reached the facilitator, so its nonce is free again.
+    assert await replay_index.reserve(signed_payload, requirements)
+
+
+# --- Tests for SignatureRecoveryEngine ---
+
+
+@pytest.mark.asyncio
+async def test_recovery_engine_batches_concurrent_recoveries(
+    account, requirements, signed_payload
+):
+    from concurrent.futures import ThreadPoolExecutor
+
+    from x402_a2a.core.recovery import SignatureRecoveryEngine
+
+    forged = signed_payload.model_copy(deep=True)
+    forged.payload.authorization.from_ = Account.create().address
+    with ThreadPoolExecutor(2) as pool:
+        engine = SignatureRecoveryEngine(workers=2, executor=pool, max_delay=0.01)
+        results = await asyncio.gather(
+            engine.pre_verify(signed_payload, requirements),
+            engine.pre_verify(forged, requirements),
+            return_exceptions=True,
+        )
+
+    assert results[0] == account.address
+    assert isinstance(results[1], PaymentVerificationError)
+    assert engine.stats()["batches"] == 1
+
+
+@pytest.mark.asyncio
+async def test_recovery_batch_isolates_a_malformed_payload(
+    account, requirements, signed_payload
+):
+    from concurrent.futures import ThreadPoolExecutor
+
+    from x402_a2a.core.recovery import SignatureRecoveryEngine
+
+    malformed = signed_payload.model_copy(deep=True)
+    malformed.payload.authorization.nonce = "0xnot-hex"
+    with ThreadPoolExecutor(1) as pool:
+        engine = SignatureRecoveryEngine(workers=1, executor=pool)
+        signers = await engine._recover_pairs(
+            [(malformed, requirements), (signed_payload, requirements)]
+        )
+
+    assert signers == [None, account.address]
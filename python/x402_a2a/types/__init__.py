@@ -46,8 +46,11 @@ from .errors import (
     x402Error,
     MessageError,
     ValidationError,
+    PaymentVerificationError,
     PaymentError,
+    FacilitatorUnavailableError,
     StateError,
+    AdmissionRejectedError,
     x402PaymentRequiredException,
     x402ErrorCode,
     map_error_to_code,
@@ -89,8 +92,11 @@ __all__ = [
     "x402Error",
     "MessageError",
     "ValidationError",
+    "PaymentVerificationError",
     "PaymentError",
+    "FacilitatorUnavailableError",
     "StateError",
+    "AdmissionRejectedError",
     "x402PaymentRequiredException",
     "x402ErrorCode",
     "map_error_to_code",
@@ -35,18 +35,54 @@ class ValidationError(x402Error):
     pass
 
 
+class PaymentVerificationError(ValidationError):
+    """A payment rejected by local checks before reaching the facilitator."""
+
+    def __init__(self, message: str, error_code: Optional[str] = None):
+        """Initialize verification error.
+
+        Args:
+            message: Human-readable reason for the rejection
+            error_code: x402 error code reported to the client
+                (defaults to INVALID_SIGNATURE)
+        """
+        super().__init__(message)
+        self.error_code = error_code or x402ErrorCode.INVALID_SIGNATURE
+
+
 class PaymentError(x402Error):
     """Payment processing errors."""
 
     pass
 
 
+class FacilitatorUnavailableError(PaymentError):
+    """The facilitator could not be reached in time or is failing fast."""
+
+    def __init__(self, message: str, error_code: Optional[str] = None):
+        """Initialize facilitator error.
+
+        Args:
+            message: Human-readable reason
+            error_code: x402 error code reported to the client
+                (defaults to SETTLEMENT_FAILED)
+        """
+        super().__init__(message)
+        self.error_code = error_code or x402ErrorCode.SETTLEMENT_FAILED
+
+
 class StateError(x402Error):
     """State transition errors."""
 
     pass
 
 
+class AdmissionRejectedError(x402Error):
+    """A request shed by admission control because the server is overloaded."""
+
+    pass
+
+
 class x402PaymentRequiredException(x402Error):
     """Exception thrown by delegate agents to request payment.
 
@@ -155,6 +191,7 @@ class x402ErrorCode:
     NETWORK_MISMATCH = "NETWORK_MISMATCH"
     INVALID_AMOUNT = "INVALID_AMOUNT"
     SETTLEMENT_FAILED = "SETTLEMENT_FAILED"
+    SERVER_BUSY = "SERVER_BUSY"
 
     @classmethod
     def get_all_codes(cls) -> list[str]:
@@ -167,6 +204,7 @@ class x402ErrorCode:
             cls.NETWORK_MISMATCH,
             cls.INVALID_AMOUNT,
             cls.SETTLEMENT_FAILED,
+            cls.SERVER_BUSY,
         ]
 
 
@@ -174,7 +212,11 @@ def map_error_to_code(error: Exception) -> str:
     """Maps implementation errors to spec error codes."""
     error_mapping = {
         ValidationError: x402ErrorCode.INVALID_SIGNATURE,
+        PaymentVerificationError: x402ErrorCode.INVALID_SIGNATURE,
         PaymentError: x402ErrorCode.SETTLEMENT_FAILED,
+        AdmissionRejectedError: x402ErrorCode.SERVER_BUSY,
         # Add more mappings as needed
     }
+    if getattr(error, "error_code", None):
+        return error.error_code
     return error_mapping.get(type(error), "UNKNOWN_ERROR")
@@ -35,3 +35,6 @@ class x402Metadata:
     PAYLOAD_KEY = "x402.payment.payload"  # Contains PaymentPayload
     RECEIPTS_KEY = "x402.payment.receipts"  # Contains array of SettleResponse objects
     ERROR_KEY = "x402.payment.error"  # Error code (when failed)
+    TIMEOUT_PHASE_KEY = "x402.payment.timeout_phase"  # Phase past its deadline
+    CREDIT_KEY = "x402.payment.credit"  # Prepaid credit debit and balance
+    ENTITLEMENT_KEY = "x402.payment.entitlement"  # Entitlement token and scope